@@ -0,0 +1,9 @@
+"""Standalone performance benchmarks for the taxi service.
+
+Each module is a script run from the project root, for example::
+
+    python -m benchmarks.index_counts --cars 1000000
+
+Benchmarks run against a throwaway test database and print their
+results as JSON so that runs can be compared between commits.
+"""
@@ -0,0 +1,70 @@
+"""Compare the JSON API with the HTML list pages it replaces for scrapers.
+
+For each model, measures one HTML list page, an API page of the same size
+and a full-size API page, and reports the rows served per second.
+"""
+import argparse
+
+from benchmarks.utils import benchmark_database, measure, report, setup
+
+ROUTES = {
+    "cars": ("taxi:car-list", "taxi:api-car-list"),
+    "drivers": ("taxi:driver-list", "taxi:api-driver-list"),
+    "manufacturers": (
+        "taxi:manufacturer-list",
+        "taxi:api-manufacturer-list",
+    ),
+}
+
+HTML_PAGE_SIZE = 5
+
+
+def fetch(client, url, params):
+    response = client.get(url, params)
+    assert response.status_code == 200, (url, response.status_code)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cars", type=int, default=10000)
+    parser.add_argument("--drivers", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    setup()
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.test import Client
+    from django.urls import reverse
+
+    with benchmark_database():
+        call_command(
+            "seed_fleet", cars=args.cars, drivers=args.drivers, verbosity=0
+        )
+        client = Client()
+        client.force_login(get_user_model().objects.order_by("id").first())
+        scenarios = {}
+        for model, (html_route, api_route) in ROUTES.items():
+            scenarios[f"{model} html"] = (
+                reverse(html_route), {"page": 2}, HTML_PAGE_SIZE
+            )
+            scenarios[f"{model} api"] = (
+                reverse(api_route), {"limit": HTML_PAGE_SIZE}, HTML_PAGE_SIZE
+            )
+            scenarios[f"{model} api limit={args.limit}"] = (
+                reverse(api_route), {"limit": args.limit}, args.limit
+            )
+
+        results = {}
+        for name, (url, params, rows) in scenarios.items():
+            result = measure(lambda: fetch(client, url, params), args.repeat)
+            result["rows_per_second"] = round(
+                rows / result["mean_ms"] * 1000
+            )
+            results[name] = result
+        report(results)
+
+
+if __name__ == "__main__":
+    main()
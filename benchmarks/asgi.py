@@ -0,0 +1,211 @@
+"""Throughput and latency of the async (ASGI) views against the sync ones.
+
+Seeds a fleet into a throwaway SQLite file, then for each server type
+keeps ``--concurrency`` requests in flight for ``--duration`` seconds: the
+ASGI application with that many asyncio tasks, and Django's WSGI handler
+with that many threads, as a threaded WSGI server would. Each type runs
+in its own process on its own copy of the seeded file. The request mix is
+the home page, car list pages, car and driver details, and a
+``--writes`` share of assignment toggles.
+
+Requests are handed to the handlers directly, so the numbers compare the
+two request stacks without an HTTP server or network in between.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import secrets
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.concurrency import request as wsgi_request, seed
+from benchmarks.utils import report, summarize
+
+SERVERS = ("wsgi", "asgi")
+
+
+def pick_request(rng, car_ids, driver_ids, writes):
+    """Return the method, path and query string of a random request."""
+    if rng.random() < writes:
+        return "POST", f"/cars/{rng.choice(car_ids)}/toggle-assign/", ""
+    kind = rng.randrange(4)
+    if kind == 0:
+        return "GET", "/", ""
+    if kind == 1:
+        pages = max(1, len(car_ids) // 5)
+        return "GET", "/cars/", f"page={rng.randint(1, pages)}"
+    if kind == 2:
+        return "GET", f"/cars/{rng.choice(car_ids)}/", ""
+    return "GET", f"/drivers/{rng.choice(driver_ids)}/", ""
+
+
+async def asgi_request(application, method, path, session, query=""):
+    csrf = secrets.token_hex(16)
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [
+            (b"host", b"localhost"),
+            (b"cookie", f"sessionid={session}; csrftoken={csrf}".encode()),
+            (b"x-csrftoken", csrf.encode()),
+        ],
+        "client": ("10.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+    status = []
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await application(scope, receive, send)
+    return status[0]
+
+
+def run_wsgi(options, sessions, car_ids, driver_ids, deadline):
+    from django.core.handlers.wsgi import WSGIHandler
+
+    handler = WSGIHandler()
+    lock = threading.Lock()
+    timings, errors = [], [0]
+
+    def client(session):
+        rng = random.Random(session)
+        while time.time() < deadline:
+            method, path, query = pick_request(
+                rng, car_ids, driver_ids, options.writes
+            )
+            start = time.perf_counter()
+            status = wsgi_request(handler, method, path, session, query)
+            elapsed = time.perf_counter() - start
+            with lock:
+                if status >= 500:
+                    errors[0] += 1
+                else:
+                    timings.append(elapsed)
+
+    with ThreadPoolExecutor(options.concurrency) as executor:
+        for future in [
+            executor.submit(client, session) for session in sessions
+        ]:
+            future.result()
+    return timings, errors[0]
+
+
+def run_asgi(options, sessions, car_ids, driver_ids, deadline):
+    from django.core.asgi import get_asgi_application
+
+    application = get_asgi_application()
+    timings, errors = [], 0
+
+    async def client(session):
+        nonlocal errors
+        rng = random.Random(session)
+        while time.time() < deadline:
+            method, path, query = pick_request(
+                rng, car_ids, driver_ids, options.writes
+            )
+            start = time.perf_counter()
+            status = await asgi_request(
+                application, method, path, session, query
+            )
+            elapsed = time.perf_counter() - start
+            if status >= 500:
+                errors += 1
+            else:
+                timings.append(elapsed)
+
+    async def main():
+        await asyncio.gather(*(client(session) for session in sessions))
+
+    asyncio.run(main())
+    return timings, errors
+
+
+def worker(server, path, options, sessions, car_ids, driver_ids, queue):
+    os.environ["TAXI_DB_PATH"] = path
+    os.environ["TAXI_PROFILE"] = options.profile
+    os.environ["TAXI_ASYNC_VIEWS"] = "1" if server == "asgi" else "0"
+    from benchmarks.utils import setup
+
+    setup()
+    import logging
+
+    # Server errors are counted; keep their tracebacks quiet.
+    logging.disable(logging.CRITICAL)
+    run = run_asgi if server == "asgi" else run_wsgi
+    deadline = time.time() + options.duration
+    timings, errors = run(options, sessions, car_ids, driver_ids, deadline)
+    queue.put((timings, errors))
+
+
+def run_server(server, base_path, sessions, car_ids, driver_ids, options):
+    path = os.path.join(os.path.dirname(base_path), f"{server}.sqlite3")
+    shutil.copyfile(base_path, path)
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(
+        target=worker,
+        args=(server, path, options, sessions, car_ids, driver_ids, queue),
+    )
+    process.start()
+    timings, errors = queue.get()
+    process.join()
+    return {
+        "per_second": round(len(timings) / options.duration, 1),
+        "errors": errors,
+        **(summarize(timings) if timings else {}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cars", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument(
+        "--writes",
+        type=float,
+        default=0.1,
+        help="Share of requests that toggle an assignment.",
+    )
+    parser.add_argument("--profile", default="production")
+    parser.add_argument("--servers", nargs="*", default=SERVERS)
+    options = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        base_path = os.path.join(tmp_dir, "seed.sqlite3")
+        sessions, car_ids = seed(base_path, options.cars, options.concurrency)
+        from django.contrib.auth import get_user_model
+
+        driver_ids = list(
+            get_user_model().objects.values_list("id", flat=True)
+        )
+        for server in options.servers:
+            results[server] = run_server(
+                server, base_path, sessions, car_ids, driver_ids, options
+            )
+    report(results)
+
+
+if __name__ == "__main__":
+    main()
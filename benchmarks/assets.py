@@ -0,0 +1,138 @@
+"""Requests and bytes per page view, first load and repeat load.
+
+Builds the assets into a throwaway STATIC_ROOT with the production
+storage, renders a few pages and fetches their stylesheets and scripts
+through the ``StaticFiles`` WSGI layer, as a browser with gzip support
+would. On a repeat load, ``immutable`` assets come from the browser cache
+without a request; others are revalidated (a 304 with no body).
+"""
+import argparse
+import os
+import re
+import tempfile
+from unittest import mock
+
+from benchmarks.utils import benchmark_database, report, setup
+
+ASSET_RE = re.compile(
+    r'<(?:link[^>]+href|script[^>]+src)="(/static/[^"]+)"'
+)
+
+PAGES = ("taxi:index", "taxi:car-list", "taxi:driver-list", "taxi:car-create")
+
+
+def fetch(static_files, url, etag=None):
+    response = {}
+
+    def start_response(status, headers):
+        response["status"] = status
+        response["headers"] = dict(headers)
+
+    environ = {
+        "PATH_INFO": url,
+        "REQUEST_METHOD": "GET",
+        "HTTP_ACCEPT_ENCODING": "gzip, deflate, br",
+    }
+    if etag:
+        environ["HTTP_IF_NONE_MATCH"] = etag
+    body = b"".join(static_files(environ, start_response))
+    return response["status"], response["headers"], len(body)
+
+
+def measure_page(client, static_files, url):
+    html = client.get(url).content
+    first = {"requests": 1, "bytes": len(html)}
+    repeat = {"requests": 1, "bytes": len(html)}
+    for asset in ASSET_RE.findall(html.decode()):
+        status, headers, size = fetch(static_files, asset)
+        assert status == "200 OK", (asset, status)
+        first["requests"] += 1
+        first["bytes"] += size
+        if "immutable" not in headers["Cache-Control"]:
+            _, _, size = fetch(static_files, asset, headers["ETag"])
+            repeat["requests"] += 1
+            repeat["bytes"] += size
+    return {"first_load": first, "repeat_load": repeat}
+
+
+def run(static_root):
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.test import Client
+    from django.urls import reverse
+
+    from taxi import visits
+    from taxi.models import Driver
+    from taxi_service.staticfiles import StaticFiles
+
+    call_command("collectstatic", interactive=False, verbosity=0)
+    static_files = StaticFiles(None, static_root, settings.STATIC_URL)
+    results = {}
+    with benchmark_database():
+        call_command(
+            "seed_fleet",
+            manufacturers=10,
+            cars=100,
+            drivers=20,
+            assignments_per_driver=3,
+            verbosity=0,
+        )
+        client = Client()
+        client.force_login(Driver.objects.first())
+        for name in PAGES:
+            results[name] = measure_page(client, static_files, reverse(name))
+        # Write buffered home page visits before the database goes away.
+        visits.buffer.flush()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--skip-vendor",
+        action="store_true",
+        help=(
+            "Leave the vendored CSS out of the bundles, for machines that "
+            "cannot download it."
+        ),
+    )
+    args = parser.parse_args()
+
+    setup()
+    from django.conf import settings
+    from django.test import override_settings
+
+    from taxi import assets
+
+    bundles = assets.BUNDLES
+    if args.skip_vendor:
+        bundles = {
+            bundle: tuple(
+                source for source in sources
+                if not source.startswith("vendor/")
+            )
+            for bundle, sources in bundles.items()
+        }
+    with tempfile.TemporaryDirectory() as tmp_dir, mock.patch.object(
+        assets, "BUNDLES", bundles
+    ):
+        # Built apart from static/dist/, which may hold a development build.
+        bundle_dir = os.path.join(tmp_dir, "bundles")
+        static_root = os.path.join(tmp_dir, "static_root")
+        if not args.skip_vendor:
+            assets.vendor()
+        assets.build_bundles(bundle_dir)
+        with override_settings(
+            STATICFILES_DIRS=[bundle_dir, *settings.STATICFILES_DIRS],
+            STATIC_ROOT=static_root,
+            STATICFILES_STORAGE=(
+                "taxi_service.staticfiles."
+                "CompressedManifestStaticFilesStorage"
+            ),
+        ):
+            results = run(static_root)
+    report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Throughput of concurrent writers and readers per database profile.
+
+Seeds a fleet into a throwaway SQLite file, then for each ``TAXI_PROFILE``
+runs ``--writers`` processes POSTing ``toggle_assign_to_car`` and
+``--readers`` processes paging through ``CarListView`` for ``--duration``
+seconds, each on its own copy of the seeded file. Requests go through
+Django's WSGI handler, so connections are opened and closed (or kept) as
+under a real server.
+"""
+import argparse
+import io
+import multiprocessing
+import os
+import random
+import secrets
+import shutil
+import tempfile
+import time
+
+from benchmarks.utils import report, summarize
+
+PROFILES = ("development", "production")
+
+
+def seed(path, cars, drivers):
+    """Seed ``path`` and return a session cookie per driver and the cars."""
+    os.environ["TAXI_DB_PATH"] = path
+    os.environ["TAXI_PROFILE"] = "development"
+    from benchmarks.utils import setup
+
+    setup()
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.test import Client
+
+    from taxi.models import Car
+
+    call_command("migrate", verbosity=0)
+    call_command(
+        "seed_fleet",
+        cars=cars,
+        drivers=drivers,
+        assignments_per_driver=0,
+        verbosity=0,
+    )
+    sessions = []
+    for driver in get_user_model().objects.order_by("id"):
+        client = Client()
+        client.force_login(driver)
+        sessions.append(client.cookies["sessionid"].value)
+    car_ids = list(Car.objects.values_list("id", flat=True))
+    return sessions, car_ids
+
+
+def request(handler, method, path, cookies, query=""):
+    csrf = secrets.token_hex(16)
+    environ = {
+        "REQUEST_METHOD": method,
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "80",
+        "REMOTE_ADDR": "10.0.0.1",
+        "HTTP_HOST": "localhost",
+        "HTTP_COOKIE": f"sessionid={cookies}; csrftoken={csrf}",
+        "HTTP_X_CSRFTOKEN": csrf,
+        "CONTENT_LENGTH": "0",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": io.StringIO(),
+        "wsgi.url_scheme": "http",
+        "wsgi.version": (1, 0),
+        "wsgi.multithread": False,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    status = []
+    response = handler(environ, lambda code, headers: status.append(code))
+    try:
+        for _ in response:
+            pass
+    finally:
+        response.close()
+    return int(status[0][:3])
+
+
+def worker(profile, path, role, session, car_ids, pages, deadline, queue):
+    os.environ["TAXI_DB_PATH"] = path
+    os.environ["TAXI_PROFILE"] = profile
+    from benchmarks.utils import setup
+
+    setup()
+    import logging
+
+    from django.core.handlers.wsgi import WSGIHandler
+
+    # Server errors are counted below; keep their tracebacks quiet.
+    logging.disable(logging.CRITICAL)
+    handler = WSGIHandler()
+    rng = random.Random(session)
+    timings, errors = [], 0
+    while time.time() < deadline:
+        if role == "writer":
+            method = "POST"
+            target = f"/cars/{rng.choice(car_ids)}/toggle-assign/"
+            query = ""
+        else:
+            method, target = "GET", "/cars/"
+            query = f"page={rng.randint(1, pages)}"
+        start = time.perf_counter()
+        status = request(handler, method, target, session, query)
+        elapsed = time.perf_counter() - start
+        if status >= 500:
+            errors += 1
+        else:
+            timings.append(elapsed)
+    queue.put((role, timings, errors))
+
+
+def run_profile(profile, base_path, sessions, car_ids, options):
+    path = os.path.join(os.path.dirname(base_path), f"{profile}.sqlite3")
+    shutil.copyfile(base_path, path)
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    roles = ["writer"] * options.writers + ["reader"] * options.readers
+    # Let every process finish importing Django before the clock starts.
+    deadline = time.time() + 5 + options.duration
+    processes = [
+        context.Process(
+            target=worker,
+            args=(
+                profile,
+                path,
+                role,
+                session,
+                car_ids,
+                max(1, len(car_ids) // 5),
+                deadline,
+                queue,
+            ),
+        )
+        for role, session in zip(roles, sessions)
+    ]
+    for process in processes:
+        process.start()
+    results = {
+        role: {"requests": 0, "errors": 0, "timings": []}
+        for role in ("writer", "reader")
+    }
+    for _ in processes:
+        role, timings, errors = queue.get()
+        results[role]["requests"] += len(timings)
+        results[role]["errors"] += errors
+        results[role]["timings"] += timings
+    for process in processes:
+        process.join()
+    return {
+        f"{role}s": {
+            "per_second": round(result["requests"] / options.duration, 1),
+            "errors": result["errors"],
+            **(summarize(result["timings"]) if result["timings"] else {}),
+        }
+        for role, result in results.items()
+        if result["requests"] or result["errors"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cars", type=int, default=10000)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--profiles", nargs="*", default=PROFILES)
+    options = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        base_path = os.path.join(tmp_dir, "seed.sqlite3")
+        sessions, car_ids = seed(
+            base_path, options.cars, options.writers + options.readers
+        )
+        for profile in options.profiles:
+            results[profile] = run_profile(
+                profile, base_path, sessions, car_ids, options
+            )
+    report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Measure time and peak Python memory of the streaming car export."""
+import argparse
+import time
+import tracemalloc
+
+from benchmarks.utils import benchmark_database, report, setup
+
+
+def run_export(client, url):
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get(url)
+    size = rows = 0
+    for chunk in response.streaming_content:
+        size += len(chunk)
+        rows += chunk.count(b"\n")
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "rows": rows - 1,
+        "bytes": size,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round((rows - 1) / elapsed),
+        "peak_memory_kb": round(peak / 1024),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--cars", type=int, nargs="+", default=[10000, 100000, 1000000]
+    )
+    parser.add_argument("--format", default="csv", choices=["csv", "jsonl"])
+    args = parser.parse_args()
+
+    setup()
+    from django.core.management import call_command
+    from django.test import Client
+    from django.urls import reverse
+
+    from taxi.models import Driver
+
+    results = {}
+    for cars in args.cars:
+        with benchmark_database():
+            call_command(
+                "seed_fleet",
+                manufacturers=100,
+                cars=cars,
+                drivers=cars // 10,
+                assignments_per_driver=10,
+                verbosity=0,
+            )
+            client = Client()
+            client.force_login(Driver.objects.first())
+            url = f"{reverse('taxi:car-export')}?format={args.format}"
+            results[cars] = run_export(client, url)
+    report(results)
+
+
+if __name__ == "__main__":
+    main()
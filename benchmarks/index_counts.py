@@ -0,0 +1,63 @@
+"""Compare the home page counters against three ``COUNT(*)`` queries."""
+import argparse
+
+from benchmarks.utils import benchmark_database, measure, report, setup
+
+
+def seed(manufacturers, cars, drivers):
+    from django.core.management import call_command
+
+    call_command(
+        "seed_fleet",
+        manufacturers=manufacturers,
+        cars=cars,
+        drivers=drivers,
+        assignments_per_driver=0,
+        verbosity=0,
+    )
+
+
+def count_queries():
+    from taxi.models import Car, Driver, Manufacturer
+
+    return (
+        Driver.objects.count(),
+        Car.objects.count(),
+        Manufacturer.objects.count(),
+    )
+
+
+def counters_lookup():
+    from taxi.models import FleetCounters
+
+    counters = FleetCounters.load()
+    return (
+        counters.num_drivers,
+        counters.num_cars,
+        counters.num_manufacturers,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--manufacturers", type=int, default=1000)
+    parser.add_argument("--cars", type=int, default=1000000)
+    parser.add_argument("--drivers", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    setup()
+    with benchmark_database():
+        seed(args.manufacturers, args.cars, args.drivers)
+        assert count_queries() == counters_lookup()
+        report(
+            {
+                "rows": vars(args),
+                "count_queries": measure(count_queries, args.repeat),
+                "counters_lookup": measure(counters_lookup, args.repeat),
+            }
+        )
+
+
+if __name__ == "__main__":
+    main()
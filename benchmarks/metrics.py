@@ -0,0 +1,67 @@
+"""Overhead of ``taxi.metrics.MetricsMiddleware`` on the main routes.
+
+Alternates requests with ``TAXI_METRICS`` on and off, so drift in the
+machine's speed affects both sides alike, and reports the p50 of each and
+the overhead in percent.
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.utils import benchmark_database, report, setup
+
+ROUTES = {
+    "index": ("taxi:index", {}),
+    "car-list": ("taxi:car-list", {"page": 2}),
+    "car-detail": ("taxi:car-detail", {}),
+    "driver-list": ("taxi:driver-list", {"page": 2}),
+    "api-car-list": ("taxi:api-car-list", {}),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cars", type=int, default=10000)
+    parser.add_argument("--drivers", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=300)
+    args = parser.parse_args()
+
+    setup()
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.test import Client, override_settings
+    from django.urls import reverse
+
+    from taxi.models import Car
+
+    with benchmark_database():
+        call_command(
+            "seed_fleet", cars=args.cars, drivers=args.drivers, verbosity=0
+        )
+        client = Client()
+        client.force_login(get_user_model().objects.order_by("id").first())
+        car = Car.objects.order_by("id").first()
+        results = {}
+        for name, (route, params) in ROUTES.items():
+            url = reverse(
+                route, args=[car.pk] if name == "car-detail" else []
+            )
+            timings = {False: [], True: []}
+            for i in range(args.repeat * 2):
+                enabled = bool(i % 2)
+                with override_settings(TAXI_METRICS=enabled):
+                    start = time.perf_counter()
+                    client.get(url, params)
+                    timings[enabled].append(time.perf_counter() - start)
+            off = statistics.median(timings[False]) * 1000
+            on = statistics.median(timings[True]) * 1000
+            results[name] = {
+                "off_p50_ms": round(off, 3),
+                "on_p50_ms": round(on, 3),
+                "overhead_percent": round((on - off) / off * 100, 2),
+            }
+        report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Drivers/sec of bulk provisioning against the number of hashing processes.
+
+Password hashing dominates, so the rate should scale with the workers up
+to the number of CPUs and then flatten.
+"""
+import argparse
+import os
+import time
+
+from benchmarks.utils import benchmark_database, report, setup
+
+
+def rows(count, offset):
+    return [
+        {
+            "username": f"provisioned{offset + i}",
+            "license_number": f"PRV{offset + i:05d}",
+            "password": f"password-{offset + i}",
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    cpus = os.cpu_count()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--drivers", type=int, default=200)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, 4, cpus, cpus * 2}),
+    )
+    args = parser.parse_args()
+
+    setup()
+    from taxi.provisioning import provision_drivers
+
+    results = {"cpus": cpus, "drivers": args.drivers}
+    with benchmark_database():
+        base_rate = None
+        for run, workers in enumerate(args.workers):
+            batch = rows(args.drivers, run * args.drivers)
+            start = time.perf_counter()
+            created, errors = provision_drivers(batch, workers=workers)
+            elapsed = time.perf_counter() - start
+            assert created == args.drivers and not errors, errors
+            rate = created / elapsed
+            base_rate = base_rate or rate
+            results[f"workers={workers}"] = {
+                "seconds": round(elapsed, 3),
+                "drivers_per_sec": round(rate, 1),
+                "speedup": round(rate / base_rate, 2),
+            }
+    report(results)
+
+
+if __name__ == "__main__":
+    main()
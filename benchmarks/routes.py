@@ -0,0 +1,335 @@
+"""Per-route latency, query count and allocation benchmark.
+
+Seeds a synthetic fleet with ``seed_fleet`` and requests every route of
+``taxi/urls.py`` through the Django test client, printing (or writing
+with ``--output``) one JSON document so runs can be compared between
+commits.
+"""
+import argparse
+import json
+import subprocess
+import time
+import tracemalloc
+
+from benchmarks.utils import benchmark_database, report, setup, summarize
+
+
+class Scenarios:
+    """Named requests covering every ``taxi:`` URL name."""
+
+    def __init__(self, client, options):
+        from django.contrib.auth import get_user_model
+        from django.contrib.auth.models import Permission
+
+        from taxi.models import Car, Manufacturer
+
+        self.client = client
+        self.repeat = options.repeat
+        self.user = get_user_model().objects.order_by("id").first()
+        # batch-assign takes it.
+        self.user.user_permissions.add(
+            Permission.objects.get(codename="change_car")
+        )
+        self.car = Car.objects.order_by("id").first()
+        self.manufacturer = Manufacturer.objects.order_by("id").first()
+        self.page_counts = {
+            "car-list": Car.objects.count(),
+            "driver-list": get_user_model().objects.count(),
+            "manufacturer-list": Manufacturer.objects.count(),
+        }
+
+    def url(self, route, *args):
+        from django.urls import reverse
+
+        return reverse(f"taxi:{route}", args=args)
+
+    def get(self, route, *args, **params):
+        return lambda: self.client.get(self.url(route, *args), params)
+
+    def post(self, route, *args, data=None, **kwargs):
+        return lambda: self.client.post(
+            self.url(route, *args), data or {}, **kwargs
+        )
+
+    def deletions(self, route, kind, **fields):
+        """Delete a freshly created object on every run."""
+        from django.contrib.auth import get_user_model
+
+        from taxi.models import Car, Manufacturer
+
+        model = {
+            "car": Car,
+            "driver": get_user_model(),
+            "manufacturer": Manufacturer,
+        }[kind]
+        count = self.repeat + 1
+        objects = iter(
+            [
+                model.objects.create(
+                    **{
+                        key: (
+                            value.format(i)
+                            if isinstance(value, str) else value
+                        )
+                        for key, value in fields.items()
+                    }
+                )
+                for i in range(count)
+            ]
+        )
+        return lambda: self.client.post(self.url(route, next(objects).pk))
+
+    def all(self):
+        car, user = self.car.pk, self.user.pk
+        manufacturer = self.manufacturer.pk
+        scenarios = {"index": self.get("index")}
+        for name, total in self.page_counts.items():
+            last_page = max(1, -(-total // 5))
+            scenarios[f"{name} first"] = self.get(name)
+            scenarios[f"{name} middle"] = self.get(
+                name, page=max(1, last_page // 2)
+            )
+            scenarios[f"{name} last"] = self.get(name, page=last_page)
+        scenarios.update(
+            {
+                "car-list search": self.get("car-list", model="Prius"),
+                "driver-list search": self.get(
+                    "driver-list", username="driver1"
+                ),
+                "manufacturer-list search": self.get(
+                    "manufacturer-list", name="Manufacturer 1"
+                ),
+                "car-detail": self.get("car-detail", car),
+                "driver-detail": self.get("driver-detail", user),
+                "driver-autocomplete": self.get(
+                    "driver-autocomplete", q="driver1"
+                ),
+                "car-export": self.get("car-export", model="Prius 2001"),
+                "driver-export": self.get("driver-export", username="99"),
+                "assignment-export": self.get(
+                    "assignment-export", model="Prius 2001"
+                ),
+                "toggle-car-assign": self.post("toggle-car-assign", car),
+                "batch-assign": self.post(
+                    "batch-assign",
+                    data=json.dumps({"assign": [[user, car]]}),
+                    content_type="application/json",
+                ),
+                "manufacturer-create form": self.get("manufacturer-create"),
+                "manufacturer-create": self.counter_post(
+                    "manufacturer-create",
+                    lambda i: {"name": f"Bench {i}", "country": "Bench"},
+                ),
+                "manufacturer-update form": self.get(
+                    "manufacturer-update", manufacturer
+                ),
+                "manufacturer-update": self.post(
+                    "manufacturer-update",
+                    manufacturer,
+                    data={"name": "Manufacturer 0", "country": "Bench"},
+                ),
+                "manufacturer-delete form": self.get(
+                    "manufacturer-delete", manufacturer
+                ),
+                "manufacturer-delete": self.deletions(
+                    "manufacturer-delete",
+                    "manufacturer",
+                    name="Deleted {}",
+                    country="Bench",
+                ),
+                "car-create form": self.get("car-create"),
+                "car-create": self.counter_post(
+                    "car-create",
+                    lambda i: {
+                        "model": f"Bench {i}",
+                        "manufacturer": manufacturer,
+                        "drivers": [user],
+                    },
+                ),
+                "car-update form": self.get("car-update", car),
+                "car-update": self.post(
+                    "car-update",
+                    car,
+                    data={
+                        "model": "Bench",
+                        "manufacturer": manufacturer,
+                        "drivers": [user],
+                    },
+                ),
+                "car-delete form": self.get("car-delete", car),
+                "car-delete": self.deletions(
+                    "car-delete",
+                    "car",
+                    model="Deleted {}",
+                    manufacturer=self.manufacturer,
+                ),
+                "driver-create form": self.get("driver-create"),
+                "driver-create": self.counter_post(
+                    "driver-create",
+                    lambda i: {
+                        "username": f"bench{i}",
+                        "password1": "bench-password-1",
+                        "password2": "bench-password-1",
+                        "license_number": f"BEN{i:05d}",
+                    },
+                ),
+                "driver-provision form": self.get("driver-provision"),
+                "driver-provision": self.counter_post(
+                    "driver-provision", self.provision_upload
+                ),
+                "driver-update form": self.get("driver-update", user),
+                "driver-update": self.post(
+                    "driver-update",
+                    user,
+                    data={"license_number": "ZZZ99999"},
+                ),
+                "driver-delete form": self.get("driver-delete", user),
+                "driver-delete": self.deletions(
+                    "driver-delete",
+                    "driver",
+                    username="deleted{}",
+                    license_number="DEL{:05d}",
+                ),
+                "api-car-list": self.get("api-car-list"),
+                "api-car-list search": self.get(
+                    "api-car-list", model="Prius", fields="id,model"
+                ),
+                "api-driver-list": self.get("api-driver-list"),
+                "api-manufacturer-list": self.get("api-manufacturer-list"),
+            }
+        )
+        return scenarios
+
+    def counter_post(self, route, make_data):
+        counter = iter(range(self.repeat + 1))
+        return lambda: self.client.post(
+            self.url(route), make_data(next(counter))
+        )
+
+    @staticmethod
+    def provision_upload(i, rows=10):
+        """A CSV of ``rows`` new drivers, only the first with a password."""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        lines = ["username,license_number,password"]
+        for row in range(rows):
+            number = i * rows + row
+            password = "bench-password-1" if row == 0 else ""
+            lines.append(f"provision{number},PRV{number:05d},{password}")
+        return {
+            "csv_file": SimpleUploadedFile(
+                "drivers.csv", "\n".join(lines).encode()
+            )
+        }
+
+
+def consume(response):
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    return response
+
+
+def run(scenario, repeat):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as queries:
+        response = consume(scenario())
+    # Read the count now: the next request_started resets the query log.
+    query_count = len(queries)
+    if response.status_code >= 400:
+        raise RuntimeError(f"HTTP {response.status_code}")
+
+    timings = []
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        consume(scenario())
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    consume(scenario())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        **summarize(timings),
+        "queries": query_count,
+        "peak_alloc_kb": round(peak / 1024, 1),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--manufacturers", type=int, default=100)
+    parser.add_argument("--cars", type=int, default=100000)
+    parser.add_argument("--drivers", type=int, default=10000)
+    parser.add_argument("--assignments-per-driver", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--only", nargs="*", help="Scenario names to run.")
+    parser.add_argument("--output", help="Write the JSON results here.")
+    options = parser.parse_args()
+
+    setup()
+    from django.core.management import call_command
+    from django.test import Client
+    from django.test.utils import override_settings
+
+    from taxi import urls, visits
+
+    results = {"revision": git_revision(), "dataset": {}, "routes": {}}
+    with benchmark_database(), override_settings(
+        TAXI_QUERY_BUDGET_MODE=None
+    ):
+        call_command(
+            "seed_fleet",
+            manufacturers=options.manufacturers,
+            cars=options.cars,
+            drivers=options.drivers,
+            assignments_per_driver=options.assignments_per_driver,
+            verbosity=0,
+        )
+        results["dataset"] = {
+            "manufacturers": options.manufacturers,
+            "cars": options.cars,
+            "drivers": options.drivers,
+            "assignments_per_driver": options.assignments_per_driver,
+        }
+        client = Client()
+        scenarios = Scenarios(client, options)
+        client.force_login(scenarios.user)
+        all_scenarios = scenarios.all()
+
+        covered = {name.split()[0] for name in all_scenarios}
+        missing = {p.name for p in urls.urlpatterns} - covered
+        if missing:
+            parser.error(f"No benchmark scenario for {sorted(missing)}")
+
+        for name, scenario in all_scenarios.items():
+            if options.only and name not in options.only:
+                continue
+            results["routes"][name] = run(scenario, options.repeat)
+
+        # Write buffered home page visits before the database goes away.
+        visits.buffer.flush()
+
+    if options.output:
+        with open(options.output, "w") as file:
+            json.dump(results, file, indent=2)
+    report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Compare FTS5 searches against ``__icontains`` scans on the car list."""
+import argparse
+import random
+
+from benchmarks.utils import benchmark_database, measure, report, setup
+
+MAKES = [
+    "Land", "Cruiser", "Corolla", "Camry", "Civic", "Accord", "Golf",
+    "Passat", "Octavia", "Focus", "Fiesta", "Model", "Sprinter", "Transit",
+    "Prius", "Leaf", "Ioniq", "Sportage", "Tucson", "Outlander",
+]
+
+
+def seed(cars, batch_size=20000):
+    from taxi.models import Car, Manufacturer
+
+    rng = random.Random(42)
+    manufacturer = Manufacturer.objects.create(name="Bench", country="Bench")
+    Car.objects.bulk_create(
+        (
+            Car(
+                model=(
+                    f"{rng.choice(MAKES)} {rng.choice(MAKES)} "
+                    f"{rng.randrange(100000):05d}"
+                ),
+                manufacturer=manufacturer,
+            )
+            for _ in range(cars)
+        ),
+        batch_size=batch_size,
+    )
+
+
+def search_page(term, page_size=5):
+    from taxi.models import Car
+    from taxi.search import search
+
+    queryset = search(
+        Car.objects.select_related("manufacturer").order_by("id"),
+        term,
+        "model",
+    )
+    return list(queryset[:page_size])
+
+
+def main():
+    from django.test import override_settings
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cars", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--terms", nargs="+", default=["Prius 0420", "Sprint", "04217"]
+    )
+    args = parser.parse_args()
+
+    setup()
+    with benchmark_database():
+        seed(args.cars)
+        results = {"cars": args.cars}
+        for term in args.terms:
+            results[term] = {}
+            for backend, enabled in (("icontains", False), ("fts5", True)):
+                with override_settings(TAXI_FULL_TEXT_SEARCH=enabled):
+                    results[term][backend] = measure(
+                        lambda: search_page(term), args.repeat
+                    )
+        report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Worker cold start, with and without the warm-up of taxi/warmup.py.
+
+Each run is a fresh interpreter that times the import of
+``taxi_service.wsgi.application`` (which includes the warm-up when
+``TAXI_WARM_UP=1``) and then its first and second responses, for a page
+rendering a crispy form (the login page, which needs no database). A
+preloading server pays the import once in the master; every worker pays
+the first response.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from wsgiref.util import setup_testing_defaults
+
+from benchmarks.utils import report
+
+URL = "/accounts/login/"
+
+
+def request(application, url):
+    environ = {"PATH_INFO": url, "SERVER_NAME": "localhost"}
+    setup_testing_defaults(environ)
+    response = {}
+
+    def start_response(status, headers):
+        response["status"] = status
+
+    start = time.perf_counter()
+    b"".join(application(environ, start_response))
+    elapsed = time.perf_counter() - start
+    assert response["status"] == "200 OK", response["status"]
+    return elapsed
+
+
+def child():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "taxi_service.settings")
+    start = time.perf_counter()
+    from taxi_service.wsgi import application
+
+    timings = {"import": time.perf_counter() - start}
+    timings["first_response"] = request(application, URL)
+    timings["second_response"] = request(application, URL)
+    print(json.dumps(timings))
+
+
+def run(warm_up, runs):
+    env = {**os.environ, "TAXI_WARM_UP": "1" if warm_up else "0"}
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.startup", "--child"],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        samples.append(json.loads(output.splitlines()[-1]))
+    return {
+        f"{name}_ms": round(
+            statistics.median(sample[name] for sample in samples) * 1000, 1
+        )
+        for name in samples[0]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child()
+        return
+    report(
+        {
+            "url": URL,
+            "runs": args.runs,
+            "cold": run(False, args.runs),
+            "warmed_up": run(True, args.runs),
+        }
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Render time of the list page templates, ``|cached_crispy`` vs ``|crispy``.
+
+For each list view, takes the context of a real page (with a search
+value) and renders its template alone: once as shipped, and once with
+the search form going through crispy's own ``|crispy`` filter. Only
+template time is measured; the queries of the page ran beforehand.
+"""
+import argparse
+
+from benchmarks.utils import benchmark_database, measure, report, setup
+
+PAGES = {
+    "car-list": ("taxi:car-list", "taxi/car_list.html", {"model": "a"}),
+    "driver-list": (
+        "taxi:driver-list",
+        "taxi/driver_list.html",
+        {"username": "a"},
+    ),
+    "manufacturer-list": (
+        "taxi:manufacturer-list",
+        "taxi/manufacturer_list.html",
+        {"name": "a"},
+    ),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    setup()
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.template import engines
+    from django.test import Client
+    from django.urls import reverse
+
+    from taxi import visits
+
+    backend = engines.all()[0]
+    results = {}
+    with benchmark_database():
+        call_command(
+            "seed_fleet", cars=1000, drivers=100, manufacturers=50,
+            verbosity=0,
+        )
+        client = Client()
+        client.force_login(get_user_model().objects.first())
+        for name, (route, template_name, params) in PAGES.items():
+            response = client.get(reverse(route), params)
+            assert response.status_code == 200, (name, response.status_code)
+            context = response.context[0].flatten()
+            request = response.wsgi_request
+            cached = backend.get_template(template_name)
+            crispy = backend.from_string(
+                cached.template.source.replace(
+                    "{% load cached_crispy %}",
+                    "{% load crispy_forms_filters %}",
+                ).replace("|cached_crispy", "|crispy")
+            )
+            results[name] = {
+                "crispy": measure(
+                    lambda: crispy.render(context, request), args.repeat
+                ),
+                "cached_crispy": measure(
+                    lambda: cached.render(context, request), args.repeat
+                ),
+            }
+        visits.buffer.flush()
+    report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import json
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+
+import django
+
+
+def setup():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "taxi_service.settings")
+    django.setup()
+
+
+@contextmanager
+def benchmark_database(verbosity=0):
+    """Create a throwaway on-disk test database for the block.
+
+    An on-disk file (rather than SQLite's in-memory test database) keeps
+    I/O costs realistic and lets several databases be created in a row.
+    ``DEBUG`` is turned off, as in production, so debug-only code does not
+    inflate timings.
+    """
+    from django.db import connection
+    from django.test.utils import (
+        setup_test_environment,
+        teardown_test_environment,
+    )
+
+    setup_test_environment(debug=False)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        connection.settings_dict["TEST"]["NAME"] = os.path.join(
+            tmp_dir, "benchmark.sqlite3"
+        )
+        old_name = connection.creation.create_test_db(
+            verbosity=verbosity, autoclobber=True
+        )
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity)
+            teardown_test_environment()
+
+
+def summarize(timings):
+    timings = sorted(timings)
+    p95_index = max(0, round(len(timings) * 0.95) - 1)
+    p99_index = max(0, round(len(timings) * 0.99) - 1)
+    return {
+        "runs": len(timings),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 3),
+        "p50_ms": round(statistics.median(timings) * 1000, 3),
+        "p95_ms": round(timings[p95_index] * 1000, 3),
+        "p99_ms": round(timings[p99_index] * 1000, 3),
+    }
+
+
+def measure(func, repeat=100):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return summarize(timings)
+
+
+def report(results):
+    print(json.dumps(results, indent=2, default=str))
@@ -0,0 +1,48 @@
+document.addEventListener("DOMContentLoaded", function () {
+  document.querySelectorAll("select[data-autocomplete-url]").forEach(function (select) {
+    var input = document.createElement("input");
+    input.type = "search";
+    input.placeholder = "Add driver by username or license number";
+    input.className = "form-control mb-2";
+    var results = document.createElement("div");
+    results.className = "list-group mb-2";
+    select.parentNode.insertBefore(input, select);
+    select.parentNode.insertBefore(results, select);
+
+    function choose(driver) {
+      var option = select.querySelector('option[value="' + driver.id + '"]');
+      if (!option) {
+        option = new Option(driver.text, driver.id);
+        select.add(option);
+      }
+      option.selected = true;
+      results.innerHTML = "";
+      input.value = "";
+    }
+
+    var timer;
+    input.addEventListener("input", function () {
+      clearTimeout(timer);
+      timer = setTimeout(function () {
+        var query = input.value.trim();
+        results.innerHTML = "";
+        if (!query) {
+          return;
+        }
+        var url = select.dataset.autocompleteUrl + "?q=" + encodeURIComponent(query);
+        fetch(url, {credentials: "same-origin"})
+          .then(function (response) { return response.json(); })
+          .then(function (data) {
+            data.results.forEach(function (driver) {
+              var button = document.createElement("button");
+              button.type = "button";
+              button.className = "list-group-item list-group-item-action";
+              button.textContent = driver.text;
+              button.addEventListener("click", function () { choose(driver); });
+              results.appendChild(button);
+            });
+          });
+      }, 200);
+    });
+  });
+});
@@ -1,11 +1,89 @@
-from django.contrib import admin
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.models import DELETION, LogEntry
+from django.contrib.admin.utils import model_ngettext
+from django.contrib.admin.widgets import AutocompleteSelect
 from django.contrib.auth.admin import UserAdmin
-from .models import Driver, Car, Manufacturer
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.template.response import TemplateResponse
+from django.utils.functional import cached_property
+
+from taxi import bulk, search
+from taxi.signals import COUNTER_FIELDS
+from .models import Driver, Car, FleetCounters, Manufacturer
+from .widgets import DriverAutocompleteWidget
+
+
+class FleetCountPaginator(Paginator):
+    """Paginator reading unfiltered totals from ``FleetCounters``.
+
+    The row is kept up to date by ``taxi.signals`` (and fixed by
+    ``manage.py reconcile_counters``), so the count of a whole table costs
+    one primary key lookup instead of a ``COUNT(*)`` scan.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        field = COUNTER_FIELDS.get(queryset.model)
+        if (
+            settings.TAXI_ADMIN_PERFORMANCE_MODE
+            and field is not None
+            and not queryset.query.where
+        ):
+            return getattr(FleetCounters.load(), field)
+        return super().count
+
+
+class PerformanceModeMixin:
+    """Changelist counting and searching for large tables.
+
+    Only the count of the filtered rows is shown (no second ``COUNT(*)``
+    of the whole table), and in ``settings.TAXI_ADMIN_PERFORMANCE_MODE``
+    searches go through the FTS index from ``taxi.search``. Search fields
+    that are not indexed fall back to ``icontains``, and results follow
+    the changelist ordering rather than relevance.
+    """
+
+    paginator = FleetCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        if settings.TAXI_ADMIN_PERFORMANCE_MODE and search.can_search_index(
+            queryset, search_term
+        ):
+            # Uncorrelated, so the index is searched once for the page.
+            condition = Q(
+                pk__in=search.matching_ids(queryset.model, search_term)
+            )
+            unindexed = [
+                name
+                for name in self.search_fields
+                if name not in search.SEARCH_FIELDS[queryset.model]
+            ]
+            for name in unindexed:
+                condition |= Q(**{f"{name}__icontains": search_term})
+            return queryset.filter(condition), False
+        return super().get_search_results(request, queryset, search_term)
 
 
 @admin.register(Driver)
-class DriverAdmin(UserAdmin):
-    list_display = UserAdmin.list_display + ("license_number",)
+class DriverAdmin(PerformanceModeMixin, UserAdmin):
+    list_display = UserAdmin.list_display + ("license_number", "num_cars")
+    # The columns of the search index, and email.
+    search_fields = (
+        "username",
+        "first_name",
+        "last_name",
+        "license_number",
+        "email",
+    )
+    actions = ("unassign_cars",)
     fieldsets = UserAdmin.fieldsets + (
         (("Additional info", {"fields": ("license_number",)}),)
     )
@@ -24,11 +102,137 @@ class DriverAdmin(UserAdmin):
         )
     )
 
+    @admin.action(
+        permissions=["change"],
+        description="Remove all cars from selected drivers",
+    )
+    def unassign_cars(self, request, queryset):
+        removed = bulk.unassign_drivers(queryset)
+        self.message_user(
+            request, f"Removed {removed} car assignments.", messages.SUCCESS
+        )
+
+
+class CarActionForm(helpers.ActionForm):
+    manufacturer = forms.ModelChoiceField(
+        queryset=Manufacturer.objects.all(),
+        required=False,
+        widget=AutocompleteSelect(
+            Car._meta.get_field("manufacturer"), admin.site
+        ),
+    )
+
+
+def delete_selected_cars(modeladmin, request, queryset):
+    """``delete_selected`` for ``bulk.delete_cars``.
+
+    The confirmation page only summarizes what will be deleted, and the
+    deletions are logged with a single ``INSERT``.
+    """
+    opts = modeladmin.model._meta
+    if request.POST.get("post"):
+        cars = list(queryset.values_list("pk", "model"))
+        deleted = bulk.delete_cars(queryset)
+        content_type = ContentType.objects.get_for_model(modeladmin.model)
+        LogEntry.objects.bulk_create(
+            LogEntry(
+                user_id=request.user.pk,
+                content_type=content_type,
+                object_id=str(pk),
+                object_repr=model[:200],
+                action_flag=DELETION,
+            )
+            for pk, model in cars
+        )
+        modeladmin.message_user(
+            request,
+            f"Successfully deleted {deleted} "
+            f"{model_ngettext(modeladmin.opts, deleted)}.",
+            messages.SUCCESS,
+        )
+        return None
+
+    objects_name = model_ngettext(queryset)
+    assignments = bulk.Assignment.objects.filter(car__in=queryset.order_by())
+    context = {
+        **modeladmin.admin_site.each_context(request),
+        "title": "Are you sure?",
+        "subtitle": None,
+        "objects_name": str(objects_name),
+        "deletable_objects": [],
+        "model_count": {
+            opts.verbose_name_plural: queryset.count(),
+            "car-driver assignments": assignments.count(),
+        }.items(),
+        "queryset": queryset,
+        "perms_lacking": set(),
+        "protected": [],
+        "opts": opts,
+        "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+        "media": modeladmin.media,
+    }
+    request.current_app = modeladmin.admin_site.name
+    return TemplateResponse(
+        request, "admin/delete_selected_confirmation.html", context
+    )
+
 
 @admin.register(Car)
-class CarAdmin(admin.ModelAdmin):
+class CarAdmin(PerformanceModeMixin, admin.ModelAdmin):
+    list_display = ("model", "manufacturer", "num_drivers")
+    list_select_related = ("manufacturer",)
     search_fields = ("model",)
     list_filter = ("manufacturer",)
+    autocomplete_fields = ("manufacturer",)
+    action_form = CarActionForm
+    actions = ("reassign_manufacturer",)
+
+    def formfield_for_manytomany(self, db_field, request, **kwargs):
+        if db_field.name == "drivers":
+            kwargs["widget"] = DriverAutocompleteWidget
+        return super().formfield_for_manytomany(db_field, request, **kwargs)
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        if (
+            settings.TAXI_ADMIN_PERFORMANCE_MODE
+            and "delete_selected" in actions
+        ):
+            # Same name: the confirmation template posts it back.
+            actions["delete_selected"] = (
+                delete_selected_cars,
+                "delete_selected",
+                actions["delete_selected"][2],
+            )
+        return actions
+
+    @admin.action(
+        permissions=["change"],
+        description="Reassign selected cars to the chosen manufacturer",
+    )
+    def reassign_manufacturer(self, request, queryset):
+        field = self.action_form.base_fields["manufacturer"]
+        try:
+            manufacturer = field.clean(request.POST.get("manufacturer"))
+        except ValidationError:
+            manufacturer = None
+        if manufacturer is None:
+            self.message_user(
+                request,
+                "Choose the manufacturer to reassign the cars to.",
+                messages.WARNING,
+            )
+            return
+        moved = bulk.reassign_cars(queryset, manufacturer)
+        self.message_user(
+            request,
+            f"Reassigned {moved} cars to {manufacturer.name}.",
+            messages.SUCCESS,
+        )
 
 
-admin.site.register(Manufacturer)
+@admin.register(Manufacturer)
+class ManufacturerAdmin(PerformanceModeMixin, admin.ModelAdmin):
+    list_display = ("name", "country", "num_cars")
+    # The columns of the search index; also used by the car autocomplete.
+    search_fields = ("name", "country")
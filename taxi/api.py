@@ -0,0 +1,202 @@
+"""Read-only JSON API over cars, drivers and manufacturers.
+
+Each endpoint serves ``{"results": [...], "next": ..., "previous": ...}``
+pages, keyset-paginated with opaque cursors. Rows are read with
+``.values()``, so no model instances are created. ``?fields=id,model``
+selects the fields to return, ``?limit=`` the page size, and the search
+parameters of the HTML list pages filter the rows (pages stay in id
+order, not by search relevance). The related IDs in
+``manufacturer``, ``drivers`` and ``cars`` come from at most one query
+per page, and only when the field is selected.
+"""
+from collections import defaultdict
+
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+
+from taxi.conditional import add_headers, check_validators, list_validators
+from taxi.models import Car, Driver, Manufacturer
+from taxi.pagination import CursorPaginator, InvalidCursor
+from taxi.views import filter_cars, filter_drivers, filter_manufacturers
+
+DEFAULT_LIMIT = 100
+
+MAX_LIMIT = 1000
+
+
+def related_ids(through, from_field, to_field, ids):
+    """Map each of ``ids`` to the list of IDs related through ``through``."""
+    related = defaultdict(list)
+    rows = (
+        through.objects.filter(**{f"{from_field}__in": ids})
+        .order_by(from_field, to_field)
+        .values_list(from_field, to_field)
+    )
+    for from_id, to_id in rows:
+        related[from_id].append(to_id)
+    return related
+
+
+class Resource:
+    """A model exposed by the API.
+
+    ``fields`` maps the public field names to ``.values()`` lookups, and
+    ``related`` maps the names of the embedded ID lists to
+    ``(through, from_field, to_field)`` of the many-to-many table.
+    """
+
+    def __init__(self, queryset, fields, filter_queryset, related=None):
+        self.queryset = queryset
+        self.fields = fields
+        self.filter_queryset = filter_queryset
+        self.related = related or {}
+
+    def field_names(self):
+        return [*self.fields, *self.related]
+
+    def page(self, request):
+        """Return the JSON payload, or raise ``ValueError``."""
+        selected = self.select_fields(request.GET.get("fields"))
+        limit = self.parse_limit(request.GET.get("limit"))
+        lookups = {"id": "id"}
+        lookups.update(
+            (name, self.fields[name])
+            for name in selected
+            if name in self.fields
+        )
+        queryset = self.filter_queryset(self.queryset, request.GET).values(
+            *lookups.values()
+        )
+        paginator = CursorPaginator(queryset, limit, ("id",))
+        try:
+            page = paginator.page(request.GET.get("cursor"))
+        except InvalidCursor as e:
+            raise ValueError(str(e))
+
+        rows = page.object_list
+        ids = [row["id"] for row in rows]
+        for name in selected:
+            if name in self.related:
+                related = related_ids(*self.related[name], ids) if ids else {}
+                for row in rows:
+                    row[name] = related.get(row["id"], [])
+        return {
+            "results": [
+                {
+                    name: (
+                        row[name] if name in self.related
+                        else row[lookups[name]]
+                    )
+                    for name in selected
+                }
+                for row in rows
+            ],
+            "next": self.page_url(request, page.next_cursor),
+            "previous": self.page_url(request, page.previous_cursor),
+        }
+
+    def select_fields(self, fields):
+        if not fields:
+            return self.field_names()
+        selected = list(dict.fromkeys(fields.split(",")))
+        unknown = set(selected) - set(self.field_names())
+        if unknown:
+            raise ValueError(
+                f"Unknown fields: {', '.join(sorted(unknown))}; choose "
+                f"from {', '.join(self.field_names())}"
+            )
+        return selected
+
+    @staticmethod
+    def parse_limit(limit):
+        if not limit:
+            return DEFAULT_LIMIT
+        try:
+            limit = int(limit)
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= MAX_LIMIT:
+            raise ValueError(
+                f"limit must be an integer from 1 to {MAX_LIMIT}"
+            )
+        return limit
+
+    @staticmethod
+    def page_url(request, cursor):
+        if cursor is None:
+            return None
+        params = request.GET.copy()
+        params["cursor"] = cursor
+        return request.build_absolute_uri(
+            f"{request.path}?{params.urlencode()}"
+        )
+
+
+RESOURCES = {
+    "cars": Resource(
+        Car.objects.all(),
+        {
+            "id": "id",
+            "model": "model",
+            "manufacturer": "manufacturer_id",
+            "num_drivers": "num_drivers",
+        },
+        filter_cars,
+        related={
+            "drivers": (Car.drivers.through, "car_id", "driver_id"),
+        },
+    ),
+    "drivers": Resource(
+        Driver.objects.all(),
+        {
+            name: name
+            for name in (
+                "id",
+                "username",
+                "first_name",
+                "last_name",
+                "license_number",
+                "num_cars",
+            )
+        },
+        filter_drivers,
+        related={
+            "cars": (Car.drivers.through, "driver_id", "car_id"),
+        },
+    ),
+    "manufacturers": Resource(
+        Manufacturer.objects.all(),
+        {
+            "id": "id",
+            "name": "name",
+            "country": "country",
+            "num_cars": "num_cars",
+        },
+        filter_manufacturers,
+    ),
+}
+
+
+def resource_view(name):
+    resource = RESOURCES[name]
+
+    @login_required
+    def view(request):
+        validators = list_validators(
+            resource.filter_queryset(resource.queryset, request.GET)
+        )
+        response, headers = check_validators(request, validators)
+        if response is None:
+            try:
+                response = JsonResponse(resource.page(request))
+            except ValueError as e:
+                response = JsonResponse({"error": str(e)}, status=400)
+        return add_headers(response, headers)
+
+    view.__name__ = view.__qualname__ = f"api_{name}"
+    return view
+
+
+api_cars = resource_view("cars")
+api_drivers = resource_view("drivers")
+api_manufacturers = resource_view("manufacturers")
@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class TaxiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "taxi"
+
+    def ready(self):
+        from taxi import signals  # noqa: F401
+        from taxi.cache import check_shared_cache
+        from taxi.search import install_search_indexes
+
+        check_shared_cache()
+
+        post_migrate.connect(install_search_indexes, sender=self)
@@ -0,0 +1,109 @@
+"""Build step for the site's CSS, run by ``manage.py build_assets``.
+
+Third-party stylesheets are vendored into ``assets/vendor/`` (downloaded
+once and checked against their Subresource Integrity hash), then
+concatenated with the site's own CSS into minified bundles under
+``static/dist/``. ``collectstatic`` then fingerprints and precompresses
+the bundles, see ``taxi_service.staticfiles``.
+"""
+import base64
+import hashlib
+import re
+import urllib.request
+from pathlib import Path
+
+from django.conf import settings
+
+VENDOR_DIR = Path(settings.BASE_DIR) / "assets" / "vendor"
+
+STATIC_DIR = Path(settings.BASE_DIR) / "static"
+
+# file in VENDOR_DIR -> (download URL, SRI hash)
+VENDOR_FILES = {
+    "bootstrap-4.5.3.min.css": (
+        "https://cdn.jsdelivr.net/npm/bootstrap@4.5.3/dist/css/"
+        "bootstrap.min.css",
+        "sha384-TX8t27EcRE3e/ihU7zmQxVncDAy5uIKz4rEkgIXeMed4M0jlfIDPvg6uqKI2"
+        "xXr2",
+    ),
+}
+
+# bundle in STATIC_DIR -> its sources, "vendor/" ones from VENDOR_DIR
+BUNDLES = {
+    "dist/css/site.css": (
+        "vendor/bootstrap-4.5.3.min.css",
+        "css/styles.css",
+    ),
+}
+
+COMMENT_RE = re.compile(r"/\*(?!!).*?\*/", re.DOTALL)
+WHITESPACE_RE = re.compile(r"\s+")
+PUNCTUATION_RE = re.compile(r"\s*([{};,>])\s*")
+COLON_RE = re.compile(r":\s+")
+
+
+class AssetError(Exception):
+    pass
+
+
+def minify_css(css):
+    """Strip comments and redundant whitespace from ``css``.
+
+    ``/*! ... */`` (license) comments are kept. Spaces before ``:`` are
+    left alone, as in ``a :hover`` they are a descendant combinator.
+    """
+    css = COMMENT_RE.sub("", css)
+    css = WHITESPACE_RE.sub(" ", css)
+    css = PUNCTUATION_RE.sub(r"\1", css)
+    css = COLON_RE.sub(":", css)
+    return css.replace(";}", "}").strip()
+
+
+def integrity(content):
+    digest = hashlib.sha384(content).digest()
+    return f"sha384-{base64.b64encode(digest).decode()}"
+
+
+def vendor(fetch=False):
+    """Check the vendored files, downloading missing ones if ``fetch``."""
+    for name, (url, expected) in VENDOR_FILES.items():
+        path = VENDOR_DIR / name
+        if path.exists():
+            content = path.read_bytes()
+        elif fetch:
+            with urllib.request.urlopen(url, timeout=30) as response:
+                content = response.read()
+        else:
+            raise AssetError(
+                f"{path} is missing: run with --fetch or copy it from {url}"
+            )
+        if integrity(content) != expected:
+            raise AssetError(f"{name} does not match its integrity hash")
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content)
+
+
+def source_path(source):
+    if source.startswith("vendor/"):
+        return VENDOR_DIR / source.removeprefix("vendor/")
+    return STATIC_DIR / source
+
+
+def build_bundles(output_dir=None):
+    """Write every bundle (by default to ``STATIC_DIR``).
+
+    Returns ``{bundle: size in bytes}``.
+    """
+    output_dir = Path(output_dir or STATIC_DIR)
+    sizes = {}
+    for bundle, sources in BUNDLES.items():
+        css = "\n".join(
+            minify_css(source_path(source).read_text(encoding="utf-8"))
+            for source in sources
+        )
+        path = output_dir / bundle
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(css + "\n", encoding="utf-8")
+        sizes[bundle] = path.stat().st_size
+    return sizes
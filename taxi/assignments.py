@@ -0,0 +1,81 @@
+"""Set-based writes to the ``Car.drivers`` through table.
+
+These bypass the related manager so that a batch of (driver, car) pairs
+costs a constant number of queries, but they still send ``m2m_changed``
+(from the driver side, as ``driver.cars.add()``/``remove()`` would) so
+signal receivers see every change.
+"""
+from collections import defaultdict
+
+from django.db import router
+from django.db.models.signals import m2m_changed
+
+from taxi.models import Car, Driver
+
+Assignment = Car.drivers.through
+
+DELETE_BATCH_SIZE = 500
+
+
+def _by_driver(pairs):
+    cars = defaultdict(set)
+    for driver_id, car_id in pairs:
+        cars[driver_id].add(car_id)
+    return cars
+
+
+def _send(action, pairs, using):
+    for driver_id, car_ids in _by_driver(pairs).items():
+        m2m_changed.send(
+            sender=Assignment,
+            action=action,
+            instance=Driver(pk=driver_id),
+            reverse=True,
+            model=Car,
+            pk_set=car_ids,
+            using=using,
+        )
+
+
+def existing_assignments(pairs):
+    """Map each (driver_id, car_id) pair that is assigned to its row id."""
+    pairs = set(pairs)
+    if not pairs:
+        return {}
+    rows = Assignment.objects.filter(
+        driver_id__in={driver_id for driver_id, _ in pairs},
+        car_id__in={car_id for _, car_id in pairs},
+    ).values_list("driver_id", "car_id", "id")
+    return {
+        (driver_id, car_id): row_id
+        for driver_id, car_id, row_id in rows
+        if (driver_id, car_id) in pairs
+    }
+
+
+def add_assignments(pairs):
+    """Insert (driver_id, car_id) pairs that are not assigned yet."""
+    pairs = set(pairs)
+    if not pairs:
+        return
+    using = router.db_for_write(Assignment)
+    _send("pre_add", pairs, using)
+    Assignment.objects.using(using).bulk_create(
+        [Assignment(driver_id=driver, car_id=car) for driver, car in pairs],
+        ignore_conflicts=True,
+    )
+    _send("post_add", pairs, using)
+
+
+def remove_assignments(assignments):
+    """Delete assignments given as ``{(driver_id, car_id): row_id}``."""
+    if not assignments:
+        return
+    using = router.db_for_write(Assignment)
+    _send("pre_remove", assignments, using)
+    row_ids = list(assignments.values())
+    for start in range(0, len(row_ids), DELETE_BATCH_SIZE):
+        Assignment.objects.using(using).filter(
+            id__in=row_ids[start:start + DELETE_BATCH_SIZE]
+        ).delete()
+    _send("post_remove", assignments, using)
@@ -0,0 +1,29 @@
+"""``taxi.urls`` with the views from ``taxi.async_views`` swapped in.
+
+Used instead of ``taxi.urls`` when ``settings.TAXI_ASYNC_VIEWS`` is on.
+Routes without an async version keep their sync view.
+"""
+from django.urls import path
+
+from taxi import async_views, urls
+
+ASYNC_VIEWS = {
+    "index": async_views.index,
+    "manufacturer-list": async_views.manufacturer_list,
+    "car-list": async_views.car_list,
+    "car-detail": async_views.car_detail,
+    "toggle-car-assign": async_views.toggle_assign_to_car,
+    "driver-list": async_views.driver_list,
+    "driver-detail": async_views.driver_detail,
+}
+
+urlpatterns = [
+    path(
+        str(pattern.pattern),
+        ASYNC_VIEWS.get(pattern.name, pattern.callback),
+        name=pattern.name,
+    )
+    for pattern in urls.urlpatterns
+]
+
+app_name = "taxi"
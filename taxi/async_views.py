@@ -0,0 +1,275 @@
+"""Async counterparts of the read-heavy views and ``toggle_assign_to_car``.
+
+``taxi.async_urls`` swaps these in for the sync views when
+``settings.TAXI_ASYNC_VIEWS`` is on, which ``taxi_service/asgi.py`` does
+by default. They render the same templates with the same context.
+
+Django 4.1's async ORM still runs each query through ``sync_to_async`` on
+the request's thread, and there is no async ``atomic()``, ``aggregate()``
+or template rendering yet. Those steps therefore go through
+``sync_to_async`` explicitly, and ``asyncio.gather`` overlaps the waits of
+independent steps rather than running their SQL in parallel.
+"""
+import asyncio
+import functools
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user, get_user_model
+from django.contrib.auth.views import redirect_to_login
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.http import Http404, HttpResponseNotAllowed, HttpResponseRedirect
+from django.shortcuts import render
+from django.urls import reverse
+
+from taxi.cache import attach_manufacturers, get_version
+from taxi.conditional import (
+    add_headers,
+    check_validators,
+    detail_validators,
+    list_validators,
+)
+from taxi.forms import CarSearchForm, DriverSearchForm, ManufacturerSearchForm
+from taxi.models import Car, FleetCounters, Manufacturer
+from taxi.pagination import CursorPaginator, InvalidCursor
+from taxi.search import ranked_ordering
+from taxi.views import (
+    count_ordering,
+    filter_cars,
+    filter_drivers,
+    filter_manufacturers,
+    toggle_assignment,
+)
+from taxi.visits import record_visit
+
+PAGINATE_BY = 5
+
+arender = sync_to_async(render)
+
+
+def login_required(view):
+    """Async ``login_required``; also resolves the lazy ``request.user``.
+
+    Loading the user touches the session and the database, which must
+    not happen on the event loop.
+    """
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        request.user = await sync_to_async(get_user)(request)
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+async def load_counters():
+    try:
+        return await FleetCounters.objects.aget(pk=FleetCounters.SINGLETON_ID)
+    except FleetCounters.DoesNotExist:
+        return await sync_to_async(FleetCounters.reconcile)()
+
+
+@login_required
+async def index(request):
+    """View function for the home page of the site."""
+
+    counters, num_visits = await asyncio.gather(
+        load_counters(),
+        sync_to_async(record_visit)(request.user.pk),
+    )
+
+    context = {
+        "num_drivers": counters.num_drivers,
+        "num_cars": counters.num_cars,
+        "num_manufacturers": counters.num_manufacturers,
+        "num_visits": num_visits,
+    }
+
+    return await arender(request, "taxi/index.html", context=context)
+
+
+async def paginate(request, queryset, cursor_ordering):
+    """Async ``MultipleObjectMixin.paginate_queryset``."""
+    if settings.TAXI_CURSOR_PAGINATION:
+        paginator = CursorPaginator(queryset, PAGINATE_BY, cursor_ordering)
+        try:
+            page = await sync_to_async(paginator.page)(
+                request.GET.get("cursor")
+            )
+        except InvalidCursor as e:
+            raise Http404(str(e))
+        return paginator, page
+
+    paginator = Paginator(queryset, PAGINATE_BY)
+    paginator.count = await queryset.acount()
+    page_number = request.GET.get("page") or 1
+    try:
+        if page_number == "last":
+            page_number = paginator.num_pages
+        number = paginator.validate_number(page_number)
+    except InvalidPage as e:
+        raise Http404(str(e))
+    bottom = (number - 1) * PAGINATE_BY
+    object_list = [
+        obj async for obj in queryset[bottom:bottom + PAGINATE_BY]
+    ]
+    return paginator, Page(object_list, number, paginator)
+
+
+async def list_view(request, queryset, template_name, context_object_name,
+                    search_form, count_field, cursor_ordering=("id",),
+                    prepare_objects=None):
+    ordering = count_ordering(request.GET, count_field)
+    if ordering:
+        queryset = queryset.order_by(*ordering)
+    cursor_ordering = (
+        ordering or ranked_ordering(queryset) or cursor_ordering
+    )
+    validators = await sync_to_async(list_validators)(queryset)
+    response, headers = check_validators(request, validators)
+    if response is not None:
+        return add_headers(response, headers)
+
+    paginator, page = await paginate(request, queryset, cursor_ordering)
+    if prepare_objects is not None:
+        await sync_to_async(prepare_objects)(page.object_list)
+    context = {
+        "paginator": paginator,
+        "page_obj": page,
+        "is_paginated": page.has_other_pages(),
+        "object_list": page.object_list,
+        context_object_name: page.object_list,
+        "search_form": search_form,
+    }
+    response = await arender(request, template_name, context)
+    return add_headers(response, headers)
+
+
+@login_required
+async def manufacturer_list(request):
+    return await list_view(
+        request,
+        filter_manufacturers(Manufacturer.objects.all(), request.GET),
+        "taxi/manufacturer_list.html",
+        "manufacturer_list",
+        ManufacturerSearchForm(
+            initial={"name": request.GET.get("name", "")}
+        ),
+        "num_cars",
+        cursor_ordering=("name",),
+    )
+
+
+@login_required
+async def car_list(request):
+    return await list_view(
+        request,
+        filter_cars(Car.objects.order_by("id"), request.GET),
+        "taxi/car_list.html",
+        "car_list",
+        CarSearchForm(initial={"model": request.GET.get("model", "")}),
+        "num_drivers",
+        prepare_objects=attach_manufacturers,
+    )
+
+
+@login_required
+async def driver_list(request):
+    return await list_view(
+        request,
+        filter_drivers(
+            get_user_model().objects.all().order_by("id"), request.GET
+        ),
+        "taxi/driver_list.html",
+        "driver_list",
+        DriverSearchForm(
+            initial={"username": request.GET.get("username", "")}
+        ),
+        "num_cars",
+    )
+
+
+async def detail_view(request, queryset, pk, related_updated_at,
+                      template_name, get_context):
+    validators = await sync_to_async(detail_validators)(
+        queryset, pk, related_updated_at
+    )
+    if validators is None:
+        raise Http404("No object found matching the query")
+    response, headers = check_validators(
+        request, validators, last_modified=True
+    )
+    if response is not None:
+        return add_headers(response, headers)
+
+    try:
+        obj = await queryset.aget(pk=pk)
+    except queryset.model.DoesNotExist:
+        raise Http404("No object found matching the query")
+    context = {
+        "object": obj,
+        queryset.model._meta.model_name: obj,
+        **await get_context(obj),
+    }
+    response = await arender(request, template_name, context)
+    return add_headers(response, headers)
+
+
+@login_required
+async def car_detail(request, pk):
+    async def get_context(car):
+        # The version tokens live in the cache, which may be a file or
+        # Redis: no blocking I/O on the event loop.
+        _, is_assigned, fragment_version = await asyncio.gather(
+            sync_to_async(attach_manufacturers)([car]),
+            car.drivers.filter(pk=request.user.pk).aexists(),
+            sync_to_async(get_version)(("car", car.pk)),
+        )
+        return {
+            "is_assigned": is_assigned,
+            # Lazy: only evaluated when the cached fragment is
+            # re-rendered, inside the render thread.
+            "drivers": car.drivers.all(),
+            "fragment_version": fragment_version,
+        }
+
+    return await detail_view(
+        request,
+        Car.objects.all(),
+        pk,
+        ("drivers__updated_at",),
+        "taxi/car_detail.html",
+        get_context,
+    )
+
+
+@login_required
+async def driver_detail(request, pk):
+    async def get_context(driver):
+        return {
+            # Lazy: see car_detail.
+            "cars": driver.cars.select_related("manufacturer"),
+            "fragment_version": await sync_to_async(get_version)(
+                ("driver", driver.pk), ("manufacturers",)
+            ),
+        }
+
+    return await detail_view(
+        request,
+        get_user_model().objects.all(),
+        pk,
+        ("cars__updated_at",),
+        "taxi/driver_detail.html",
+        get_context,
+    )
+
+
+@login_required
+async def toggle_assign_to_car(request, pk):
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+    # No async atomic() yet: run the transaction on the request's thread.
+    await sync_to_async(toggle_assignment)(request.user.id, pk)
+    return HttpResponseRedirect(reverse("taxi:car-detail", args=[pk]))
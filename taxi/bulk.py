@@ -0,0 +1,105 @@
+"""Set-based writes behind the admin bulk actions.
+
+Each function changes the selected rows with one ``UPDATE`` or ``DELETE``
+per table instead of saving or deleting them one at a time, so no model
+or ``m2m_changed`` signals are sent. What the ``taxi.signals`` receivers
+would have maintained (counts, fragment versions, the ``updated_at`` of
+related rows, ``FleetCounters``) is then updated for the whole selection
+at once, in the same transaction.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from taxi.cache import bump_versions
+from taxi.counts import refresh_counts
+from taxi.models import Car, Driver, FleetCounters, Manufacturer
+
+Assignment = Car.drivers.through
+
+
+def reassign_cars(cars, manufacturer):
+    """Move the ``cars`` queryset to ``manufacturer``.
+
+    Returns the number of cars moved.
+    """
+    cars = cars.exclude(manufacturer=manufacturer).order_by()
+    with transaction.atomic():
+        car_ids = list(cars.values_list("pk", flat=True))
+        if not car_ids:
+            return 0
+        previous = set(
+            cars.values_list("manufacturer_id", flat=True).distinct()
+        )
+        driver_ids = set(
+            Assignment.objects.filter(car__in=cars).values_list(
+                "driver_id", flat=True
+            )
+        )
+        moved = Car.objects.filter(pk__in=cars.values("pk")).update(
+            manufacturer=manufacturer, updated_at=timezone.now()
+        )
+        refresh_counts(
+            Manufacturer, "num_cars", previous | {manufacturer.pk}
+        )
+        bump_versions("car", car_ids)
+        bump_versions("driver", driver_ids)
+    return moved
+
+
+def delete_cars(cars):
+    """Delete the ``cars`` queryset and their assignments.
+
+    Returns the number of cars deleted.
+    """
+    cars = cars.order_by()
+    with transaction.atomic():
+        manufacturer_ids = set(
+            cars.values_list("manufacturer_id", flat=True).distinct()
+        )
+        assignments = Assignment.objects.filter(car__in=cars)
+        driver_ids = set(assignments.values_list("driver_id", flat=True))
+        # The through model has no delete receivers, so this is a single
+        # DELETE; Car has some, which delete_rows() skips.
+        assignments.delete()
+        deleted = delete_rows(Car.objects.filter(pk__in=cars.values("pk")))
+        if not deleted:
+            return 0
+        FleetCounters.increment("num_cars", -deleted)
+        refresh_counts(Manufacturer, "num_cars", manufacturer_ids)
+        refresh_counts(Driver, "num_cars", driver_ids, touch=True)
+        bump_versions("driver", driver_ids)
+        bump_versions("deleted", [Car._meta.label_lower])
+    return deleted
+
+
+def delete_rows(queryset):
+    """Delete the rows of ``queryset`` with one ``DELETE``.
+
+    No signals are sent and no related rows are collected: the caller
+    deletes those first. This is what ``QuerySet.delete()`` does for
+    models without delete receivers, through the private
+    ``QuerySet._raw_delete()``, whose behaviour ``DeleteRowsTest`` pins.
+    Returns the number of rows deleted.
+    """
+    return queryset._raw_delete(queryset.db)
+
+
+def unassign_drivers(drivers):
+    """Remove every car assignment of the ``drivers`` queryset.
+
+    Returns the number of assignments removed.
+    """
+    assignments = Assignment.objects.filter(driver__in=drivers.order_by())
+    with transaction.atomic():
+        pairs = list(assignments.values_list("driver_id", "car_id"))
+        if not pairs:
+            return 0
+        assignments.delete()
+        driver_ids = {driver_id for driver_id, _ in pairs}
+        car_ids = {car_id for _, car_id in pairs}
+        # Also touches every affected row.
+        refresh_counts(Driver, "num_cars", driver_ids, touch=True)
+        refresh_counts(Car, "num_drivers", car_ids, touch=True)
+        bump_versions("driver", driver_ids)
+        bump_versions("car", car_ids)
+    return len(pairs)
@@ -0,0 +1,201 @@
+"""Version tokens for cached template fragments, and the manufacturer cache.
+
+A cached fragment is keyed on the tokens of the objects it renders.
+Writes replace those tokens rather than deleting fragments, so a fragment
+built from outdated rows can never be looked up again and simply expires.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import router, transaction
+
+from taxi.models import Car, Manufacturer
+
+VERSION_KEY_PREFIX = "taxi:version"
+
+MANUFACTURER_KEY_PREFIX = "taxi:manufacturer"
+
+
+def check_shared_cache():
+    """Refuse a per-process default cache under the production profile.
+
+    Its version tokens would only be bumped in the worker handling a
+    write, and the others would go on serving stale fragments, ETags and
+    manufacturers.
+    """
+    if settings.TAXI_PROFILE == "production" and isinstance(
+        caches["default"], LocMemCache
+    ):
+        raise ImproperlyConfigured(
+            "The production profile needs a default cache shared by the "
+            "worker processes, not LocMemCache."
+        )
+
+
+def version_key(kind, pk=None):
+    if pk is None:
+        return f"{VERSION_KEY_PREFIX}:{kind}"
+    return f"{VERSION_KEY_PREFIX}:{kind}:{pk}"
+
+
+def new_version():
+    return uuid.uuid4().hex
+
+
+def get_version(*keys):
+    """Combined token for ``(kind, pk)`` pairs, in one cache round trip.
+
+    Missing tokens are created, so the first render of a fragment after a
+    cache restart is a miss rather than a stale hit.
+    """
+    keys = [version_key(*key) for key in keys]
+    versions = cache.get_many(keys)
+    missing = {key: new_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return "-".join(versions[key] for key in keys)
+
+
+def bump_versions(kind, pks=(None,)):
+    """Invalidate the fragments of ``kind`` objects with the given pks.
+
+    The tokens are replaced right away, for reads later in the same
+    transaction, and again on commit: a concurrent request may have cached
+    the uncommitted (old) rows under the intermediate token.
+    """
+    keys = [version_key(kind, pk) for pk in pks]
+    if not keys:
+        return
+
+    def bump():
+        cache.set_many({key: new_version() for key in keys}, timeout=None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+class ManufacturerCache:
+    """Manufacturers by pk: a per-process LRU in front of the shared cache.
+
+    Both tiers are keyed on the ``"manufacturers"`` version token, which
+    ``taxi.signals`` replaces whenever a manufacturer is saved or deleted.
+    Every lookup reads the token (one cache round trip) and drops the
+    local entries loaded under an older one, so all processes see a change
+    at once. ``settings.TAXI_MANUFACTURER_CACHE_TTL`` still bounds how long
+    a process keeps an entry, e.g. after a queryset ``update()``.
+
+    Only the fields shown next to a car are cached; the others are
+    deferred on the returned instances.
+    """
+
+    FIELDS = ("id", "name", "country")
+
+    # Entries of older versions are never read again; let them expire.
+    SHARED_TIMEOUT = 86400
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._version = None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+    def get_many(self, pks):
+        """Map each pk of an existing manufacturer to an instance."""
+        pks = set(pks) - {None}
+        if not pks:
+            return {}
+        version = get_version(("manufacturers",))
+        found = self._get_local(version, pks)
+        missing = pks - found.keys()
+        if missing:
+            loaded = self._load(version, missing)
+            self._set_local(version, loaded)
+            found.update(loaded)
+        db = router.db_for_read(Manufacturer)
+        return {
+            pk: Manufacturer.from_db(db, self.FIELDS, values)
+            for pk, values in found.items()
+        }
+
+    def _get_local(self, version, pks):
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            for pk in pks:
+                entry = self._entries.get(pk)
+                if entry is None:
+                    continue
+                expires, values = entry
+                if expires <= now:
+                    del self._entries[pk]
+                    continue
+                self._entries.move_to_end(pk)
+                found[pk] = values
+        return found
+
+    def _set_local(self, version, loaded):
+        expires = time.monotonic() + settings.TAXI_MANUFACTURER_CACHE_TTL
+        with self._lock:
+            if version != self._version:
+                return
+            for pk, values in loaded.items():
+                self._entries[pk] = (expires, values)
+                self._entries.move_to_end(pk)
+            while len(self._entries) > settings.TAXI_MANUFACTURER_CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+    def _load(self, version, pks):
+        """Values of ``pks`` from the shared cache, else the database."""
+        keys = {
+            f"{MANUFACTURER_KEY_PREFIX}:{version}:{pk}": pk for pk in pks
+        }
+        loaded = {
+            keys[key]: values for key, values in cache.get_many(keys).items()
+        }
+        missing = pks - loaded.keys()
+        if missing:
+            rows = {
+                values[0]: values
+                for values in Manufacturer.objects.filter(
+                    pk__in=missing
+                ).values_list(*self.FIELDS)
+            }
+            cache.set_many(
+                {key: rows[pk] for key, pk in keys.items() if pk in rows},
+                timeout=self.SHARED_TIMEOUT,
+            )
+            loaded.update(rows)
+        return loaded
+
+
+manufacturer_cache = ManufacturerCache()
+
+
+def attach_manufacturers(cars):
+    """Set the ``manufacturer`` of ``cars`` from ``manufacturer_cache``.
+
+    Saves joining the manufacturer table when loading the cars.
+    """
+    manufacturers = manufacturer_cache.get_many(
+        car.manufacturer_id for car in cars
+    )
+    field = Car._meta.get_field("manufacturer")
+    for car in cars:
+        manufacturer = manufacturers.get(car.manufacturer_id)
+        if manufacturer is not None:
+            field.set_cached_value(car, manufacturer)
+    return cars
@@ -0,0 +1,133 @@
+import hashlib
+from calendar import timegm
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from taxi.cache import get_version
+
+
+def list_validators(queryset):
+    """Newest ``updated_at`` of the model and its deletion token.
+
+    The timestamp is taken over the whole table, not ``queryset``: a row
+    edited so that it leaves the filter would not move the filtered
+    maximum. Deletions do not move it either, hence the ``"deleted"``
+    version token bumped by ``taxi.signals``. Unlike a ``COUNT(*)``, the
+    unfiltered ``MAX`` is answered from the index, which keeps
+    cursor-paginated pages free of full scans.
+    """
+    model = queryset.model
+    updated_at = model._base_manager.using(queryset.db).aggregate(
+        updated_at=Max("updated_at")
+    )
+    return (
+        updated_at["updated_at"],
+        get_version(("deleted", model._meta.label_lower)),
+    )
+
+
+def detail_validators(queryset, pk, related_updated_at=()):
+    """Newest ``updated_at`` of the object and of its related rows.
+
+    ``related_updated_at`` names the related timestamps. Returns ``None``
+    if there is no such object.
+    """
+    fields = ("updated_at", *related_updated_at)
+    aggregate = queryset.filter(pk=pk).aggregate(
+        *(Max(field) for field in fields)
+    )
+    validators = tuple(aggregate.values())
+    if validators[0] is None:
+        return None
+    return validators
+
+
+def check_validators(request, validators, last_modified=False):
+    """Return a 304 response (or ``None``) and the validator headers.
+
+    The response is 304 Not Modified if the client's copy is current. The
+    ETag hashes ``validators`` together with the user and the CSRF
+    cookie, since the templates render both.
+    """
+    parts = (
+        validators,
+        request.user.pk,
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME),
+    )
+    etag = quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
+    headers = {"ETag": etag}
+    timestamp = None
+    timestamps = [value for value in validators if value is not None]
+    if last_modified and timestamps:
+        timestamp = timegm(max(timestamps).utctimetuple())
+        headers["Last-Modified"] = http_date(timestamp)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=timestamp
+    )
+    return response, headers
+
+
+def add_headers(response, headers):
+    for name, value in headers.items():
+        if not response.has_header(name):
+            response[name] = value
+    return response
+
+
+class ConditionalGetMixin:
+    """Answer GET/HEAD with 304 Not Modified when the page is unchanged.
+
+    Views describe their content with ``get_validators()``, which should
+    cost a single aggregate query and must not run the main queryset.
+    It returns the values the page depends on, or ``None`` to skip the
+    check.
+
+    Only views that set ``last_modified_validators`` also send
+    ``Last-Modified``: list pages cannot, as deleting a row does not move
+    the newest timestamp of the others.
+    """
+
+    last_modified_validators = False
+
+    def get_validators(self):
+        return None
+
+    def get(self, request, *args, **kwargs):
+        validators = self.get_validators()
+        if validators is None:
+            return super().get(request, *args, **kwargs)
+        response, headers = check_validators(
+            request, validators, self.last_modified_validators
+        )
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        return add_headers(response, headers)
+
+
+class ConditionalListMixin(ConditionalGetMixin):
+    """Validate list pages with ``list_validators``."""
+
+    def get_validators(self):
+        return list_validators(self.get_queryset())
+
+
+class ConditionalDetailMixin(ConditionalGetMixin):
+    """Validate detail pages with ``detail_validators``.
+
+    ``related_updated_at`` names the timestamps of related rows shown on
+    the page, e.g. ``("drivers__updated_at",)``.
+    """
+
+    last_modified_validators = True
+    related_updated_at = ()
+
+    def get_validators(self):
+        # None for a missing object: the view then raises its 404.
+        return detail_validators(
+            self.model._default_manager,
+            self.kwargs[self.pk_url_kwarg],
+            self.related_updated_at,
+        )
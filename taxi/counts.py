@@ -0,0 +1,64 @@
+"""Denormalized per-row counts shown and sorted on in the list pages.
+
+``Car.num_drivers``, ``Driver.num_cars`` and ``Manufacturer.num_cars`` are
+recomputed from the related rows by ``refresh_counts`` whenever
+``taxi.signals`` sees them change, in the same transaction as the change.
+Recomputing (rather than adding deltas) keeps them right when a removal
+names unassigned pairs, and lets ``repair_counts`` fix any drift left by
+bulk writes in one ``UPDATE`` per table.
+"""
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from taxi.models import Car, Driver, Manufacturer
+
+Assignment = Car.drivers.through
+
+# (model, count field) -> (related model, its foreign key to the model)
+COUNTS = {
+    (Car, "num_drivers"): (Assignment, "car"),
+    (Driver, "num_cars"): (Assignment, "driver"),
+    (Manufacturer, "num_cars"): (Car, "manufacturer"),
+}
+
+
+def actual_count(related_model, foreign_key):
+    related = (
+        related_model._default_manager.filter(**{foreign_key: OuterRef("pk")})
+        .order_by()
+        .values(foreign_key)
+        .annotate(count=Count("*"))
+        .values("count")
+    )
+    return Coalesce(Subquery(related), 0)
+
+
+def refresh_counts(model, field, pks=None, touch=False):
+    """Recompute ``field`` for the rows in ``pks`` (all if ``None``).
+
+    Only rows whose count is wrong are written, unless ``touch`` is set,
+    and their ``updated_at`` moves so the list pages showing the count
+    are no longer "Not Modified". Returns the number of rows written.
+    """
+    related_model, foreign_key = COUNTS[model, field]
+    queryset = model._default_manager.all()
+    if pks is not None:
+        pks = {pk for pk in pks if pk is not None}
+        if not pks:
+            return 0
+        queryset = queryset.filter(pk__in=pks)
+    count = actual_count(related_model, foreign_key)
+    if not touch:
+        queryset = queryset.annotate(actual=count).exclude(
+            **{field: F("actual")}
+        )
+    return queryset.update(**{field: count, "updated_at": timezone.now()})
+
+
+def repair_counts():
+    """Recompute every count; return the rows fixed per count."""
+    return {
+        f"{model._meta.model_name}.{field}": refresh_counts(model, field)
+        for model, field in COUNTS
+    }
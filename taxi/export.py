@@ -0,0 +1,95 @@
+"""Streaming CSV/JSONL serialization of cars, drivers and assignments.
+
+Rows are read with ``.values_list()`` in primary-key ordered chunks, so no
+model instances are created and memory stays flat regardless of the
+number of exported rows.
+"""
+import csv
+import json
+from collections import defaultdict
+
+from taxi.models import Car
+
+CHUNK_SIZE = 2000
+
+
+class Echo:
+    """File-like object whose ``write`` returns the value instead."""
+
+    def write(self, value):
+        return value
+
+
+def iter_chunks(queryset, fields, chunk_size=CHUNK_SIZE):
+    """Yield lists of ``values_list`` tuples, keyset-paginated on pk.
+
+    The primary key must be the first entry of ``fields``.
+    """
+    queryset = queryset.order_by("pk").values_list(*fields)
+    last_pk = None
+    while True:
+        chunk_queryset = queryset
+        if last_pk is not None:
+            chunk_queryset = queryset.filter(pk__gt=last_pk)
+        chunk = list(chunk_queryset[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1][0]
+
+
+def car_rows(queryset):
+    yield ("id", "model", "manufacturer", "drivers")
+    through = Car.drivers.through
+    for chunk in iter_chunks(queryset, ("id", "model", "manufacturer__name")):
+        drivers = defaultdict(list)
+        assignments = through.objects.filter(
+            car_id__in=[row[0] for row in chunk]
+        ).values_list("car_id", "driver__username")
+        for car_id, username in assignments:
+            drivers[car_id].append(username)
+        for car_id, model, manufacturer in chunk:
+            yield car_id, model, manufacturer, drivers[car_id]
+
+
+def driver_rows(queryset):
+    fields = ("id", "username", "first_name", "last_name", "license_number")
+    yield fields
+    for chunk in iter_chunks(queryset, fields):
+        yield from chunk
+
+
+def assignment_rows(cars, drivers):
+    """Assignments of the cars in ``cars`` to the drivers in ``drivers``."""
+    queryset = Car.drivers.through.objects.all()
+    if cars.query.has_filters():
+        queryset = queryset.filter(car__in=cars.values("pk"))
+    if drivers.query.has_filters():
+        queryset = queryset.filter(driver__in=drivers.values("pk"))
+    yield ("car", "driver")
+    for chunk in iter_chunks(queryset, ("id", "car_id", "driver__username")):
+        for _, car_id, username in chunk:
+            yield car_id, username
+
+
+def as_csv(rows):
+    writer = csv.writer(Echo())
+    for row in rows:
+        yield writer.writerow(
+            [
+                " ".join(value) if isinstance(value, list) else value
+                for value in row
+            ]
+        )
+
+
+def as_jsonl(rows):
+    header = next(rows)
+    for row in rows:
+        yield json.dumps(dict(zip(header, row))) + "\n"
+
+
+FORMATS = {
+    "csv": (as_csv, "text/csv"),
+    "jsonl": (as_jsonl, "application/x-ndjson"),
+}
@@ -1,15 +1,19 @@
+import csv
+import io
+
 from django import forms
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
 from django.core.exceptions import ValidationError
 
 from taxi.models import Car, Driver
+from taxi.widgets import DriverAutocompleteWidget
 
 
 class CarForm(forms.ModelForm):
     drivers = forms.ModelMultipleChoiceField(
         queryset=get_user_model().objects.all(),
-        widget=forms.CheckboxSelectMultiple,
+        widget=DriverAutocompleteWidget,
     )
 
     class Meta:
@@ -52,6 +56,42 @@ class DriverLicenseUpdateForm(forms.ModelForm):
         return validate_license_number(self.cleaned_data["license_number"])
 
 
+class DriverProvisionForm(forms.Form):
+    UPLOAD_LIMIT = 500
+    # Passwords are hashed within the request, on a single process.
+    PASSWORD_LIMIT = 20
+
+    csv_file = forms.FileField(
+        help_text=(
+            "CSV with username, license_number and optional first_name, "
+            f"last_name, email, password columns, at most {UPLOAD_LIMIT} "
+            f"rows ({PASSWORD_LIMIT} with a password)."
+        )
+    )
+
+    def clean_csv_file(self):
+        try:
+            text = self.cleaned_data["csv_file"].read().decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise ValidationError("The file should be UTF-8 encoded")
+        rows = list(csv.DictReader(io.StringIO(text)))
+        if not rows:
+            raise ValidationError("The file has no rows")
+        if len(rows) > self.UPLOAD_LIMIT:
+            raise ValidationError(
+                f"At most {self.UPLOAD_LIMIT} rows per upload; use "
+                f"manage.py provision_drivers for larger batches"
+            )
+        if sum(bool(row.get("password")) for row in rows) > (
+            self.PASSWORD_LIMIT
+        ):
+            raise ValidationError(
+                f"At most {self.PASSWORD_LIMIT} rows with a password per "
+                f"upload; use manage.py provision_drivers for larger batches"
+            )
+        return rows
+
+
 class DriverSearchForm(forms.Form):
     username = forms.CharField(
         max_length=255,
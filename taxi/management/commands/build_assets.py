@@ -0,0 +1,39 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from taxi.assets import AssetError, build_bundles, vendor
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Vendor third-party CSS, build the minified CSS bundles and run "
+        "collectstatic to fingerprint and precompress them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fetch",
+            action="store_true",
+            help="Download missing vendored files (checking their hash).",
+        )
+        parser.add_argument(
+            "--no-collectstatic",
+            action="store_false",
+            dest="collectstatic",
+            help="Only build the bundles under static/dist/.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            vendor(fetch=options["fetch"])
+        except (AssetError, OSError) as e:
+            raise CommandError(str(e))
+        for bundle, size in build_bundles().items():
+            self.stdout.write(f"{bundle}: {size} bytes")
+        if options["collectstatic"]:
+            call_command(
+                "collectstatic",
+                interactive=False,
+                verbosity=options["verbosity"],
+                stdout=self.stdout,
+            )
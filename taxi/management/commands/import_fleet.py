@@ -0,0 +1,311 @@
+import csv
+import itertools
+import json
+import os
+import time
+from pathlib import Path
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from taxi.cache import bump_versions
+from taxi.counts import repair_counts
+from taxi.forms import validate_license_number
+from taxi.models import Car, Driver, FleetCounters, Manufacturer
+
+
+def read_rows(path):
+    """Yield one dict per record of a ``.csv`` or ``.jsonl`` file."""
+    path = Path(path)
+    with path.open(newline="", encoding="utf-8") as file:
+        if path.suffix == ".csv":
+            yield from csv.DictReader(file)
+        elif path.suffix in (".jsonl", ".ndjson"):
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            raise CommandError(
+                f"{path}: unsupported format, expected .csv or .jsonl"
+            )
+
+
+def insert_new(model, instances, *keys):
+    """``bulk_create`` the ``instances`` that are new; return those.
+
+    Each of ``keys`` is a unique field name, or a tuple of names for a
+    unique constraint. Instances whose key is already in the table (one
+    indexed ``IN`` query per key) or earlier in the batch are left out,
+    so the result counts the rows inserted without counting the table.
+    A key containing ``None`` is left to the database.
+    """
+    keys = [key if isinstance(key, tuple) else (key,) for key in keys]
+
+    def key_value(instance, key):
+        # to_python() turns e.g. an id read from a file into an int.
+        return tuple(
+            model._meta.get_field(field).to_python(getattr(instance, field))
+            for field in key
+        )
+
+    values = [
+        [key_value(instance, key) for key in keys] for instance in instances
+    ]
+    taken = []
+    for number, key in enumerate(keys):
+        lookups = {
+            f"{field}__in": {row[number][position] for row in values}
+            - {None}
+            for position, field in enumerate(key)
+        }
+        taken.append(set(model.objects.filter(**lookups).values_list(*key)))
+
+    new = []
+    for instance, instance_values in zip(instances, values):
+        if any(
+            value in taken[number]
+            for number, value in enumerate(instance_values)
+        ):
+            continue
+        for number, value in enumerate(instance_values):
+            if None not in value:
+                taken[number].add(value)
+        new.append(instance)
+    # Rows inserted concurrently since the check are still ignored.
+    model.objects.bulk_create(new, ignore_conflicts=True)
+    return new
+
+
+class Checkpoint:
+    """Number of rows of an input file that are already committed."""
+
+    def __init__(self, path):
+        self.path = Path(f"{path}.progress")
+
+    def load(self):
+        try:
+            return int(self.path.read_text())
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def save(self, rows):
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(str(rows))
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        self.path.unlink(missing_ok=True)
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Stream manufacturers, drivers, cars and car assignments from "
+        "CSV/JSONL files into the database in batched transactions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--manufacturers", help="File with name, country columns."
+        )
+        parser.add_argument(
+            "--drivers",
+            help=(
+                "File with username, license_number and optional "
+                "first_name, last_name, email, password columns."
+            ),
+        )
+        parser.add_argument(
+            "--cars",
+            help=(
+                "File with model, manufacturer (name) and optional id "
+                "columns."
+            ),
+        )
+        parser.add_argument(
+            "--assignments",
+            help="File with car (id) and driver (username) columns.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help=(
+                "Skip the rows committed by a previous, interrupted run, "
+                "as recorded in <file>.progress."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options["batch_size"]
+        self.resume = options["resume"]
+        self.verbosity = options["verbosity"]
+        steps = (
+            ("manufacturers", self.import_manufacturers),
+            ("drivers", self.import_drivers),
+            ("cars", self.import_cars),
+            ("assignments", self.import_assignments),
+        )
+        if not any(options[name] for name, _ in steps):
+            raise CommandError("Nothing to import.")
+
+        self.manufacturer_ids = dict(
+            Manufacturer.objects.values_list("name", "id")
+        )
+        for name, import_batch in steps:
+            if options[name]:
+                self.import_file(name, options[name], import_batch)
+        FleetCounters.reconcile()
+        # bulk_create() sends no signals.
+        repair_counts()
+
+    def import_file(self, name, path, import_batch):
+        checkpoint = Checkpoint(path)
+        done = checkpoint.load() if self.resume else 0
+        rows = itertools.islice(read_rows(path), done, None)
+        if done:
+            self.stdout.write(f"{name}: resuming after row {done}")
+
+        imported = skipped = 0
+        start = time.perf_counter()
+        while True:
+            batch = list(itertools.islice(rows, self.batch_size))
+            if not batch:
+                break
+            with transaction.atomic():
+                count, errors = import_batch(batch, first_row=done + 1)
+            done += len(batch)
+            checkpoint.save(done)
+            imported += count
+            # Invalid rows, and rows already in the database.
+            skipped += len(batch) - count
+            for error in errors:
+                self.stderr.write(f"{name}: {error}")
+            if self.verbosity > 1:
+                self.stdout.write(f"{name}: {done} rows processed")
+
+        checkpoint.clear()
+        elapsed = time.perf_counter() - start
+        rate = imported / elapsed if elapsed else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{name}: {imported} imported, {skipped} skipped "
+                f"in {elapsed:.1f}s ({rate:.0f} rows/sec)"
+            )
+        )
+
+    def import_manufacturers(self, batch, first_row):
+        manufacturers, errors = [], []
+        for number, row in enumerate(batch, first_row):
+            name = (row.get("name") or "").strip()
+            if not name:
+                errors.append(f"row {number}: name is required")
+                continue
+            if name not in self.manufacturer_ids:
+                manufacturers.append(
+                    Manufacturer(name=name, country=row.get("country", ""))
+                )
+        imported = len(insert_new(Manufacturer, manufacturers, "name"))
+        self.manufacturer_ids.update(
+            Manufacturer.objects.filter(
+                name__in=[manufacturer.name for manufacturer in manufacturers]
+            ).values_list("name", "id")
+        )
+        return imported, errors
+
+    def import_drivers(self, batch, first_row):
+        drivers, errors = [], []
+        unusable_password = make_password(None)
+        for number, row in enumerate(batch, first_row):
+            try:
+                license_number = validate_license_number(
+                    row.get("license_number") or ""
+                )
+            except ValidationError as e:
+                errors.append(f"row {number}: {' '.join(e.messages)}")
+                continue
+            if not row.get("username"):
+                errors.append(f"row {number}: username is required")
+                continue
+            drivers.append(
+                Driver(
+                    username=row["username"],
+                    license_number=license_number,
+                    first_name=row.get("first_name", ""),
+                    last_name=row.get("last_name", ""),
+                    email=row.get("email", ""),
+                    password=(
+                        make_password(row["password"])
+                        if row.get("password")
+                        else unusable_password
+                    ),
+                )
+            )
+        imported = insert_new(Driver, drivers, "username", "license_number")
+        return len(imported), errors
+
+    def import_cars(self, batch, first_row):
+        cars, errors = [], []
+        for number, row in enumerate(batch, first_row):
+            manufacturer = row.get("manufacturer")
+            manufacturer_id = self.manufacturer_ids.get(manufacturer)
+            if manufacturer_id is None:
+                errors.append(
+                    f"row {number}: unknown manufacturer {manufacturer!r}"
+                )
+                continue
+            cars.append(
+                Car(
+                    id=row.get("id") or None,
+                    model=row.get("model", ""),
+                    manufacturer_id=manufacturer_id,
+                )
+            )
+        return len(insert_new(Car, cars, "id")), errors
+
+    def import_assignments(self, batch, first_row):
+        rows = []
+        for row in batch:
+            try:
+                car_id = int(row.get("car"))
+            except (TypeError, ValueError):
+                car_id = None
+            rows.append((car_id, row.get("driver")))
+
+        driver_ids = dict(
+            Driver.objects.filter(
+                username__in={username for _, username in rows}
+            ).values_list("username", "id")
+        )
+        car_ids = set(
+            Car.objects.filter(
+                id__in={car_id for car_id, _ in rows if car_id is not None}
+            ).values_list("id", flat=True)
+        )
+
+        through = Car.drivers.through
+        assignments, errors = [], []
+        for number, (car_id, username) in enumerate(rows, first_row):
+            driver_id = driver_ids.get(username)
+            if driver_id is None or car_id not in car_ids:
+                errors.append(
+                    f"row {number}: unknown car {car_id!r} "
+                    f"or driver {username!r}"
+                )
+                continue
+            assignments.append(through(car_id=car_id, driver_id=driver_id))
+        assignments = insert_new(
+            through, assignments, ("car_id", "driver_id")
+        )
+        # bulk_create sends no m2m_changed, so invalidate the detail pages
+        # of the affected cars and drivers here, once per batch.
+        assigned_cars = {row.car_id for row in assignments}
+        assigned_drivers = {row.driver_id for row in assignments}
+        now = timezone.now()
+        Car.objects.filter(id__in=assigned_cars).update(updated_at=now)
+        Driver.objects.filter(id__in=assigned_drivers).update(updated_at=now)
+        bump_versions("car", assigned_cars)
+        bump_versions("driver", assigned_drivers)
+        return len(assignments), errors
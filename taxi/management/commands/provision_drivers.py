@@ -0,0 +1,67 @@
+import itertools
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from taxi.management.commands.import_fleet import read_rows
+from taxi.provisioning import provision_drivers
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Create drivers with passwords from a CSV/JSONL file, hashing the "
+        "passwords on a process pool and inserting them in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "file",
+            help=(
+                "File with username, license_number and optional "
+                "first_name, last_name, email, password columns."
+            ),
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help=(
+                "Password hashing processes (default: "
+                "TAXI_PROVISION_WORKERS, or one per CPU)."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        rows = read_rows(options["file"])
+        created = skipped = done = 0
+        start = time.perf_counter()
+        while True:
+            batch = list(itertools.islice(rows, options["batch_size"]))
+            if not batch:
+                break
+            try:
+                count, errors = provision_drivers(
+                    batch, first_row=done + 1, workers=options["workers"]
+                )
+            except IntegrityError as e:
+                raise CommandError(
+                    f"rows {done + 1}-{done + len(batch)} conflict with "
+                    f"drivers created meanwhile, run again: {e}"
+                )
+            done += len(batch)
+            created += count
+            skipped += len(errors)
+            for error in errors:
+                self.stderr.write(error)
+            if options["verbosity"] > 1:
+                self.stdout.write(f"{done} rows processed")
+
+        elapsed = time.perf_counter() - start
+        rate = created / elapsed if elapsed else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{created} drivers created, {skipped} skipped "
+                f"in {elapsed:.1f}s ({rate:.1f} drivers/sec)"
+            )
+        )
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from taxi.search import install_search_indexes
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Recreate the FTS5 search tables and triggers and repopulate them "
+        "from the car, driver and manufacturer tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database to rebuild the index in.",
+        )
+
+    def handle(self, *args, **options):
+        install_search_indexes(options["database"], rebuild=True)
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
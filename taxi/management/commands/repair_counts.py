@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from taxi.counts import repair_counts
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Recompute the per-row car and driver counts from the related "
+        "tables in one UPDATE per table, fixing any drift."
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            fixed = repair_counts()
+        if any(fixed.values()):
+            self.stdout.write(self.style.WARNING(f"Counts corrected: {fixed}"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Counts OK"))
@@ -0,0 +1,171 @@
+import random
+import string
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+
+from taxi.counts import repair_counts
+from taxi.models import Car, Driver, FleetCounters, Manufacturer
+
+SEED_PASSWORD = "taxi-seed-password"
+
+FIRST_NAMES = [
+    "Andrii", "Bohdan", "Dmytro", "Iryna", "Kateryna", "Mykola", "Nadiia",
+    "Oksana", "Olena", "Petro", "Serhii", "Taras", "Vira", "Yurii",
+]
+LAST_NAMES = [
+    "Bondarenko", "Boyko", "Hrytsenko", "Kovalenko", "Kovalchuk",
+    "Kravchenko", "Melnyk", "Oliinyk", "Shevchenko", "Tkachenko",
+]
+MODELS = [
+    "Camry", "Corolla", "Civic", "Accord", "Golf", "Passat", "Octavia",
+    "Focus", "Fiesta", "Prius", "Leaf", "Ioniq", "Sportage", "Tucson",
+    "Outlander", "Qashqai", "Megane", "Logan", "Astra", "Insignia",
+]
+COUNTRIES = [
+    "Japan", "Germany", "USA", "South Korea", "France", "Czech Republic",
+    "Italy", "Romania", "United Kingdom", "Sweden",
+]
+
+
+def license_number(index):
+    """Unique ``AAA00000`` license number for the ``index``-th driver."""
+    prefix, number = divmod(index, 100000)
+    letters = ""
+    for _ in range(3):
+        prefix, letter = divmod(prefix, 26)
+        letters = string.ascii_uppercase[letter] + letters
+    return f"{letters}{number:05d}"
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def first_index(model):
+    """Where to number a run's names so they cannot repeat earlier ones.
+
+    Every existing row's name was numbered below its own id, so starting
+    from the highest id stays unique even after rows were deleted.
+    """
+    return model.objects.aggregate(first=Max("id"))["first"] or 0
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Fill the database with a reproducible synthetic fleet for "
+        f"benchmarking. Every driver's password is {SEED_PASSWORD!r}."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--manufacturers", type=int, default=100)
+        parser.add_argument("--cars", type=int, default=10000)
+        parser.add_argument("--drivers", type=int, default=1000)
+        parser.add_argument("--assignments-per-driver", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        if options["cars"] and not options["manufacturers"]:
+            raise CommandError("Cars need at least one manufacturer.")
+        if options["assignments_per_driver"] > options["cars"]:
+            raise CommandError(
+                "--assignments-per-driver cannot exceed --cars."
+            )
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+
+        start = time.perf_counter()
+        with transaction.atomic():
+            first_driver = first_index(Driver)
+            manufacturer_ids = self.seed_manufacturers(
+                options["manufacturers"]
+            )
+            driver_ids = self.seed_drivers(options["drivers"], first_driver)
+            car_ids = self.seed_cars(options["cars"], manufacturer_ids)
+            assignments = self.seed_assignments(
+                driver_ids, car_ids, options["assignments_per_driver"]
+            )
+            FleetCounters.reconcile()
+            # bulk_create() sends no signals.
+            repair_counts()
+        if not options["verbosity"]:
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {len(manufacturer_ids)} manufacturers, "
+                f"{len(driver_ids)} drivers, {len(car_ids)} cars and "
+                f"{assignments} assignments in "
+                f"{time.perf_counter() - start:.1f}s"
+            )
+        )
+
+    def seed_manufacturers(self, count):
+        first = first_index(Manufacturer)
+        Manufacturer.objects.bulk_create(
+            Manufacturer(
+                name=f"Manufacturer {first + i}",
+                country=self.rng.choice(COUNTRIES),
+            )
+            for i in range(count)
+        )
+        ids = Manufacturer.objects.order_by("-id").values_list("id", flat=True)
+        return list(ids[:count])
+
+    def seed_drivers(self, count, first):
+        password = make_password(SEED_PASSWORD)
+        Driver.objects.bulk_create(
+            (
+                Driver(
+                    username=f"driver{first + i}",
+                    license_number=license_number(first + i),
+                    first_name=self.rng.choice(FIRST_NAMES),
+                    last_name=self.rng.choice(LAST_NAMES),
+                    password=password,
+                )
+                for i in range(count)
+            ),
+            batch_size=self.batch_size,
+        )
+        ids = Driver.objects.order_by("-id").values_list("id", flat=True)
+        return list(ids[:count])
+
+    def seed_cars(self, count, manufacturer_ids):
+        Car.objects.bulk_create(
+            (
+                Car(
+                    model=(
+                        f"{self.rng.choice(MODELS)} "
+                        f"{self.rng.randrange(1990, 2025)}"
+                    ),
+                    manufacturer_id=self.rng.choice(manufacturer_ids),
+                )
+                for _ in range(count)
+            ),
+            batch_size=self.batch_size,
+        )
+        ids = Car.objects.order_by("-id").values_list("id", flat=True)
+        return list(ids[:count])
+
+    def seed_assignments(self, driver_ids, car_ids, per_driver):
+        through = Car.drivers.through
+        assignments = (
+            through(driver_id=driver_id, car_id=car_id)
+            for driver_id in driver_ids
+            for car_id in self.rng.sample(car_ids, per_driver)
+        )
+        total = 0
+        for batch in batched(assignments, self.batch_size):
+            through.objects.bulk_create(batch)
+            total += len(batch)
+        return total
@@ -0,0 +1,58 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Copy the primary SQLite database into the read replicas from "
+        "TAXI_READ_REPLICAS, once or every --interval seconds. A local "
+        "stand-in for real replication."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths",
+            nargs="*",
+            help="Replica files to write (default: the configured ones).",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Keep syncing, sleeping this many seconds in between.",
+        )
+
+    def handle(self, *args, **options):
+        paths = options["paths"] or [
+            settings.DATABASES[alias]["NAME"]
+            for alias in settings.TAXI_READ_REPLICAS
+        ]
+        if not paths:
+            raise CommandError("No replicas configured or given.")
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != "sqlite":
+            raise CommandError("Only SQLite primaries can be copied.")
+
+        while True:
+            start = time.perf_counter()
+            primary.ensure_connection()
+            for path in paths:
+                replica = sqlite3.connect(path, timeout=20)
+                try:
+                    # The backup API copies a consistent snapshot and
+                    # writes the replica in a single transaction, so its
+                    # readers never see a half-copied file.
+                    primary.connection.backup(replica)
+                finally:
+                    replica.close()
+            if options["verbosity"]:
+                self.stdout.write(
+                    f"Synced {len(paths)} replica(s) in "
+                    f"{time.perf_counter() - start:.2f}s"
+                )
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
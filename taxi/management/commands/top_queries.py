@@ -0,0 +1,83 @@
+import json
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Summarize the slow-query log by fingerprint, ordered by total "
+        "time. Totals and counts are scaled up by the sample rate."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "log",
+            nargs="?",
+            help="Log file to read (default: TAXI_SLOW_QUERY_LOG).",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=10,
+            help="Number of fingerprints to show.",
+        )
+        parser.add_argument(
+            "--route", help="Only count queries of this URL name."
+        )
+
+    def handle(self, *args, **options):
+        path = options["log"] or settings.TAXI_SLOW_QUERY_LOG
+        try:
+            with open(path) as log:
+                records = [json.loads(line) for line in log if line.strip()]
+        except FileNotFoundError:
+            raise CommandError(f"No slow-query log at {path}.")
+        except ValueError as e:
+            raise CommandError(f"Malformed slow-query log {path}: {e}")
+
+        stats = {}
+        for record in records:
+            if options["route"] and record["route"] != options["route"]:
+                continue
+            weight = 1 / record["sample_rate"]
+            entry = stats.setdefault(
+                record["fingerprint"],
+                {
+                    "sql": record["sql"],
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "routes": Counter(),
+                    "plan": None,
+                },
+            )
+            entry["count"] += weight
+            entry["total_ms"] += record["duration_ms"] * weight
+            entry["max_ms"] = max(entry["max_ms"], record["duration_ms"])
+            entry["routes"][record["route"] or "-"] += 1
+            entry["plan"] = record["plan"] or entry["plan"]
+
+        top = sorted(
+            stats.items(), key=lambda item: item[1]["total_ms"], reverse=True
+        )[:options["limit"]]
+        if not top:
+            self.stdout.write("No slow queries logged.")
+        for fingerprint, entry in top:
+            routes = ", ".join(
+                f"{route} ({count})"
+                for route, count in entry["routes"].most_common()
+            )
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{fingerprint}  total {entry['total_ms']:.1f}ms  "
+                    f"count {entry['count']:.0f}  "
+                    f"mean {entry['total_ms'] / entry['count']:.1f}ms  "
+                    f"max {entry['max_ms']:.1f}ms"
+                )
+            )
+            self.stdout.write(f"  routes: {routes}")
+            self.stdout.write(f"  sql: {entry['sql']}")
+            for step in entry["plan"] or []:
+                self.stdout.write(f"  plan: {step}")
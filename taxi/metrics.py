@@ -0,0 +1,214 @@
+"""Per-route request timings for production use.
+
+``MetricsMiddleware`` measures each request's SQL query count and time,
+template render time and total time. It adds them to per-route
+histograms, which ``metrics_view`` serves in the Prometheus text format,
+and with ``settings.TAXI_SERVER_TIMING`` to the response as a
+``Server-Timing`` header. Routes are labelled with their URL name, so
+the number of series stays bounded.
+
+Template time is measured by ``taxi.metrics.DjangoTemplates``, the
+template backend configured in ``settings.TEMPLATES``. The histograms are
+per process: under several workers, each scrape sees the worker that
+answered it.
+"""
+import bisect
+import hmac
+import threading
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.template.backends import django as django_backend
+from django.utils.deprecation import MiddlewareMixin
+
+from taxi.middleware import QueryCounter
+
+DURATION_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+
+QUERY_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+UNRESOLVED = "<unresolved>"
+
+_current = ContextVar("taxi_request_metrics", default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = QueryCounter()
+        self.template_time = 0.0
+        self.rendering = False
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def samples(self, name, labels):
+        cumulative = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f"{name}_sum{{{labels}}} {self.sum:.6f}"
+        yield f"{name}_count{{{labels}}} {cumulative}"
+
+
+class Registry:
+    """Histograms of every metric in ``METRICS`` per route."""
+
+    METRICS = {
+        "taxi_request_duration_seconds": (
+            "Time spent handling the request",
+            DURATION_BUCKETS,
+        ),
+        "taxi_db_duration_seconds": (
+            "Time spent running SQL queries",
+            DURATION_BUCKETS,
+        ),
+        "taxi_db_queries": ("SQL queries per request", QUERY_BUCKETS),
+        "taxi_template_duration_seconds": (
+            "Time spent rendering templates",
+            DURATION_BUCKETS,
+        ),
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def observe(self, route, values):
+        with self._lock:
+            histograms = self._routes.get(route)
+            if histograms is None:
+                histograms = self._routes[route] = {
+                    name: Histogram(buckets)
+                    for name, (_, buckets) in self.METRICS.items()
+                }
+            for name, value in values.items():
+                histograms[name].observe(value)
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for name, (description, _) in self.METRICS.items():
+                lines.append(f"# HELP {name} {description}.")
+                lines.append(f"# TYPE {name} histogram")
+                for route, histograms in sorted(self._routes.items()):
+                    lines.extend(
+                        histograms[name].samples(name, f'route="{route}"')
+                    )
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+class MetricsMiddleware(MiddlewareMixin):
+    """Time requests for ``registry`` and ``Server-Timing``.
+
+    Enabled with ``settings.TAXI_METRICS``. Streamed response bodies are
+    produced after the middleware returns and are not included.
+    """
+
+    def process_request(self, request):
+        if not settings.TAXI_METRICS:
+            return
+        request._metrics = metrics = RequestMetrics()
+        request._metrics_stack = stack = ExitStack()
+        metrics.queries.install(stack)
+        _current.set(metrics)
+
+    def process_response(self, request, response):
+        metrics = getattr(request, "_metrics", None)
+        if metrics is None:
+            return response
+        request._metrics_stack.close()
+        _current.set(None)
+        # A view returning an unrendered TemplateResponse has been
+        # rendered by now.
+        total = time.perf_counter() - metrics.start
+        match = request.resolver_match
+        registry.observe(
+            match.view_name if match else UNRESOLVED,
+            {
+                "taxi_request_duration_seconds": total,
+                "taxi_db_duration_seconds": metrics.queries.duration,
+                "taxi_db_queries": metrics.queries.count,
+                "taxi_template_duration_seconds": metrics.template_time,
+            },
+        )
+        if settings.TAXI_SERVER_TIMING:
+            response["Server-Timing"] = (
+                f"db;dur={metrics.queries.duration * 1000:.1f};"
+                f'desc="{metrics.queries.count} queries", '
+                f"tpl;dur={metrics.template_time * 1000:.1f}, "
+                f"total;dur={total * 1000:.1f}"
+            )
+        return response
+
+
+def can_scrape(request):
+    token = settings.TAXI_METRICS_TOKEN
+    if token and hmac.compare_digest(
+        request.headers.get("Authorization", ""), f"Bearer {token}"
+    ):
+        return True
+    return request.user.is_authenticated and request.user.is_staff
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint.
+
+    Served to requests bearing ``settings.TAXI_METRICS_TOKEN`` and to
+    staff users. The client address is not trusted: behind a local
+    reverse proxy every request comes from 127.0.0.1.
+    """
+    if not can_scrape(request):
+        raise Http404
+    return HttpResponse(
+        registry.render(), content_type="text/plain; version=0.0.4"
+    )
+
+
+class Template(django_backend.Template):
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None or metrics.rendering:
+            # Not measured, or nested in a measured render (e.g. a
+            # crispy form rendered from a page template).
+            return super().render(context, request)
+        metrics.rendering = True
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.template_time += time.perf_counter() - start
+            metrics.rendering = False
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    """The Django template backend, timing renders for the metrics."""
+
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return Template(self.engine.get_template(template_name), self)
+        except django_backend.TemplateDoesNotExist as exc:
+            django_backend.reraise(exc, self)
@@ -0,0 +1,99 @@
+import logging
+import time
+from collections import namedtuple
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.utils.deprecation import MiddlewareMixin
+
+logger = logging.getLogger("taxi.query_budget")
+
+
+class QueryBudget(
+    namedtuple(
+        "QueryBudget", ["get", "post", "time_ms"], defaults=[None] * 3
+    )
+):
+    """Maximum queries of a GET (or HEAD) and of a POST to a route.
+
+    A route answering only one of them leaves the other ``None``, which
+    is not checked; ``time_ms`` bounds the total query time of either.
+    """
+
+    __slots__ = ()
+
+    def queries(self, method):
+        return self.post if method == "POST" else self.get
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryCounter:
+    """Execute wrapper counting the queries it sees and their total time."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+    def install(self, stack):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self))
+
+
+class QueryBudgetMiddleware(MiddlewareMixin):
+    """Check each ``taxi:`` request against its budget in ``taxi.urls``.
+
+    ``settings.TAXI_QUERY_BUDGET_MODE`` selects what happens when a view
+    goes over budget: ``"log"`` emits a warning, ``"raise"`` raises
+    ``QueryBudgetExceeded`` and anything falsy disables the check.
+    """
+
+    def process_request(self, request):
+        if not settings.TAXI_QUERY_BUDGET_MODE:
+            return
+        # Installed and removed in the request's own thread, which under
+        # ASGI is also the one that runs the async views' queries.
+        request._query_counter = counter = QueryCounter()
+        request._query_counter_stack = stack = ExitStack()
+        counter.install(stack)
+
+    def process_response(self, request, response):
+        stack = getattr(request, "_query_counter_stack", None)
+        if stack is None:
+            return response
+        stack.close()
+        counter = request._query_counter
+
+        match = request.resolver_match
+        if match is None or match.app_name != "taxi":
+            return response
+
+        from taxi.urls import query_budgets
+
+        budget = query_budgets.get(match.url_name)
+        if budget is None:
+            return response
+        queries = budget.queries(request.method)
+        time_ms = counter.duration * 1000
+        if (queries is not None and counter.count > queries) or (
+            budget.time_ms is not None and time_ms > budget.time_ms
+        ):
+            message = (
+                f"{request.method} {match.view_name} ran {counter.count} "
+                f"queries in {time_ms:.1f}ms, over its budget of {budget}"
+            )
+            if settings.TAXI_QUERY_BUDGET_MODE == "raise":
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
@@ -0,0 +1,39 @@
+# Generated by Django 4.1 on 2026-10-17 06:48
+
+from django.db import migrations, models
+
+
+def populate_counters(apps, schema_editor):
+    FleetCounters = apps.get_model('taxi', 'FleetCounters')
+    Driver = apps.get_model('taxi', 'Driver')
+    Car = apps.get_model('taxi', 'Car')
+    Manufacturer = apps.get_model('taxi', 'Manufacturer')
+    FleetCounters.objects.create(
+        pk=1,
+        num_drivers=Driver.objects.count(),
+        num_cars=Car.objects.count(),
+        num_manufacturers=Manufacturer.objects.count(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taxi', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FleetCounters',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('num_drivers', models.PositiveBigIntegerField(default=0)),
+                ('num_cars', models.PositiveBigIntegerField(default=0)),
+                ('num_manufacturers', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'fleet counters',
+            },
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
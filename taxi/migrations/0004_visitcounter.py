@@ -0,0 +1,22 @@
+# Generated by Django 4.1 on 2026-10-17 07:11
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taxi', '0003_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisitCounter',
+            fields=[
+                ('driver', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='visit_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('visits', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
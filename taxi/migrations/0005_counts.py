@@ -0,0 +1,63 @@
+# Generated by Django 4.1 on 2026-10-17 07:40
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_counts(apps, schema_editor):
+    Car = apps.get_model('taxi', 'Car')
+    Driver = apps.get_model('taxi', 'Driver')
+    Manufacturer = apps.get_model('taxi', 'Manufacturer')
+    Assignment = Car.drivers.through
+    for model, field, related_model, foreign_key in (
+        (Car, 'num_drivers', Assignment, 'car'),
+        (Driver, 'num_cars', Assignment, 'driver'),
+        (Manufacturer, 'num_cars', Car, 'manufacturer'),
+    ):
+        related = (
+            related_model.objects.filter(**{foreign_key: OuterRef('pk')})
+            .order_by()
+            .values(foreign_key)
+            .annotate(count=Count('*'))
+            .values('count')
+        )
+        model.objects.update(**{field: Coalesce(Subquery(related), 0)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taxi', '0004_visitcounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='car',
+            name='num_drivers',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='driver',
+            name='num_cars',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='manufacturer',
+            name='num_cars',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['num_drivers', 'id'], name='taxi_car_num_dri_542a53_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='driver',
+            index=models.Index(fields=['num_cars', 'id'], name='taxi_driver_num_car_e6b0b6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='manufacturer',
+            index=models.Index(fields=['num_cars', 'id'], name='taxi_manufa_num_car_d7cfc0_idx'),
+        ),
+        migrations.RunPython(populate_counts, migrations.RunPython.noop),
+    ]
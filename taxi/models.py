@@ -1,25 +1,63 @@
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.contrib.auth.models import AbstractUser
 from django.urls import reverse
 
 
-class Manufacturer(models.Model):
+class CountFieldsMixin:
+    """Leave the counts maintained by ``taxi.counts`` out of updates.
+
+    An instance's counts go stale as soon as another request changes the
+    related rows, and saving them back would undo that change.
+    """
+
+    COUNT_FIELDS = ()
+
+    def save(self, *args, **kwargs):
+        if (
+            not self._state.adding
+            and not kwargs.get("force_insert")
+            and kwargs.get("update_fields") is None
+        ):
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.COUNT_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+
+class Manufacturer(CountFieldsMixin, models.Model):
     name = models.CharField(max_length=255, unique=True)
     country = models.CharField(max_length=255)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    # Maintained by taxi.counts.
+    num_cars = models.PositiveIntegerField(default=0, editable=False)
+
+    COUNT_FIELDS = ("num_cars",)
 
     class Meta:
         ordering = ["name"]
+        indexes = [models.Index(fields=["num_cars", "id"])]
 
     def __str__(self):
         return f"{self.name} {self.country}"
 
 
-class Driver(AbstractUser):
+class Driver(CountFieldsMixin, AbstractUser):
     license_number = models.CharField(max_length=255, unique=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    # Maintained by taxi.counts.
+    num_cars = models.PositiveIntegerField(default=0, editable=False)
+
+    COUNT_FIELDS = ("num_cars",)
 
     class Meta:
         verbose_name = "driver"
         verbose_name_plural = "drivers"
+        indexes = [models.Index(fields=["num_cars", "id"])]
 
     def __str__(self):
         return f"{self.username} ({self.first_name} {self.last_name})"
@@ -28,10 +66,92 @@ class Driver(AbstractUser):
         return reverse("taxi:driver-detail", kwargs={"pk": self.pk})
 
 
-class Car(models.Model):
+class Car(CountFieldsMixin, models.Model):
     model = models.CharField(max_length=255)
     manufacturer = models.ForeignKey(Manufacturer, on_delete=models.CASCADE)
     drivers = models.ManyToManyField(Driver, related_name="cars")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    # Maintained by taxi.counts.
+    num_drivers = models.PositiveIntegerField(default=0, editable=False)
+
+    COUNT_FIELDS = ("num_drivers",)
+
+    class Meta:
+        indexes = [models.Index(fields=["num_drivers", "id"])]
 
     def __str__(self):
         return self.model
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        car = super().from_db(db, field_names, values)
+        # Lets taxi.signals tell whose manufacturer changed on save.
+        car._loaded_manufacturer_id = car.__dict__.get("manufacturer_id")
+        return car
+
+
+class FleetCounters(models.Model):
+    """Single-row table with the record counts shown on the home page.
+
+    Kept up to date by the create/delete signal handlers in
+    ``taxi.signals``; ``reconcile`` recomputes it from the real tables.
+    """
+
+    SINGLETON_ID = 1
+
+    num_drivers = models.PositiveBigIntegerField(default=0)
+    num_cars = models.PositiveBigIntegerField(default=0)
+    num_manufacturers = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "fleet counters"
+
+    def __str__(self):
+        return (
+            f"{self.num_drivers} drivers, {self.num_cars} cars, "
+            f"{self.num_manufacturers} manufacturers"
+        )
+
+    @classmethod
+    def load(cls):
+        try:
+            return cls.objects.get(pk=cls.SINGLETON_ID)
+        except cls.DoesNotExist:
+            return cls.reconcile()
+
+    @classmethod
+    def reconcile(cls):
+        counters, _ = cls.objects.update_or_create(
+            pk=cls.SINGLETON_ID,
+            defaults={
+                "num_drivers": Driver.objects.count(),
+                "num_cars": Car.objects.count(),
+                "num_manufacturers": Manufacturer.objects.count(),
+            },
+        )
+        return counters
+
+    @classmethod
+    def increment(cls, field, delta=1):
+        # A counter that drifted low (e.g. after bulk inserts) stops at 0
+        # instead of failing the unsigned CHECK constraint of a delete.
+        updated = cls.objects.filter(pk=cls.SINGLETON_ID).update(
+            **{field: Greatest(F(field) + delta, 0)}
+        )
+        if not updated:
+            cls.reconcile()
+
+
+class VisitCounter(models.Model):
+    """Home page visits per driver, written in batches by ``taxi.visits``."""
+
+    driver = models.OneToOneField(
+        Driver,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="visit_counter",
+    )
+    visits = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.driver_id}: {self.visits} visits"
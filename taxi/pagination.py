@@ -0,0 +1,157 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from django.http import Http404
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class CursorPage:
+    """One page of a keyset-paginated queryset.
+
+    Mirrors the parts of ``django.core.paginator.Page`` the templates use,
+    but exposes opaque ``next_cursor``/``previous_cursor`` tokens instead
+    of page numbers.
+    """
+
+    is_cursor_page = True
+
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f"<CursorPage of {len(self.object_list)} objects>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset paginator that never runs ``COUNT(*)`` or ``OFFSET``.
+
+    ``ordering`` is a sequence of field names (optionally prefixed with
+    ``-``) that must uniquely identify a row, e.g. ``("id",)`` or
+    ``("name",)`` for the unique ``Manufacturer.name``. Each page is
+    fetched with a ``WHERE`` on the last seen key, so deep pages cost the
+    same as the first one.
+    """
+
+    def __init__(self, queryset, per_page, ordering):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+
+    def page(self, cursor=None):
+        position, backwards = self.decode_cursor(cursor)
+        ordering = self.ordering
+        if backwards:
+            ordering = tuple(self._reverse(field) for field in ordering)
+
+        queryset = self.queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._after(position, ordering))
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or backwards:
+                next_cursor = self.encode_cursor(rows[-1])
+            if (has_more and backwards) or (position and not backwards):
+                previous_cursor = self.encode_cursor(
+                    rows[0], backwards=True
+                )
+        return CursorPage(rows, next_cursor, previous_cursor)
+
+    def encode_cursor(self, row, backwards=False):
+        position = [
+            self._value(row, field.lstrip("-")) for field in self.ordering
+        ]
+        payload = json.dumps({"p": position, "b": backwards})
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            position, backwards = payload["p"], payload["b"]
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise InvalidCursor("Invalid cursor")
+        if not isinstance(position, list) or (
+            len(position) != len(self.ordering)
+        ):
+            raise InvalidCursor("Invalid cursor")
+        return position, bool(backwards)
+
+    @staticmethod
+    def _value(row, field):
+        if isinstance(row, dict):
+            return row[field]
+        return getattr(row, field)
+
+    @staticmethod
+    def _reverse(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    @staticmethod
+    def _after(position, ordering):
+        """Build the lexicographic "comes after ``position``" condition."""
+        condition = Q()
+        equal = {}
+        for field, value in zip(ordering, position):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= Q(**equal, **{f"{name}__{lookup}": value})
+            equal[name] = value
+        return condition
+
+
+class CursorPaginationMixin:
+    """Opt-in keyset pagination for ``ListView`` subclasses.
+
+    Enabled with ``settings.TAXI_CURSOR_PAGINATION``; otherwise the view
+    keeps Django's page-number pagination.
+    """
+
+    cursor_kwarg = "cursor"
+    cursor_ordering = ("id",)
+
+    def get_cursor_ordering(self, queryset):
+        return self.cursor_ordering
+
+    def paginate_queryset(self, queryset, page_size):
+        if not settings.TAXI_CURSOR_PAGINATION:
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = CursorPaginator(
+            queryset, page_size, ordering=self.get_cursor_ordering(queryset)
+        )
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor as e:
+            raise Http404(str(e))
+        return paginator, page, page.object_list, page.has_other_pages()
@@ -0,0 +1,156 @@
+"""Bulk driver creation for ``manage.py provision_drivers`` and the upload
+page.
+
+A batch of rows is validated in Python, checked for taken usernames and
+license numbers with one query, and inserted with ``bulk_create``. The
+password hashes, which dominate the cost (PBKDF2 is deliberately slow),
+are computed on a pool of ``settings.TAXI_PROVISION_WORKERS`` processes
+by the command; the upload page takes few passwords and hashes them in
+the request.
+"""
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import password_validation
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+
+from taxi.forms import validate_license_number
+from taxi.models import Driver, FleetCounters
+
+USERNAME_MAX_LENGTH = Driver._meta.get_field("username").max_length
+
+
+def clean_row(row):
+    """Return the driver fields of ``row``; raise ``ValidationError``.
+
+    A password must pass the ``AUTH_PASSWORD_VALIDATORS``.
+    """
+    username = (row.get("username") or "").strip()
+    if not username:
+        raise ValidationError("username is required")
+    if len(username) > USERNAME_MAX_LENGTH:
+        raise ValidationError(
+            f"username is longer than {USERNAME_MAX_LENGTH} characters"
+        )
+    Driver.username_validator(username)
+    fields = {
+        "username": username,
+        "license_number": validate_license_number(
+            (row.get("license_number") or "").strip()
+        ),
+        "first_name": row.get("first_name") or "",
+        "last_name": row.get("last_name") or "",
+        "email": row.get("email") or "",
+    }
+    password = row.get("password") or None
+    if password is not None:
+        # The AUTH_PASSWORD_VALIDATORS of DriverCreationForm.
+        password_validation.validate_password(password, Driver(**fields))
+    return {**fields, "password": password}
+
+
+def validate_rows(rows, first_row=1):
+    """Split ``rows`` into the cleaned rows to create and error messages.
+
+    Rows repeating a username or license number of an earlier row or of
+    an existing driver are rejected; existing drivers are looked up in
+    one query for the whole batch.
+    """
+    cleaned, errors = [], {}
+    usernames, license_numbers = set(), set()
+    for number, row in enumerate(rows, first_row):
+        try:
+            fields = clean_row(row)
+        except ValidationError as e:
+            errors[number] = " ".join(e.messages)
+            continue
+        if fields["username"] in usernames:
+            errors[number] = "duplicate username in the batch"
+            continue
+        if fields["license_number"] in license_numbers:
+            errors[number] = "duplicate license number in the batch"
+            continue
+        usernames.add(fields["username"])
+        license_numbers.add(fields["license_number"])
+        cleaned.append((number, fields))
+
+    valid = []
+    if cleaned:
+        taken_usernames, taken_license_numbers = set(), set()
+        for username, license_number in Driver.objects.filter(
+            Q(username__in=usernames) | Q(license_number__in=license_numbers)
+        ).values_list("username", "license_number"):
+            taken_usernames.add(username)
+            taken_license_numbers.add(license_number)
+        for number, fields in cleaned:
+            if fields["username"] in taken_usernames:
+                errors[number] = "username is taken"
+            elif fields["license_number"] in taken_license_numbers:
+                errors[number] = "license number is taken"
+            else:
+                valid.append(fields)
+    return valid, [
+        f"row {number}: {message}" for number, message in sorted(
+            errors.items()
+        )
+    ]
+
+
+def hash_passwords(passwords, workers=None):
+    """``make_password`` every password, on ``workers`` processes.
+
+    Defaults to ``settings.TAXI_PROVISION_WORKERS``, or one process per
+    CPU. The workers are spawned rather than forked, as forking a
+    threaded web worker can deadlock the child.
+    """
+    workers = workers or settings.TAXI_PROVISION_WORKERS or os.cpu_count()
+    workers = min(workers, len(passwords))
+    if workers <= 1:
+        return [make_password(password) for password in passwords]
+    with ProcessPoolExecutor(
+        workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        return list(
+            executor.map(
+                make_password,
+                passwords,
+                # A few chunks per worker keeps them all busy to the end.
+                chunksize=math.ceil(len(passwords) / (workers * 4)),
+            )
+        )
+
+
+def provision_drivers(rows, first_row=1, workers=None):
+    """Create drivers from ``rows`` of ``clean_row`` columns.
+
+    Rows without a password get an unusable one. Returns the number of
+    drivers created and the errors of the rejected rows.
+    """
+    valid, errors = validate_rows(rows, first_row)
+    if not valid:
+        return 0, errors
+    passwords = [fields["password"] for fields in valid if fields["password"]]
+    hashes = iter(hash_passwords(passwords, workers))
+    unusable_password = make_password(None)
+    drivers = [
+        Driver(
+            **{
+                **fields,
+                "password": (
+                    next(hashes) if fields["password"] else unusable_password
+                ),
+            }
+        )
+        for fields in valid
+    ]
+    with transaction.atomic():
+        # bulk_create() sends no post_save for the counters.
+        Driver.objects.bulk_create(drivers)
+        FleetCounters.increment("num_drivers", len(drivers))
+    return len(drivers), errors
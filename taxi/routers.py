@@ -0,0 +1,81 @@
+"""Send reads to the replicas in ``settings.TAXI_READ_REPLICAS``.
+
+Writes, and every read while a request is pinned, go to ``default``.
+``ReplicaPinningMiddleware`` pins requests that write, and for
+``settings.TAXI_REPLICA_PIN_SECONDS`` afterwards every request of the same
+session, so users always read their own writes despite replication lag.
+"""
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.deprecation import MiddlewareMixin
+
+PIN_SESSION_KEY = "_taxi_pinned_until"
+
+# Models whose reads must always see the latest write: a lagging session
+# row would log the user out right after logging in.
+PRIMARY_ONLY_APPS = {"sessions"}
+
+_pinned = ContextVar("taxi_replica_pinned", default=False)
+
+
+def is_pinned():
+    return _pinned.get()
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = settings.TAXI_READ_REPLICAS
+        if (
+            not replicas
+            or _pinned.get()
+            or model._meta.app_label in PRIMARY_ONLY_APPS
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.TAXI_READ_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas are copies of the primary, see ``sync_replicas``.
+        if db in settings.TAXI_READ_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaPinningMiddleware(MiddlewareMixin):
+    """Pin writing requests, and their session for a while, to the primary.
+
+    Must come after ``SessionMiddleware``.
+    """
+
+    def process_request(self, request):
+        if not settings.TAXI_READ_REPLICAS:
+            return
+        pinned_until = request.session.get(PIN_SESSION_KEY, 0)
+        _pinned.set(self.writes(request) or pinned_until > time.time())
+
+    def process_response(self, request, response):
+        if not settings.TAXI_READ_REPLICAS:
+            return response
+        _pinned.set(False)
+        if self.writes(request):
+            request.session[PIN_SESSION_KEY] = (
+                time.time() + settings.TAXI_REPLICA_PIN_SECONDS
+            )
+        return response
+
+    @staticmethod
+    def writes(request):
+        return request.method not in ("GET", "HEAD", "OPTIONS", "TRACE")
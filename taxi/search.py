@@ -0,0 +1,192 @@
+"""SQLite FTS5 search index for the list-view search forms.
+
+Every indexed model gets an external-content FTS5 table named
+``<db_table>_fts`` that is kept in sync with the model table by
+``AFTER INSERT/UPDATE/DELETE`` triggers, so ORM saves, deletes,
+``bulk_create`` and queryset updates are all reflected.
+
+The tables and triggers are not part of the migration state. They are
+(re)installed after every ``migrate`` by ``install_search_indexes``,
+which also covers SQLite table rebuilds that drop the triggers.
+"""
+import functools
+import re
+import sqlite3
+
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import F, FloatField, Func, Value
+from django.db.models.expressions import RawSQL
+
+from taxi.models import Car, Driver, Manufacturer
+
+SEARCH_FIELDS = {
+    Car: ("model",),
+    Driver: ("username", "first_name", "last_name", "license_number"),
+    Manufacturer: ("name", "country"),
+}
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Relevance, with ties broken by id so that it can order cursor pages.
+RANK_ORDERING = ("search_rank", "id")
+
+
+def fts_table(model):
+    return f"{model._meta.db_table}_fts"
+
+
+@functools.lru_cache(maxsize=None)
+def _sqlite_has_fts5():
+    connection = sqlite3.connect(":memory:")
+    try:
+        return bool(
+            connection.execute(
+                "SELECT sqlite_compileoption_used('ENABLE_FTS5')"
+            ).fetchone()[0]
+        )
+    finally:
+        connection.close()
+
+
+def is_available(connection):
+    return connection.vendor == "sqlite" and _sqlite_has_fts5()
+
+
+def _columns(model):
+    return [
+        model._meta.get_field(name).column for name in SEARCH_FIELDS[model]
+    ]
+
+
+def _index_statements(model):
+    table = model._meta.db_table
+    index = fts_table(model)
+    pk = model._meta.pk.column
+    columns = ", ".join(_columns(model))
+    new_values = ", ".join(f"new.{column}" for column in _columns(model))
+    old_values = ", ".join(f"old.{column}" for column in _columns(model))
+    insert = (
+        f"INSERT INTO {index}(rowid, {columns}) "
+        f"VALUES (new.{pk}, {new_values});"
+    )
+    delete = (
+        f"INSERT INTO {index}({index}, rowid, {columns}) "
+        f"VALUES ('delete', old.{pk}, {old_values});"
+    )
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5("
+        f"{columns}, content='{table}', content_rowid='{pk}')",
+        f"CREATE TRIGGER IF NOT EXISTS {index}_ai AFTER INSERT ON {table} "
+        f"BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {index}_ad AFTER DELETE ON {table} "
+        f"BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {index}_au "
+        f"AFTER UPDATE OF {columns} ON {table} "
+        f"BEGIN {delete} {insert} END",
+    ]
+
+
+def _is_installed(cursor, model):
+    index = fts_table(model)
+    cursor.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE name IN (%s, %s, %s, %s)",
+        [index, f"{index}_ai", f"{index}_ad", f"{index}_au"],
+    )
+    return cursor.fetchone()[0] == 4
+
+
+def install_search_indexes(using="default", rebuild=False, **kwargs):
+    """Create missing FTS tables/triggers and repopulate affected indexes."""
+    connection = connections[using]
+    if not is_available(connection):
+        return
+    with connection.cursor() as cursor:
+        for model in SEARCH_FIELDS:
+            if not router.allow_migrate_model(using, model):
+                continue
+            if _is_installed(cursor, model) and not rebuild:
+                continue
+            for statement in _index_statements(model):
+                cursor.execute(statement)
+            index = fts_table(model)
+            cursor.execute(
+                f"INSERT INTO {index}({index}) VALUES ('rebuild')"
+            )
+
+
+def match_expression(text):
+    """Turn free text into an FTS5 query: every word, prefix-matched."""
+    tokens = TOKEN_RE.findall(text)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def can_search_index(queryset, text):
+    """Whether ``search_index`` can filter ``queryset`` by ``text``."""
+    return (
+        queryset.model in SEARCH_FIELDS
+        and match_expression(text) is not None
+        and is_available(connections[queryset.db])
+    )
+
+
+def matching_ids(model, text):
+    """Subquery of the ids of the ``model`` rows matching ``text``.
+
+    It does not refer to the model table, so it stays uncorrelated (and
+    runs once) whatever alias the table gets, e.g. inside ``__in``.
+    """
+    index = fts_table(model)
+    return RawSQL(
+        f"SELECT rowid FROM {index} WHERE {index} MATCH %s",
+        (match_expression(text),),
+    )
+
+
+def search_index(queryset, text):
+    """Filter ``queryset`` by ``text`` with its FTS index, best first.
+
+    Rows are annotated with their FTS5 ``search_rank`` (lower is better)
+    and ordered by ``RANK_ORDERING``. A later ``order_by()`` replaces that
+    order, so callers that reorder or paginate by key take it from
+    ``ranked_ordering()``. The rank is looked up by the row's own pk
+    expression, so it is only computed where it is selected or sorted on.
+    """
+    index = fts_table(queryset.model)
+    rank = Func(
+        Value(match_expression(text)),
+        F("pk"),
+        template=(
+            f"(SELECT rank FROM {index} WHERE {index} MATCH %(expressions)s)"
+        ),
+        arg_joiner=" AND rowid = ",
+        output_field=FloatField(),
+    )
+    return (
+        queryset.filter(pk__in=matching_ids(queryset.model, text))
+        .annotate(search_rank=rank)
+        .order_by(*RANK_ORDERING)
+    )
+
+
+def ranked_ordering(queryset):
+    """``RANK_ORDERING`` if ``queryset`` comes from ``search_index``."""
+    if "search_rank" in queryset.query.annotations:
+        return RANK_ORDERING
+    return None
+
+
+def search(queryset, text, field):
+    """Filter ``queryset`` by the search form ``text``.
+
+    With ``settings.TAXI_FULL_TEXT_SEARCH`` the FTS index is used and
+    results are ordered by relevance; otherwise (or when FTS5 is not
+    available) this falls back to ``<field>__icontains``.
+    """
+    if not text:
+        return queryset
+    if settings.TAXI_FULL_TEXT_SEARCH and can_search_index(queryset, text):
+        return search_index(queryset, text)
+    return queryset.filter(**{f"{field}__icontains": text})
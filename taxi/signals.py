@@ -0,0 +1,193 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from taxi import slow_queries
+from taxi.cache import bump_versions
+from taxi.counts import refresh_counts
+from taxi.models import Car, Driver, FleetCounters, Manufacturer
+
+COUNTER_FIELDS = {
+    Driver: "num_drivers",
+    Car: "num_cars",
+    Manufacturer: "num_manufacturers",
+}
+
+Assignment = Car.drivers.through
+
+
+@receiver(post_save, sender=Driver)
+@receiver(post_save, sender=Car)
+@receiver(post_save, sender=Manufacturer)
+def increment_fleet_counter(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        FleetCounters.increment(COUNTER_FIELDS[sender])
+
+
+@receiver(post_delete, sender=Driver)
+@receiver(post_delete, sender=Car)
+@receiver(post_delete, sender=Manufacturer)
+def decrement_fleet_counter(sender, instance, **kwargs):
+    FleetCounters.increment(COUNTER_FIELDS[sender], -1)
+
+
+# Fragment cache invalidation and conditional GET timestamps: the car
+# detail page shows its drivers and the driver detail page shows its cars
+# (with their manufacturers).
+
+
+def touch(model, **filters):
+    model.objects.filter(**filters).update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=Assignment)
+def assignments_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear":
+        # The cleared rows can only be told beforehand.
+        related = instance.cars if reverse else instance.drivers
+        instance._cleared_pks = set(related.values_list("pk", flat=True))
+        return
+    if action == "post_clear":
+        pk_set = instance.__dict__.pop("_cleared_pks", set())
+    elif action not in ("post_add", "post_remove"):
+        return
+    if reverse:
+        cars, drivers = pk_set, [instance.pk]
+    else:
+        cars, drivers = [instance.pk], pk_set
+    bump_versions("car", cars)
+    bump_versions("driver", drivers)
+    # Also touches every affected row.
+    refresh_counts(Car, "num_drivers", cars, touch=True)
+    refresh_counts(Driver, "num_cars", drivers, touch=True)
+
+
+@receiver(post_save, sender=Car)
+def bump_car_versions(sender, instance, created, raw, **kwargs):
+    if created or raw:
+        return
+    bump_versions("car", [instance.pk])
+    bump_versions(
+        "driver", Assignment.objects.filter(car=instance).values_list(
+            "driver_id", flat=True
+        ),
+    )
+
+
+@receiver(pre_delete, sender=Car)
+def bump_deleted_car_versions(sender, instance, **kwargs):
+    bump_car_versions(sender, instance, created=False, raw=False)
+    touch(Driver, cars=instance)
+
+
+@receiver(post_save, sender=Driver)
+def bump_driver_versions(
+    sender, instance, created, raw, update_fields, **kwargs
+):
+    # Logging in only saves last_login, which no fragment shows.
+    if created or raw or update_fields == frozenset(["last_login"]):
+        return
+    bump_versions("driver", [instance.pk])
+    bump_versions(
+        "car", Assignment.objects.filter(driver=instance).values_list(
+            "car_id", flat=True
+        ),
+    )
+
+
+@receiver(pre_delete, sender=Driver)
+def bump_deleted_driver_versions(sender, instance, **kwargs):
+    bump_driver_versions(
+        sender, instance, created=False, raw=False, update_fields=None
+    )
+    touch(Car, drivers=instance)
+
+
+@receiver(post_save, sender=Manufacturer)
+@receiver(post_delete, sender=Manufacturer)
+def bump_manufacturer_version(sender, created=False, **kwargs):
+    # Manufacturers are shown in every driver's cars fragment and change
+    # rarely enough that one shared token is cheaper than looking up the
+    # affected drivers.
+    if not created:
+        bump_versions("manufacturers")
+
+
+@receiver(post_delete, sender=Driver)
+@receiver(post_delete, sender=Car)
+@receiver(post_delete, sender=Manufacturer)
+def bump_deleted_rows_version(sender, **kwargs):
+    bump_versions("deleted", [sender._meta.label_lower])
+
+
+@receiver(post_save, sender=Manufacturer)
+def touch_manufacturer_cars(sender, instance, created, raw, **kwargs):
+    # The car pages show the manufacturer, so its cars count as modified.
+    if not created and not raw:
+        touch(Car, manufacturer=instance)
+
+
+# Denormalized counts, see taxi.counts.
+
+
+@receiver(post_save, sender=Car)
+def refresh_manufacturer_counts(sender, instance, created, raw, **kwargs):
+    loaded = getattr(instance, "_loaded_manufacturer_id", None)
+    if raw or (not created and loaded == instance.manufacturer_id):
+        return
+    refresh_counts(
+        Manufacturer, "num_cars", [instance.manufacturer_id, loaded]
+    )
+    instance._loaded_manufacturer_id = instance.manufacturer_id
+
+
+@receiver(pre_delete, sender=Car)
+@receiver(pre_delete, sender=Driver)
+def remember_assigned(sender, instance, **kwargs):
+    # The assignments are deleted without m2m_changed.
+    if sender is Car:
+        related = Assignment.objects.filter(car=instance)
+        instance._assigned_pks = list(
+            related.values_list("driver_id", flat=True)
+        )
+    else:
+        related = Assignment.objects.filter(driver=instance)
+        instance._assigned_pks = list(
+            related.values_list("car_id", flat=True)
+        )
+
+
+@receiver(post_delete, sender=Car)
+def refresh_deleted_car_counts(sender, instance, **kwargs):
+    refresh_counts(Driver, "num_cars", instance.__dict__.get(
+        "_assigned_pks", ()
+    ))
+    refresh_counts(Manufacturer, "num_cars", [instance.manufacturer_id])
+
+
+@receiver(post_delete, sender=Driver)
+def refresh_deleted_driver_counts(sender, instance, **kwargs):
+    refresh_counts(
+        Car, "num_drivers", instance.__dict__.get("_assigned_pks", ())
+    )
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in settings.TAXI_SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {pragma} = {value}")
+
+
+@receiver(connection_created)
+def install_slow_query_logger(sender, connection, **kwargs):
+    slow_queries.install(connection)
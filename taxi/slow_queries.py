@@ -0,0 +1,128 @@
+"""Sampled log of slow SQL queries, grouped by fingerprint.
+
+A ``SlowQueryLogger`` execute wrapper is added to every database
+connection (see ``taxi.signals``). It times a ``TAXI_SLOW_QUERY_SAMPLE_RATE``
+share of the queries, and logs those slower than ``TAXI_SLOW_QUERY_MS``
+to the ``taxi.slow_queries`` logger as one JSON object per line, with the
+URL name of the request, the query fingerprint and its
+``EXPLAIN QUERY PLAN``. ``manage.py top_queries`` summarizes the log.
+"""
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils.deprecation import MiddlewareMixin
+
+logger = logging.getLogger("taxi.slow_queries")
+
+_request = ContextVar("taxi_slow_query_request", default=None)
+
+LITERAL_RE = re.compile(
+    r"'(?:[^']|'')*'"  # strings
+    r"|\b\d+(?:\.\d+)?\b"  # numbers
+    r"|%s"  # parameters
+)
+VALUES_LIST_RE = re.compile(r"\(\?(?:, \?)*\)(?:, \(\?(?:, \?)*\))+")
+IN_LIST_RE = re.compile(r"\bIN \(\?(?:, \?)*\)", re.IGNORECASE)
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """Return ``sql`` with its literals and parameters replaced by ``?``.
+
+    ``IN`` lists and multi-row ``VALUES`` of any length collapse to
+    ``(...)``, so queries that differ only in those share a fingerprint.
+    """
+    sql = WHITESPACE_RE.sub(" ", sql).strip()
+    sql = LITERAL_RE.sub("?", sql)
+    sql = IN_LIST_RE.sub("IN (...)", sql)
+    return VALUES_LIST_RE.sub("(...)", sql)
+
+
+def fingerprint_id(normalized_sql):
+    return hashlib.md5(normalized_sql.encode()).hexdigest()[:12]
+
+
+class SlowQueryLogger:
+    """Execute wrapper logging the sampled queries over the threshold."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __call__(self, execute, sql, params, many, context):
+        threshold = settings.TAXI_SLOW_QUERY_MS
+        if (
+            threshold is None
+            or random.random() >= settings.TAXI_SLOW_QUERY_SAMPLE_RATE
+        ):
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            if duration_ms >= threshold:
+                self.log(sql, params, many, duration_ms)
+
+    def log(self, sql, params, many, duration_ms):
+        normalized = fingerprint(sql)
+        request = _request.get()
+        match = request and request.resolver_match
+        record = {
+            "fingerprint": fingerprint_id(normalized),
+            "duration_ms": round(duration_ms, 3),
+            "route": match.view_name if match else None,
+            "sample_rate": settings.TAXI_SLOW_QUERY_SAMPLE_RATE,
+            "sql": normalized,
+            "plan": None if many else self.explain(sql, params),
+        }
+        logger.warning(json.dumps(record))
+
+    def explain(self, sql, params):
+        if not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+            return None
+        prefix = (
+            "EXPLAIN QUERY PLAN"
+            if self.connection.vendor == "sqlite"
+            else "EXPLAIN"
+        )
+        # A bare backend cursor: the plan must not go through the execute
+        # wrappers (this one, the query counters) nor the debug query log.
+        cursor = self.connection.create_cursor()
+        try:
+            with self.connection.wrap_database_errors:
+                cursor.execute(f"{prefix} {sql}", params)
+                # The step's description is the last column.
+                return [str(row[-1]) for row in cursor.fetchall()]
+        except DatabaseError:
+            return None
+        finally:
+            cursor.close()
+
+
+def install(connection):
+    """Add a ``SlowQueryLogger`` to ``connection`` unless it has one."""
+    if not any(
+        isinstance(wrapper, SlowQueryLogger)
+        for wrapper in connection.execute_wrappers
+    ):
+        # First, as ``execute_wrapper()`` blocks remove the last wrapper
+        # when they exit.
+        connection.execute_wrappers.insert(0, SlowQueryLogger(connection))
+
+
+class SlowQueryMiddleware(MiddlewareMixin):
+    """Make the request available to label its slow queries."""
+
+    def process_request(self, request):
+        _request.set(request)
+
+    def process_response(self, request, response):
+        _request.set(None)
+        return response
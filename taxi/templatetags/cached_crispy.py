@@ -0,0 +1,77 @@
+"""``|cached_crispy``: ``|crispy`` for the one-field list search forms.
+
+Rendering a form through the crispy template pack costs a few
+milliseconds, while a search form's markup only changes with the value
+typed in. The filter renders each form class once with a placeholder
+value (and once empty), and afterwards only escapes the current value
+into the cached markup. Forms with errors, or other than a single text
+input, are rendered by ``|crispy`` as usual.
+"""
+from crispy_forms.templatetags.crispy_forms_filters import as_crispy_form
+from django import forms, template
+from django.conf import settings
+from django.utils.html import conditional_escape
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+PLACEHOLDER = "__taxi_search_value__"
+
+# (form class, prefix, auto_id, template pack, with value) -> markup, or
+# the markup before and after the value
+_markup = {}
+
+
+def _render(form, value):
+    """Render a fresh copy of ``form`` with ``value`` in its field."""
+    name = next(iter(form.fields))
+    copy = type(form)(
+        data={form.add_prefix(name): value},
+        prefix=form.prefix,
+        auto_id=form.auto_id,
+    )
+    return str(as_crispy_form(copy))
+
+
+def _cached_markup(form, with_value):
+    key = (
+        type(form),
+        form.prefix,
+        form.auto_id,
+        settings.CRISPY_TEMPLATE_PACK,
+        with_value,
+    )
+    try:
+        return _markup[key]
+    except KeyError:
+        pass
+    if with_value:
+        parts = tuple(_render(form, PLACEHOLDER).split(PLACEHOLDER))
+        # Not cacheable if the value is repeated (or dropped).
+        markup = parts if len(parts) == 2 else None
+    else:
+        markup = _render(form, "")
+    _markup[key] = markup
+    return markup
+
+
+def is_search_form(form):
+    if len(form.fields) != 1 or (form.is_bound and form.errors):
+        return False
+    widget = next(iter(form.fields.values())).widget
+    return type(widget) is forms.TextInput
+
+
+@register.filter
+def cached_crispy(form):
+    if not is_search_form(form):
+        return as_crispy_form(form)
+    bound_field = next(iter(form))
+    value = bound_field.field.widget.format_value(bound_field.value())
+    if value is None:
+        return mark_safe(_cached_markup(form, False))
+    parts = _cached_markup(form, True)
+    if parts is None:
+        return as_crispy_form(form)
+    before, after = parts
+    return mark_safe(before + conditional_escape(value) + after)
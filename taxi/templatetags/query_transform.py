@@ -12,3 +12,9 @@ def query_transform(request, **kwargs):
         else:
             updated.pop(key, 0)
     return updated.urlencode()
+
+
+@register.simple_tag
+def cursor_transform(request, cursor):
+    """Query string for another cursor page, keeping the search filters."""
+    return query_transform(request, cursor=cursor, page=None)
@@ -0,0 +1,57 @@
+"""``{% stylesheets %}``: the CSS bundle, or its sources until it is built.
+
+``manage.py build_assets`` writes the bundles of ``taxi.assets``. A
+checkout where it has not run links the vendored files from their CDN
+(with their integrity hash) and the site's own files one by one. Whether
+a bundle exists is checked once per process.
+"""
+import functools
+
+from django import template
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from taxi.assets import BUNDLES, VENDOR_FILES
+
+register = template.Library()
+
+
+@functools.lru_cache(maxsize=None)
+def bundle_exists(bundle):
+    """Whether ``collectstatic`` collected ``bundle``, or a finder has it."""
+    try:
+        if staticfiles_storage.exists(bundle):
+            return True
+    except NotImplementedError:
+        pass
+    return bool(finders.find(bundle))
+
+
+@receiver(setting_changed)
+def clear_bundle_cache(setting, **kwargs):
+    if setting in ("STATIC_ROOT", "STATICFILES_DIRS", "STATICFILES_STORAGE"):
+        bundle_exists.cache_clear()
+
+
+def bundle_links(bundle):
+    if bundle_exists(bundle):
+        return [{"path": bundle}]
+    links = []
+    for source in BUNDLES[bundle]:
+        if source.startswith("vendor/"):
+            url, integrity = VENDOR_FILES[source.removeprefix("vendor/")]
+            links.append({"url": url, "integrity": integrity})
+        else:
+            links.append({"path": source})
+    return links
+
+
+@register.inclusion_tag("includes/stylesheets.html")
+def stylesheets():
+    return {
+        "links": [
+            link for bundle in BUNDLES for link in bundle_links(bundle)
+        ]
+    }
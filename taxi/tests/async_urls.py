@@ -0,0 +1,6 @@
+from django.urls import include, path
+
+urlpatterns = [
+    path("", include("taxi.async_urls", namespace="taxi")),
+    path("accounts/", include("django.contrib.auth.urls")),
+]
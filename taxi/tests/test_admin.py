@@ -1,7 +1,14 @@
+from django.contrib import admin
+from django.contrib.admin import helpers
+from django.contrib.admin.models import DELETION, LogEntry
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from taxi.models import Car, Driver, FleetCounters, Manufacturer
+
 
 class AdminSiteTests(TestCase):
     def setUp(self) -> None:
@@ -32,3 +39,175 @@ class AdminSiteTests(TestCase):
         self.assertContains(res, 'name="first_name"')
         self.assertContains(res, 'name="last_name"')
         self.assertContains(res, 'name="license_number"')
+
+    def test_car_drivers_widget_renders_only_selected(self):
+        manufacturer = Manufacturer.objects.create(name="test", country="test")
+        car = Car.objects.create(model="test", manufacturer=manufacturer)
+        url = reverse("admin:taxi_car_change", args=[car.id])
+        res = self.client.get(url)
+        self.assertContains(res, "data-autocomplete-url")
+        self.assertNotContains(res, f'value="{self.driver.id}"')
+
+
+class AdminPerformanceModeTests(TestCase):
+    def setUp(self):
+        self.admin_user = get_user_model().objects.create_superuser(
+            username="admin",
+            password="testadmin",
+            license_number="ADM00000",
+        )
+        self.client.force_login(self.admin_user)
+        self.toyota = Manufacturer.objects.create(
+            name="Toyota", country="Japan"
+        )
+        self.honda = Manufacturer.objects.create(
+            name="Honda", country="Japan"
+        )
+        self.drivers = [
+            get_user_model().objects.create_user(
+                username=f"driver{i}",
+                password="testdriver",
+                license_number=f"PRF0000{i}",
+            )
+            for i in range(2)
+        ]
+        self.cars = [
+            Car.objects.create(model=f"Corolla {i}", manufacturer=self.toyota)
+            for i in range(3)
+        ]
+        self.cars[0].drivers.add(*self.drivers)
+        self.cars[1].drivers.add(self.drivers[0])
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        return len(queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        url = reverse("admin:taxi_car_changelist")
+        before = self.changelist_queries(url)
+        for i in range(5):
+            Car.objects.create(model=f"Civic {i}", manufacturer=self.honda)
+        self.assertEqual(self.changelist_queries(url), before)
+
+    def test_unfiltered_count_from_fleet_counters(self):
+        FleetCounters.objects.update(num_cars=4200)
+        url = reverse("admin:taxi_car_changelist")
+        self.assertContains(self.client.get(url), "4200 cars")
+        self.assertContains(
+            self.client.get(url, {"manufacturer__id__exact": self.toyota.pk}),
+            "3 cars",
+        )
+        with override_settings(TAXI_ADMIN_PERFORMANCE_MODE=False):
+            self.assertContains(self.client.get(url), "3 cars")
+
+    def test_search_uses_index(self):
+        url = reverse("admin:taxi_manufacturer_changelist")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {"q": "toy"})
+        self.assertEqual(
+            list(response.context["cl"].result_list), [self.toyota]
+        )
+        self.assertTrue(
+            any("taxi_manufacturer_fts MATCH" in q["sql"] for q in queries)
+        )
+
+    def test_driver_search_includes_email(self):
+        self.drivers[1].email = "night.shift@example.com"
+        self.drivers[1].save()
+        url = reverse("admin:taxi_driver_changelist")
+        for term, expected in (
+            ("night", [self.drivers[1]]),
+            ("driver0", [self.drivers[0]]),
+        ):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, {"q": term})
+            self.assertEqual(
+                list(response.context["cl"].result_list), expected, term
+            )
+            self.assertTrue(
+                any("taxi_driver_fts MATCH" in q["sql"] for q in queries)
+            )
+
+    def test_driver_search_plan_is_not_correlated(self):
+        model_admin = admin.site._registry[Driver]
+        request = RequestFactory().get("/")
+        queryset, _ = model_admin.get_search_results(
+            request, Driver.objects.all(), "night"
+        )
+        plan = queryset.explain()
+        self.assertIn("taxi_driver_fts", plan)
+        self.assertNotIn("CORRELATED", plan)
+
+    def test_car_form_uses_autocomplete_for_manufacturer(self):
+        url = reverse("admin:taxi_car_change", args=[self.cars[0].pk])
+        response = self.client.get(url)
+        self.assertContains(response, "admin-autocomplete")
+        self.assertNotContains(response, "Honda")
+
+    def test_reassign_manufacturer(self):
+        url = reverse("admin:taxi_car_changelist")
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(
+                url,
+                {
+                    "action": "reassign_manufacturer",
+                    "manufacturer": self.honda.pk,
+                    helpers.ACTION_CHECKBOX_NAME: [
+                        car.pk for car in self.cars[:2]
+                    ],
+                },
+            )
+        updates = [
+            q for q in queries if q["sql"].startswith('UPDATE "taxi_car"')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(
+            Car.objects.filter(manufacturer=self.honda).count(), 2
+        )
+        self.honda.refresh_from_db()
+        self.toyota.refresh_from_db()
+        self.assertEqual((self.honda.num_cars, self.toyota.num_cars), (2, 1))
+
+    def test_delete_selected_cars(self):
+        url = reverse("admin:taxi_car_changelist")
+        data = {
+            "action": "delete_selected",
+            helpers.ACTION_CHECKBOX_NAME: [car.pk for car in self.cars[:2]],
+        }
+        response = self.client.post(url, data)
+        self.assertContains(response, "Car-driver assignments: 3")
+        self.assertEqual(Car.objects.count(), 3)
+
+        self.client.post(url, {**data, "post": "yes"})
+        self.assertEqual(list(Car.objects.all()), [self.cars[2]])
+        self.assertEqual(Car.drivers.through.objects.count(), 0)
+        self.assertEqual(FleetCounters.load().num_cars, 1)
+        self.toyota.refresh_from_db()
+        self.assertEqual(self.toyota.num_cars, 1)
+        self.assertEqual(
+            list(Driver.objects.values_list("num_cars", flat=True)),
+            [0, 0, 0],
+        )
+        self.assertEqual(
+            LogEntry.objects.filter(action_flag=DELETION).count(), 2
+        )
+
+    def test_unassign_cars(self):
+        self.client.post(
+            reverse("admin:taxi_driver_changelist"),
+            {
+                "action": "unassign_cars",
+                helpers.ACTION_CHECKBOX_NAME: [self.drivers[0].pk],
+            },
+        )
+        self.assertEqual(
+            list(
+                Car.objects.order_by("id").values_list(
+                    "num_drivers", flat=True
+                )
+            ),
+            [1, 0, 0],
+        )
+        self.drivers[0].refresh_from_db()
+        self.assertEqual(self.drivers[0].num_cars, 0)
@@ -0,0 +1,107 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from taxi.models import Car, Manufacturer
+
+CAR_API_URL = reverse("taxi:api-car-list")
+DRIVER_API_URL = reverse("taxi:api-driver-list")
+MANUFACTURER_API_URL = reverse("taxi:api-manufacturer-list")
+
+
+class ApiTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="api",
+            password="test123",
+            license_number="API00000",
+        )
+        self.client.force_login(self.user)
+        self.manufacturer = Manufacturer.objects.create(
+            name="Toyota", country="Japan"
+        )
+        self.cars = [
+            Car.objects.create(
+                model=f"Model {i}", manufacturer=self.manufacturer
+            )
+            for i in range(5)
+        ]
+        self.cars[0].drivers.add(self.user)
+
+    def test_login_required(self):
+        self.client.logout()
+        response = self.client.get(CAR_API_URL)
+        self.assertEqual(response.status_code, 302)
+
+    def test_cars_embed_related_ids(self):
+        response = self.client.get(CAR_API_URL)
+        results = response.json()["results"]
+        self.assertEqual(len(results), 5)
+        self.assertEqual(
+            results[0],
+            {
+                "id": self.cars[0].pk,
+                "model": "Model 0",
+                "manufacturer": self.manufacturer.pk,
+                "num_drivers": 1,
+                "drivers": [self.user.pk],
+            },
+        )
+        self.assertEqual(results[1]["drivers"], [])
+
+    def test_drivers_and_manufacturers(self):
+        driver = self.client.get(DRIVER_API_URL).json()["results"][0]
+        self.assertEqual(driver["username"], "api")
+        self.assertEqual(driver["cars"], [self.cars[0].pk])
+        manufacturers = self.client.get(MANUFACTURER_API_URL).json()
+        self.assertEqual(
+            manufacturers["results"],
+            [
+                {
+                    "id": self.manufacturer.pk,
+                    "name": "Toyota",
+                    "country": "Japan",
+                    "num_cars": 5,
+                }
+            ],
+        )
+
+    def test_field_selection(self):
+        with self.assertNumQueries(4):
+            response = self.client.get(CAR_API_URL, {"fields": "model"})
+        self.assertEqual(
+            response.json()["results"][0], {"model": "Model 0"}
+        )
+        response = self.client.get(CAR_API_URL, {"fields": "id,price"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("price", response.json()["error"])
+
+    def test_cursor_pages(self):
+        seen = []
+        url, params = CAR_API_URL, {"limit": 2}
+        while url:
+            page = self.client.get(url, params).json()
+            seen += [car["id"] for car in page["results"]]
+            url, params = page["next"], None
+        self.assertEqual(seen, [car.pk for car in self.cars])
+        self.assertEqual(
+            self.client.get(CAR_API_URL, {"cursor": "bogus"}).status_code,
+            400,
+        )
+        self.assertEqual(
+            self.client.get(CAR_API_URL, {"limit": 0}).status_code, 400
+        )
+
+    def test_search_filter(self):
+        response = self.client.get(CAR_API_URL, {"model": "Model 3"})
+        self.assertEqual(
+            [car["id"] for car in response.json()["results"]],
+            [self.cars[3].pk],
+        )
+
+    def test_not_modified(self):
+        response = self.client.get(CAR_API_URL)
+        response = self.client.get(
+            CAR_API_URL, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, 304)
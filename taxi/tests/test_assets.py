@@ -0,0 +1,227 @@
+import gzip
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.template import Context, Template
+from django.test import SimpleTestCase, override_settings
+
+from taxi import assets
+from taxi_service.staticfiles import IMMUTABLE, REVALIDATE, StaticFiles
+
+
+class MinifyTest(SimpleTestCase):
+    def test_minify_css(self):
+        css = (
+            "/*! License */\n"
+            "/* comment */\n"
+            "body ,\ndiv > p {\n    margin : 0 auto;\n    color: red;\n}\n"
+            "a :hover { color: blue; }\n"
+            "/*# sourceMappingURL=site.css.map */\n"
+        )
+        self.assertEqual(
+            assets.minify_css(css),
+            "/*! License */ body,div>p{margin :0 auto;color:red}"
+            "a :hover{color:blue}",
+        )
+
+
+class BuildAssetsTest(SimpleTestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.root = Path(tmp_dir.name)
+        (self.root / "static" / "css").mkdir(parents=True)
+        (self.root / "static" / "css" / "site.css").write_text(
+            "body {\n    margin-top: 20px;\n}\n"
+        )
+        self.vendored = b".btn { display: inline-block; }"
+        for patch in (
+            mock.patch.object(assets, "VENDOR_DIR", self.root / "vendor"),
+            mock.patch.object(assets, "STATIC_DIR", self.root / "static"),
+            mock.patch.object(
+                assets,
+                "VENDOR_FILES",
+                {
+                    "lib.css": (
+                        "https://cdn.invalid/lib.css",
+                        assets.integrity(self.vendored),
+                    )
+                },
+            ),
+            mock.patch.object(
+                assets,
+                "BUNDLES",
+                {"dist/css/site.css": ("vendor/lib.css", "css/site.css")},
+            ),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def build(self, *args):
+        call_command(
+            "build_assets", "--no-collectstatic", *args, stdout=StringIO()
+        )
+
+    def test_missing_vendor_file(self):
+        with self.assertRaisesMessage(CommandError, "run with --fetch"):
+            self.build()
+
+    def test_fetch_checks_integrity(self):
+        response = mock.MagicMock()
+        response.__enter__.return_value.read.return_value = b"tampered"
+        with mock.patch("urllib.request.urlopen", return_value=response):
+            with self.assertRaisesMessage(CommandError, "integrity hash"):
+                self.build("--fetch")
+        self.assertFalse((self.root / "vendor" / "lib.css").exists())
+
+        response.__enter__.return_value.read.return_value = self.vendored
+        with mock.patch("urllib.request.urlopen", return_value=response):
+            self.build("--fetch")
+        self.assertEqual(
+            (self.root / "static" / "dist" / "css" / "site.css").read_text(),
+            ".btn{display:inline-block}\nbody{margin-top:20px}\n",
+        )
+
+
+class StaticFilesTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        tmp_dir = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(tmp_dir.cleanup)
+        source, cls.root = Path(tmp_dir.name, "src"), Path(tmp_dir.name, "out")
+        (source / "css").mkdir(parents=True)
+        (source / "css" / "site.css").write_text(
+            "body { margin: 0; }\n" * 100
+        )
+        (source / "robots.txt").write_text("User-agent: *\n")
+        with override_settings(
+            STATICFILES_DIRS=[source],
+            STATICFILES_FINDERS=[
+                "django.contrib.staticfiles.finders.FileSystemFinder"
+            ],
+            STATIC_ROOT=cls.root,
+            STATICFILES_STORAGE=(
+                "taxi_service.staticfiles."
+                "CompressedManifestStaticFilesStorage"
+            ),
+        ):
+            call_command("collectstatic", interactive=False, verbosity=0)
+        manifest = json.loads((cls.root / "staticfiles.json").read_text())
+        cls.hashed = manifest["paths"]["css/site.css"]
+
+    def setUp(self):
+        self.app_calls = []
+        self.static = StaticFiles(self.app, self.root, "/static/")
+
+    def app(self, environ, start_response):
+        self.app_calls.append(environ["PATH_INFO"])
+        start_response("404 Not Found", [])
+        return [b"not found"]
+
+    def get(self, path, method="GET", **headers):
+        response = {}
+
+        def start_response(status, headers):
+            response["status"] = status
+            response["headers"] = dict(headers)
+
+        body = b"".join(
+            self.static(
+                {"PATH_INFO": path, "REQUEST_METHOD": method, **headers},
+                start_response,
+            )
+        )
+        return response["status"], response["headers"], body
+
+    def test_precompressed_siblings(self):
+        self.assertNotEqual(self.hashed, "css/site.css")
+        content = (self.root / self.hashed).read_bytes()
+        self.assertEqual(
+            gzip.decompress((self.root / f"{self.hashed}.gz").read_bytes()),
+            content,
+        )
+        # Too small to gain from compression.
+        self.assertFalse((self.root / "robots.txt.gz").exists())
+
+    def test_serves_gzip_with_immutable_caching(self):
+        status, headers, body = self.get(
+            f"/static/{self.hashed}", HTTP_ACCEPT_ENCODING="gzip, br"
+        )
+        self.assertEqual(status, "200 OK")
+        self.assertEqual(headers["Content-Encoding"], "gzip")
+        self.assertEqual(headers["Cache-Control"], IMMUTABLE)
+        self.assertEqual(headers["Content-Type"], "text/css")
+        self.assertEqual(headers["Vary"], "Accept-Encoding")
+        self.assertEqual(
+            gzip.decompress(body), (self.root / self.hashed).read_bytes()
+        )
+        self.assertEqual(int(headers["Content-Length"]), len(body))
+
+    def test_serves_identity_without_accept_encoding(self):
+        status, headers, body = self.get(
+            f"/static/{self.hashed}", HTTP_ACCEPT_ENCODING="gzip;q=0"
+        )
+        self.assertNotIn("Content-Encoding", headers)
+        self.assertEqual(body, (self.root / self.hashed).read_bytes())
+
+    def test_unhashed_names_are_revalidated(self):
+        status, headers, body = self.get("/static/css/site.css")
+        self.assertEqual(headers["Cache-Control"], REVALIDATE)
+        status, _, body = self.get(
+            "/static/css/site.css", HTTP_IF_NONE_MATCH=headers["ETag"]
+        )
+        self.assertEqual((status, body), ("304 Not Modified", b""))
+
+    def test_head_and_post(self):
+        status, headers, body = self.get("/static/robots.txt", "HEAD")
+        self.assertEqual((status, body), ("200 OK", b""))
+        self.assertEqual(headers["Content-Length"], "14")
+        status, _, _ = self.get("/static/robots.txt", "POST")
+        self.assertEqual(status, "405 Method Not Allowed")
+
+    def test_other_paths_go_to_the_application(self):
+        self.get("/static/missing.css")
+        self.get("/cars/")
+        self.get(f"/static/{self.hashed}.gz")
+        self.assertEqual(
+            self.app_calls,
+            ["/static/missing.css", "/cars/", f"/static/{self.hashed}.gz"],
+        )
+
+
+class StylesheetsTagTest(SimpleTestCase):
+    def render(self):
+        return Template("{% load site_assets %}{% stylesheets %}").render(
+            Context()
+        )
+
+    def test_links_sources_until_the_bundle_is_built(self):
+        html = self.render()
+        self.assertInHTML(
+            '<link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/'
+            'bootstrap@4.5.3/dist/css/bootstrap.min.css" integrity="'
+            f'{assets.VENDOR_FILES["bootstrap-4.5.3.min.css"][1]}" '
+            'crossorigin="anonymous">',
+            html,
+        )
+        self.assertInHTML(
+            '<link rel="stylesheet" href="/static/css/styles.css">', html
+        )
+        self.assertNotIn("dist/css/site.css", html)
+
+    def test_links_the_built_bundle(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bundle = Path(tmp_dir, "dist", "css", "site.css")
+            bundle.parent.mkdir(parents=True)
+            bundle.write_text("body{margin:0}\n")
+            with override_settings(STATICFILES_DIRS=[tmp_dir]):
+                html = self.render()
+        self.assertHTMLEqual(
+            html, '<link rel="stylesheet" href="/static/dist/css/site.css">'
+        )
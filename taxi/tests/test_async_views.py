@@ -0,0 +1,174 @@
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from taxi import async_views
+from taxi.async_urls import ASYNC_VIEWS, urlpatterns
+from taxi.models import Car, Manufacturer
+from taxi.visits import VisitBuffer, buffer
+
+
+@override_settings(
+    ROOT_URLCONF="taxi.tests.async_urls",
+    TAXI_QUERY_BUDGET_MODE="raise",
+)
+class AsyncViewsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        start = mock.patch.object(VisitBuffer, "_start")
+        start.start()
+        self.addCleanup(start.stop)
+        self.addCleanup(buffer.flush)
+        self.user = get_user_model().objects.create_user(
+            username="async",
+            password="test123",
+            license_number="ASY00000",
+        )
+        self.async_client.force_login(self.user)
+        manufacturer = Manufacturer.objects.create(
+            name="Toyota", country="Japan"
+        )
+        self.cars = [
+            Car.objects.create(model=f"Model {i}", manufacturer=manufacturer)
+            for i in range(7)
+        ]
+
+    def test_only_listed_routes_are_swapped(self):
+        swapped = {
+            pattern.name
+            for pattern in urlpatterns
+            if pattern.callback.__module__ == async_views.__name__
+        }
+        self.assertEqual(swapped, set(ASYNC_VIEWS))
+
+    async def test_login_required(self):
+        self.async_client.cookies.clear()
+        response = await self.async_client.get(reverse("taxi:car-list"))
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response.url.startswith(reverse("login")))
+
+    async def test_index(self):
+        response = await self.async_client.get(reverse("taxi:index"))
+        self.assertEqual(response.context["num_cars"], 7)
+        self.assertEqual(response.context["num_drivers"], 1)
+        self.assertEqual(response.context["num_manufacturers"], 1)
+        self.assertEqual(response.context["num_visits"], 1)
+
+    async def test_list_pagination(self):
+        url = reverse("taxi:car-list")
+        response = await self.async_client.get(url)
+        self.assertTrue(response.context["is_paginated"])
+        self.assertEqual(
+            list(response.context["car_list"]), self.cars[:5]
+        )
+        response = await self.async_client.get(url, {"page": "last"})
+        self.assertEqual(
+            list(response.context["car_list"]), self.cars[5:]
+        )
+        response = await self.async_client.get(url, {"page": 3})
+        self.assertEqual(response.status_code, 404)
+
+    async def test_list_search(self):
+        response = await self.async_client.get(
+            reverse("taxi:car-list"), {"model": "Model 3"}
+        )
+        self.assertEqual(list(response.context["car_list"]), [self.cars[3]])
+        self.assertEqual(
+            response.context["search_form"].initial, {"model": "Model 3"}
+        )
+
+    @override_settings(TAXI_CURSOR_PAGINATION=True)
+    async def test_list_cursor_pagination(self):
+        response = await self.async_client.get(
+            reverse("taxi:driver-list")
+        )
+        self.assertEqual(
+            list(response.context["driver_list"]), [self.user]
+        )
+
+    @override_settings(
+        TAXI_CURSOR_PAGINATION=True, TAXI_FULL_TEXT_SEARCH=True
+    )
+    async def test_list_cursor_pagination_by_relevance(self):
+        manufacturer = self.cars[0].manufacturer
+        for model in ("Golf Variant Estate", "Golf"):
+            await Car.objects.acreate(model=model, manufacturer=manufacturer)
+        response = await self.async_client.get(
+            reverse("taxi:car-list"), {"model": "golf"}
+        )
+        self.assertEqual(
+            [car.model for car in response.context["car_list"]],
+            ["Golf", "Golf Variant Estate"],
+        )
+
+    async def test_list_not_modified(self):
+        url = reverse("taxi:manufacturer-list")
+        # The first response sets the CSRF cookie, which is part of the
+        # ETag.
+        await self.async_client.get(url)
+        response = await self.async_client.get(url)
+        # AsyncClient takes header names rather than HTTP_* keys.
+        response = await self.async_client.get(
+            url, **{"If-None-Match": response["ETag"]}
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_detail_and_toggle(self):
+        car = self.cars[0]
+        detail_url = reverse("taxi:car-detail", args=[car.pk])
+        response = await self.async_client.get(detail_url)
+        self.assertEqual(response.context["car"], car)
+        self.assertFalse(response.context["is_assigned"])
+        self.assertEqual(list(response.context["drivers"]), [])
+
+        toggle_url = reverse("taxi:toggle-car-assign", args=[car.pk])
+        response = await self.async_client.post(toggle_url)
+        self.assertRedirects(
+            response, detail_url, fetch_redirect_response=False
+        )
+        response = await self.async_client.get(detail_url)
+        self.assertTrue(response.context["is_assigned"])
+        self.assertEqual(list(response.context["drivers"]), [self.user])
+
+        response = await self.async_client.get(
+            reverse("taxi:driver-detail", args=[self.user.pk])
+        )
+        self.assertContains(response, car.model)
+
+    async def test_version_tokens_are_read_off_the_event_loop(self):
+        threads = []
+
+        def get_version(*keys):
+            threads.append(threading.get_ident())
+            return versions(*keys)
+
+        versions = async_views.get_version
+        with mock.patch.object(async_views, "get_version", get_version):
+            for url in (
+                reverse("taxi:car-detail", args=[self.cars[0].pk]),
+                reverse("taxi:driver-detail", args=[self.user.pk]),
+            ):
+                response = await self.async_client.get(url)
+                self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(threading.get_ident(), threads)
+
+    async def test_toggle_requires_post(self):
+        response = await self.async_client.get(
+            reverse("taxi:toggle-car-assign", args=[self.cars[0].pk])
+        )
+        self.assertEqual(response.status_code, 405)
+
+    async def test_missing_objects(self):
+        for route in ("car-detail", "driver-detail", "toggle-car-assign"):
+            method = (
+                self.async_client.post
+                if route == "toggle-car-assign"
+                else self.async_client.get
+            )
+            response = await method(reverse(f"taxi:{route}", args=[0]))
+            self.assertEqual(response.status_code, 404)
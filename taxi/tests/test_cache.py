@@ -0,0 +1,178 @@
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from taxi.cache import (
+    ManufacturerCache,
+    check_shared_cache,
+    manufacturer_cache,
+)
+from taxi.models import Car, Manufacturer
+
+
+class ManufacturerCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.manufacturers = [
+            Manufacturer.objects.create(name=f"Name {i}", country="Japan")
+            for i in range(3)
+        ]
+        self.pks = [manufacturer.pk for manufacturer in self.manufacturers]
+        self.cache = ManufacturerCache()
+
+    def names(self, manufacturers):
+        return {pk: m.name for pk, m in manufacturers.items()}
+
+    def test_tiers(self):
+        with self.assertNumQueries(1):
+            found = self.cache.get_many(self.pks + [0])
+        self.assertEqual(
+            self.names(found),
+            {pk: f"Name {i}" for i, pk in enumerate(self.pks)},
+        )
+        # Local tier, then the shared one for another process.
+        with self.assertNumQueries(0):
+            self.cache.get_many(self.pks)
+            found = ManufacturerCache().get_many(self.pks)
+        self.assertEqual(found[self.pks[0]].country, "Japan")
+        # Fields outside the cache are deferred.
+        with self.assertNumQueries(1):
+            self.assertEqual(found[self.pks[0]].num_cars, 0)
+
+    def test_save_and_delete_invalidate(self):
+        self.cache.get_many(self.pks)
+        other_process = ManufacturerCache()
+        other_process.get_many(self.pks)
+        manufacturer = self.manufacturers[0]
+        manufacturer.name = "Renamed"
+        manufacturer.save()
+        self.manufacturers[1].delete()
+        for lookups in (self.cache, other_process):
+            with self.assertNumQueries(1):
+                found = lookups.get_many(self.pks)
+            self.assertEqual(
+                self.names(found),
+                {self.pks[0]: "Renamed", self.pks[2]: "Name 2"},
+            )
+
+    @override_settings(TAXI_MANUFACTURER_CACHE_TTL=60)
+    def test_local_entries_expire(self):
+        with mock.patch("time.monotonic", return_value=1000):
+            self.cache.get_many(self.pks)
+        cache_get_many = mock.patch.object(
+            cache, "get_many", wraps=cache.get_many
+        )
+        with mock.patch("time.monotonic", return_value=1059):
+            with cache_get_many as shared:
+                self.cache.get_many(self.pks)
+            self.assertNotIn(
+                "taxi:manufacturer", str(shared.call_args_list)
+            )
+        with mock.patch("time.monotonic", return_value=1060):
+            with cache_get_many as shared, self.assertNumQueries(0):
+                self.cache.get_many(self.pks)
+            self.assertIn("taxi:manufacturer", str(shared.call_args_list))
+
+    @override_settings(TAXI_MANUFACTURER_CACHE_SIZE=2)
+    def test_least_recently_used_are_evicted(self):
+        first, second, third = self.pks
+        self.cache.get_many([first, second])
+        self.cache.get_many([first])
+        self.cache.get_many([third])
+        self.assertEqual(list(self.cache._entries), [first, third])
+
+
+class FileBasedManufacturerCacheTest(ManufacturerCacheTest):
+    """The shared tier on a cache that outlives the process."""
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        settings = override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": (
+                        "django.core.cache.backends.filebased.FileBasedCache"
+                    ),
+                    "LOCATION": tmp_dir.name,
+                }
+            }
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        super().setUp()
+
+
+class CarPagesTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        manufacturer_cache.clear()
+        user = get_user_model().objects.create_user(
+            username="user",
+            password="test123",
+            license_number="USR00000",
+        )
+        self.client.force_login(user)
+        self.manufacturer = Manufacturer.objects.create(
+            name="Toyota", country="Japan"
+        )
+        self.car = Car.objects.create(
+            model="Corolla", manufacturer=self.manufacturer
+        )
+
+    def manufacturer_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertContains(response, "Toyota")
+        return [q for q in queries if "taxi_manufacturer" in q["sql"]]
+
+    def test_pages_do_not_join_manufacturers(self):
+        for url in (
+            reverse("taxi:car-list"),
+            reverse("taxi:car-detail", args=[self.car.pk]),
+        ):
+            cache.clear()
+            manufacturer_cache.clear()
+            queries = self.manufacturer_queries(url)
+            self.assertEqual(len(queries), 1)
+            self.assertNotIn("JOIN", queries[0]["sql"])
+            self.assertEqual(self.manufacturer_queries(url), [])
+
+    def test_manufacturer_update_shows_at_once(self):
+        url = reverse("taxi:car-detail", args=[self.car.pk])
+        self.client.get(url)
+        self.client.post(
+            reverse(
+                "taxi:manufacturer-update", args=[self.manufacturer.pk]
+            ),
+            {"name": "Lexus", "country": "Japan"},
+        )
+        self.assertContains(self.client.get(url), "Lexus")
+
+
+class SharedCacheCheckTest(TestCase):
+    @override_settings(TAXI_PROFILE="production")
+    def test_production_refuses_a_per_process_cache(self):
+        with self.assertRaises(ImproperlyConfigured):
+            check_shared_cache()
+        with tempfile.TemporaryDirectory() as tmp_dir, override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": (
+                        "django.core.cache.backends.filebased.FileBasedCache"
+                    ),
+                    "LOCATION": tmp_dir,
+                }
+            }
+        ):
+            check_shared_cache()
+
+    def test_development_allows_local_memory(self):
+        check_shared_cache()
@@ -0,0 +1,174 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from taxi.models import Car, FleetCounters, Manufacturer
+
+
+class ReconcileCountersCommandTest(TestCase):
+    def test_reconcile_fixes_drift(self):
+        Manufacturer.objects.bulk_create(
+            Manufacturer(name=f"test {i}", country="test") for i in range(3)
+        )
+        self.assertEqual(FleetCounters.load().num_manufacturers, 0)
+
+        out = StringIO()
+        call_command("reconcile_counters", stdout=out)
+        self.assertIn("corrected", out.getvalue())
+        self.assertEqual(FleetCounters.load().num_manufacturers, 3)
+
+
+class ImportFleetCommandTest(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def write(self, name, content):
+        path = Path(self.tmp_dir.name) / name
+        path.write_text(content)
+        return str(path)
+
+    def import_fleet(self, **options):
+        call_command(
+            "import_fleet", stdout=StringIO(), stderr=StringIO(), **options
+        )
+
+    def test_import_all_files(self):
+        self.import_fleet(
+            manufacturers=self.write(
+                "manufacturers.csv", "name,country\nToyota,Japan\n"
+            ),
+            drivers=self.write(
+                "drivers.jsonl",
+                '{"username": "driver1", "license_number": "ABC12345"}\n'
+                '{"username": "driver2", "license_number": "bad"}\n',
+            ),
+            cars=self.write(
+                "cars.csv",
+                "id,model,manufacturer\n10,Camry,Toyota\n11,Golf,Unknown\n",
+            ),
+            assignments=self.write(
+                "assignments.csv", "car,driver\n10,driver1\n10,driver2\n"
+            ),
+        )
+        self.assertEqual(
+            list(get_user_model().objects.values_list("username", flat=True)),
+            ["driver1"],
+        )
+        car = Car.objects.get()
+        self.assertEqual(car.id, 10)
+        self.assertEqual(car.manufacturer.name, "Toyota")
+        self.assertEqual(
+            list(car.drivers.values_list("username", flat=True)),
+            ["driver1"],
+        )
+        self.assertEqual(FleetCounters.load().num_cars, 1)
+
+    def test_resume_skips_committed_rows(self):
+        manufacturers = self.write(
+            "manufacturers.csv", "name,country\nToyota,Japan\nVW,Germany\n"
+        )
+        cars = self.write(
+            "cars.csv", "model,manufacturer\nCamry,Toyota\nGolf,VW\n"
+        )
+        Path(f"{cars}.progress").write_text("1")
+        self.import_fleet(manufacturers=manufacturers, cars=cars, resume=True)
+        self.assertEqual(
+            list(Car.objects.values_list("model", flat=True)), ["Golf"]
+        )
+        self.assertFalse(Path(f"{cars}.progress").exists())
+
+    def test_conflicting_rows_are_counted_as_skipped(self):
+        drivers = self.write(
+            "drivers.csv",
+            "username,license_number\n"
+            "driver1,ABC12345\n"
+            "driver2,ABC12346\n"
+            "driver3,bad\n",
+        )
+        self.import_fleet(drivers=drivers)
+        out = StringIO()
+        call_command(
+            "import_fleet", drivers=drivers, stdout=out, stderr=StringIO()
+        )
+        self.assertIn("drivers: 0 imported, 3 skipped", out.getvalue())
+        self.assertEqual(get_user_model().objects.count(), 2)
+
+    def test_duplicates_found_without_counting_the_table(self):
+        assignments = self.write(
+            "assignments.csv", "car,driver\n10,driver1\n10,driver1\n"
+        )
+        self.import_fleet(
+            manufacturers=self.write(
+                "manufacturers.csv", "name,country\nToyota,Japan\n"
+            ),
+            drivers=self.write(
+                "drivers.csv", "username,license_number\ndriver1,ABC12345\n"
+            ),
+            cars=self.write(
+                "cars.csv", "id,model,manufacturer\n10,Camry,Toyota\n"
+            ),
+        )
+        out = StringIO()
+        with CaptureQueriesContext(connection) as queries:
+            call_command(
+                "import_fleet",
+                assignments=assignments,
+                stdout=out,
+                stderr=StringIO(),
+            )
+        self.assertIn("assignments: 1 imported, 1 skipped", out.getvalue())
+        self.assertFalse(
+            any(
+                'COUNT(*) AS "__count" FROM "taxi_car_drivers"' in query["sql"]
+                for query in queries
+            )
+        )
+
+
+class SeedFleetCommandTest(TestCase):
+    def seed_fleet(self, **options):
+        call_command(
+            "seed_fleet",
+            manufacturers=3,
+            cars=20,
+            drivers=5,
+            assignments_per_driver=2,
+            verbosity=0,
+            **options,
+        )
+
+    def test_seed_counts(self):
+        self.seed_fleet()
+        self.assertEqual(Manufacturer.objects.count(), 3)
+        self.assertEqual(Car.objects.count(), 20)
+        self.assertEqual(get_user_model().objects.count(), 5)
+        self.assertEqual(Car.drivers.through.objects.count(), 10)
+        counters = FleetCounters.load()
+        self.assertEqual(counters.num_cars, 20)
+        self.assertEqual(counters.num_drivers, 5)
+
+    def test_seed_is_reproducible_and_appends(self):
+        self.seed_fleet()
+        first = list(Car.objects.order_by("id").values_list("model"))
+        Car.objects.all().delete()
+        self.seed_fleet()
+        second = list(Car.objects.order_by("id").values_list("model"))
+        self.assertEqual(first, second)
+        self.assertTrue(
+            get_user_model().objects.filter(username="driver9").exists()
+        )
+
+    def test_seed_after_deleting_rows(self):
+        self.seed_fleet()
+        get_user_model().objects.order_by("id").first().delete()
+        Manufacturer.objects.order_by("id").first().delete()
+        self.seed_fleet()
+        self.assertEqual(get_user_model().objects.count(), 9)
+        self.assertEqual(Manufacturer.objects.count(), 5)
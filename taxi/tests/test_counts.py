@@ -0,0 +1,183 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from taxi.assignments import add_assignments, remove_assignments
+from taxi.models import Car, Driver, Manufacturer
+
+
+class CountsTest(TestCase):
+    def setUp(self):
+        self.toyota = Manufacturer.objects.create(
+            name="Toyota", country="Japan"
+        )
+        self.honda = Manufacturer.objects.create(
+            name="Honda", country="Japan"
+        )
+        self.drivers = [
+            get_user_model().objects.create_user(
+                username=f"driver{i}",
+                password="test123",
+                license_number=f"CNT0000{i}",
+            )
+            for i in range(3)
+        ]
+        self.cars = [
+            Car.objects.create(model=f"Model {i}", manufacturer=self.toyota)
+            for i in range(3)
+        ]
+
+    def assert_counts(self, cars, drivers, manufacturers):
+        self.assertEqual(
+            [car.num_drivers for car in Car.objects.order_by("id")], cars
+        )
+        self.assertEqual(
+            [driver.num_cars for driver in Driver.objects.order_by("id")],
+            drivers,
+        )
+        self.assertEqual(
+            [
+                manufacturer.num_cars
+                for manufacturer in Manufacturer.objects.order_by("id")
+            ],
+            manufacturers,
+        )
+
+    def test_assignments(self):
+        car, other_car = self.cars[:2]
+        car.drivers.add(*self.drivers)
+        self.drivers[0].cars.add(other_car)
+        self.assert_counts([3, 1, 0], [2, 1, 1], [3, 0])
+        # Removing a pair that is not assigned changes nothing.
+        car.drivers.remove(self.drivers[1])
+        other_car.drivers.remove(self.drivers[1])
+        self.assert_counts([2, 1, 0], [2, 0, 1], [3, 0])
+        self.drivers[0].cars.clear()
+        self.assert_counts([1, 0, 0], [0, 0, 1], [3, 0])
+
+    def test_set_based_assignments(self):
+        pairs = {(driver.pk, self.cars[2].pk) for driver in self.drivers}
+        add_assignments(pairs)
+        self.assert_counts([0, 0, 3], [1, 1, 1], [3, 0])
+        through = Car.drivers.through
+        remove_assignments(
+            {
+                (row.driver_id, row.car_id): row.pk
+                for row in through.objects.filter(
+                    driver=self.drivers[0]
+                )
+            }
+        )
+        self.assert_counts([0, 0, 2], [0, 1, 1], [3, 0])
+
+    def test_car_and_driver_lifecycle(self):
+        car = self.cars[0]
+        car.drivers.add(*self.drivers[:2])
+        car.manufacturer = self.honda
+        car.save()
+        self.assert_counts([2, 0, 0], [1, 1, 0], [2, 1])
+        car = Car.objects.get(pk=car.pk)
+        car.manufacturer = self.toyota
+        car.save()
+        self.assert_counts([2, 0, 0], [1, 1, 0], [3, 0])
+        self.drivers[0].delete()
+        self.assertEqual(Car.objects.get(pk=car.pk).num_drivers, 1)
+        car.delete()
+        self.assert_counts([0, 0], [0, 0], [2, 0])
+        self.toyota.delete()
+        self.assertEqual(
+            list(Driver.objects.values_list("num_cars", flat=True)), [0, 0]
+        )
+
+    def test_repair(self):
+        Car.drivers.through.objects.bulk_create(
+            [
+                Car.drivers.through(car=self.cars[0], driver=driver)
+                for driver in self.drivers
+            ]
+        )
+        Manufacturer.objects.update(num_cars=7)
+        out = StringIO()
+        call_command("repair_counts", stdout=out)
+        self.assertIn("'car.num_drivers': 1", out.getvalue())
+        self.assertIn("'manufacturer.num_cars': 2", out.getvalue())
+        self.assert_counts([3, 0, 0], [1, 1, 1], [3, 0])
+        out = StringIO()
+        call_command("repair_counts", stdout=out)
+        self.assertIn("Counts OK", out.getvalue())
+
+
+class CountSortTest(TestCase):
+    def setUp(self):
+        manufacturer = Manufacturer.objects.create(
+            name="Toyota", country="Japan"
+        )
+        self.user = get_user_model().objects.create_user(
+            username="sorter",
+            password="test123",
+            license_number="SRT00000",
+        )
+        self.client.force_login(self.user)
+        self.cars = [
+            Car.objects.create(model=f"Model {i}", manufacturer=manufacturer)
+            for i in range(7)
+        ]
+        drivers = [
+            get_user_model().objects.create_user(
+                username=f"driver{i}",
+                password="test123",
+                license_number=f"SRT0000{i + 1}",
+            )
+            for i in range(3)
+        ]
+        for car, count in zip(self.cars, (0, 2, 3, 1, 0, 3, 1)):
+            car.drivers.add(*drivers[:count])
+
+    def car_ids(self, response):
+        return [car.pk for car in response.context["car_list"]]
+
+    def test_sort_by_driver_count(self):
+        url = reverse("taxi:car-list")
+        response = self.client.get(url, {"sort": "-num_drivers"})
+        self.assertEqual(
+            self.car_ids(response),
+            [self.cars[i].pk for i in (5, 2, 1, 6, 3)],
+        )
+        self.assertContains(response, "3 drivers")
+        response = self.client.get(url, {"sort": "num_drivers", "page": 2})
+        self.assertEqual(
+            self.car_ids(response), [self.cars[i].pk for i in (2, 5)]
+        )
+
+    @override_settings(TAXI_CURSOR_PAGINATION=True)
+    def test_sort_with_cursor_pagination(self):
+        url = reverse("taxi:car-list")
+        response = self.client.get(url, {"sort": "-num_drivers"})
+        next_cursor = response.context["page_obj"].next_cursor
+        response = self.client.get(
+            url, {"sort": "-num_drivers", "cursor": next_cursor}
+        )
+        self.assertEqual(
+            self.car_ids(response), [self.cars[i].pk for i in (4, 0)]
+        )
+
+    def test_sorted_pages_use_the_index(self):
+        queryset = Car.objects.order_by("-num_drivers", "-id")[:5]
+        with connection.cursor() as cursor:
+            sql, params = queryset.query.sql_with_params()
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+        self.assertIn("taxi_car_num_dri_542a53_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_driver_and_manufacturer_lists_show_counts(self):
+        response = self.client.get(
+            reverse("taxi:driver-list"), {"sort": "-num_cars"}
+        )
+        self.assertEqual(response.context["driver_list"][0].num_cars, 5)
+        response = self.client.get(reverse("taxi:manufacturer-list"))
+        self.assertEqual(response.context["manufacturer_list"][0].num_cars, 7)
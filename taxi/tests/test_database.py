@@ -0,0 +1,46 @@
+import os
+import sqlite3
+import tempfile
+
+from django.db import connection, connections
+from django.test import SimpleTestCase, override_settings
+
+from taxi_service.sqlite3.base import DatabaseWrapper
+
+
+class SQLiteProfileTest(SimpleTestCase):
+    def open(self, settings_dict=None, alias="default"):
+        if settings_dict is None:
+            wrapper = connections.create_connection(alias)
+        else:
+            wrapper = DatabaseWrapper(settings_dict, alias)
+        self.addCleanup(wrapper.close)
+        wrapper.ensure_connection()
+        return wrapper
+
+    @override_settings(TAXI_SQLITE_PRAGMAS={"cache_size": -1234})
+    def test_pragmas_run_on_new_connections(self):
+        with self.open().cursor() as cursor:
+            cursor.execute("PRAGMA cache_size")
+            self.assertEqual(cursor.fetchone()[0], -1234)
+
+    def test_immediate_transactions_take_the_write_lock(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        path = os.path.join(tmp_dir.name, "db.sqlite3")
+        wrapper = self.open(
+            {
+                **connection.settings_dict,
+                "NAME": path,
+                "OPTIONS": {"transaction_mode": "IMMEDIATE"},
+            },
+            alias="immediate",
+        )
+        wrapper._start_transaction_under_autocommit()
+
+        other = sqlite3.connect(path, timeout=0)
+        self.addCleanup(other.close)
+        with self.assertRaisesMessage(
+            sqlite3.OperationalError, "database is locked"
+        ):
+            other.execute("BEGIN IMMEDIATE")
@@ -0,0 +1,118 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from taxi import export
+from taxi.models import Car, Manufacturer
+
+
+class ExportViewsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        manufacturer = Manufacturer.objects.create(
+            name="Toyota",
+            country="Japan",
+        )
+        cls.driver = get_user_model().objects.create_user(
+            username="driver",
+            password="test123",
+            license_number="ABC12345",
+        )
+        cls.camry = Car.objects.create(
+            model="Camry",
+            manufacturer=manufacturer,
+        )
+        cls.camry.drivers.add(cls.driver)
+        Car.objects.create(model="Corolla", manufacturer=manufacturer)
+
+    def setUp(self):
+        self.client.force_login(self.driver)
+
+    def get_content(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_export_cars_csv(self):
+        content = self.get_content(reverse("taxi:car-export"))
+        self.assertEqual(
+            content.splitlines(),
+            [
+                "id,model,manufacturer,drivers",
+                f"{self.camry.id},Camry,Toyota,driver",
+                f"{self.camry.id + 1},Corolla,Toyota,",
+            ],
+        )
+
+    def test_export_cars_honors_search(self):
+        content = self.get_content(
+            reverse("taxi:car-export"), {"model": "cam", "format": "jsonl"}
+        )
+        self.assertEqual(
+            [json.loads(line) for line in content.splitlines()],
+            [
+                {
+                    "id": self.camry.id,
+                    "model": "Camry",
+                    "manufacturer": "Toyota",
+                    "drivers": ["driver"],
+                }
+            ],
+        )
+
+    def test_export_car_queries_do_not_grow_per_row(self):
+        # session, user, one chunk of cars, their drivers, end of data
+        with self.assertNumQueries(5):
+            self.get_content(reverse("taxi:car-export"))
+
+    def test_export_drivers_and_assignments(self):
+        drivers = self.get_content(reverse("taxi:driver-export"))
+        self.assertIn("ABC12345", drivers)
+        assignments = self.get_content(
+            reverse("taxi:assignment-export"), {"username": "driver"}
+        )
+        self.assertEqual(
+            assignments.splitlines(),
+            ["car,driver", f"{self.camry.id},driver"],
+        )
+
+    @override_settings(TAXI_FULL_TEXT_SEARCH=True)
+    def test_export_assignments_honors_full_text_search(self):
+        other = get_user_model().objects.create_user(
+            username="other",
+            password="test123",
+            license_number="OTH12345",
+        )
+        corolla = Car.objects.get(model="Corolla")
+        corolla.drivers.add(other)
+        url = reverse("taxi:assignment-export")
+        for params, expected in (
+            ({"model": "coro"}, f"{corolla.id},other"),
+            ({"username": "driv"}, f"{self.camry.id},driver"),
+            ({"model": "cam", "username": "oth"}, None),
+        ):
+            self.assertEqual(
+                self.get_content(url, params).splitlines()[1:],
+                [expected] if expected else [],
+                params,
+            )
+
+    def test_unknown_format(self):
+        response = self.client.get(
+            reverse("taxi:car-export"), {"format": "xml"}
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class IterChunksTest(TestCase):
+    def test_chunks_cover_all_rows(self):
+        manufacturer = Manufacturer.objects.create(name="VW", country="DE")
+        Car.objects.bulk_create(
+            Car(model=f"Car {i}", manufacturer=manufacturer) for i in range(7)
+        )
+        chunks = list(
+            export.iter_chunks(Car.objects.all(), ("id",), chunk_size=3)
+        )
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 1])
@@ -1,4 +1,6 @@
-from django import forms
+from unittest import mock
+
+from crispy_forms.templatetags.crispy_forms_filters import as_crispy_form
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 
@@ -11,6 +13,8 @@ from taxi.forms import (
     CarForm
 )
 from taxi.models import Manufacturer
+from taxi.templatetags.cached_crispy import cached_crispy
+from taxi.widgets import DriverAutocompleteWidget
 
 
 class CarFormsTests(TestCase):
@@ -43,13 +47,28 @@ class CarFormsTests(TestCase):
             form_data["drivers"]
         )
 
-    def test_car_form_drivers_is_checkbox_select_multiple(self):
+    def test_car_form_drivers_is_autocomplete_widget(self):
         form = CarForm()
         self.assertIsInstance(
             form.fields["drivers"].widget,
-            forms.CheckboxSelectMultiple
+            DriverAutocompleteWidget
         )
 
+    def test_car_form_renders_only_selected_drivers(self):
+        drivers = [
+            get_user_model().objects.create_user(
+                username=f"driver{driver_id}",
+                password="test123",
+                license_number=f"ABC1234{driver_id}",
+            )
+            for driver_id in range(3)
+        ]
+        form = CarForm(initial={"drivers": [drivers[1].id]})
+        html = str(form["drivers"])
+        self.assertIn("driver1", html)
+        self.assertNotIn("driver0", html)
+        self.assertNotIn("driver2", html)
+
     def test_car_search_form_with_valid_data(self):
         form_data = {
             "model": "Test"
@@ -140,3 +159,35 @@ class ManufacturerFormsTests(TestCase):
         }
         form = ManufacturerSearchForm(data=form_data)
         self.assertFalse(form.is_valid())
+
+
+class CachedCrispyTests(TestCase):
+    def test_matches_crispy(self):
+        forms = []
+        for form_class, name in (
+            (CarSearchForm, "model"),
+            (DriverSearchForm, "username"),
+            (ManufacturerSearchForm, "name"),
+        ):
+            for value in ("", "Toyota", "<b>\"'&amp;"):
+                forms += [
+                    form_class(initial={name: value}),
+                    form_class(data={name: value}),
+                    form_class(data={name: value}, prefix="search"),
+                ]
+            forms.append(form_class(data={name: 256 * "n"}))
+        forms.append(CarForm())
+        for form in forms:
+            with self.subTest(form=form):
+                self.assertHTMLEqual(
+                    str(cached_crispy(form)), str(as_crispy_form(form))
+                )
+
+    def test_renders_once(self):
+        cached_crispy(CarSearchForm(initial={"model": "first"}))
+        with mock.patch(
+            "taxi.templatetags.cached_crispy.as_crispy_form"
+        ) as render:
+            html = cached_crispy(CarSearchForm(initial={"model": "second"}))
+        render.assert_not_called()
+        self.assertIn('value="second"', html)
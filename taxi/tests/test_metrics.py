@@ -0,0 +1,96 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from taxi.metrics import registry
+
+
+@override_settings(
+    TAXI_METRICS=True, TAXI_SERVER_TIMING=True, TAXI_METRICS_TOKEN="scrape"
+)
+class MetricsTest(TestCase):
+    def setUp(self):
+        registry.clear()
+        self.addCleanup(registry.clear)
+        self.user = get_user_model().objects.create_user(
+            username="metrics",
+            password="test123",
+            license_number="MET00000",
+        )
+        self.client.force_login(self.user)
+
+    def test_server_timing(self):
+        response = self.client.get(reverse("taxi:car-list"))
+        timing = response["Server-Timing"]
+        self.assertRegex(timing, r'^db;dur=[\d.]+;desc="\d+ queries", ')
+        self.assertRegex(timing, r"tpl;dur=[\d.]+, total;dur=[\d.]+$")
+
+    def test_histograms_per_route(self):
+        self.client.get(reverse("taxi:car-list"))
+        self.client.get(reverse("taxi:car-list"))
+        self.client.get("/no-such-page/")
+        response = self.client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer scrape"
+        )
+        self.assertEqual(
+            response["Content-Type"], "text/plain; version=0.0.4"
+        )
+        text = response.content.decode()
+        self.assertIn("# TYPE taxi_db_queries histogram", text)
+        self.assertIn(
+            'taxi_request_duration_seconds_count{route="taxi:car-list"} 2',
+            text,
+        )
+        self.assertIn(
+            'taxi_db_queries_bucket{route="taxi:car-list",le="+Inf"} 2',
+            text,
+        )
+        self.assertIn(
+            'taxi_template_duration_seconds_count{route="<unresolved>"} 1',
+            text,
+        )
+
+    def test_template_time_counts_nested_renders_once(self):
+        response = self.client.get(reverse("taxi:car-create"))
+        total = float(response["Server-Timing"].rsplit("=", 1)[1])
+        template = float(
+            response["Server-Timing"].split("tpl;dur=")[1].split(",")[0]
+        )
+        self.assertGreater(template, 0)
+        self.assertLessEqual(template, total)
+
+    def test_metrics_need_token_or_staff(self):
+        def status(**headers):
+            return self.client.get(reverse("metrics"), **headers).status_code
+
+        # The client address is not trusted, even when it is internal.
+        self.assertEqual(status(), 404)
+        self.assertEqual(status(HTTP_AUTHORIZATION="Bearer wrong"), 404)
+        self.client.logout()
+        self.assertEqual(status(HTTP_AUTHORIZATION="Bearer scrape"), 200)
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_login(self.user)
+        self.assertEqual(status(), 200)
+
+    @override_settings(TAXI_METRICS_TOKEN=None)
+    def test_no_token_configured(self):
+        response = self.client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer "
+        )
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(TAXI_SERVER_TIMING=False)
+    def test_server_timing_is_opt_in(self):
+        self.client.get(reverse("taxi:car-list"))
+        response = self.client.get(reverse("taxi:car-list"))
+        self.assertFalse(response.has_header("Server-Timing"))
+        self.assertIn(
+            'taxi_request_duration_seconds_count{route="taxi:car-list"} 2',
+            registry.render(),
+        )
+
+    @override_settings(TAXI_METRICS=False)
+    def test_disabled(self):
+        response = self.client.get(reverse("taxi:car-list"))
+        self.assertFalse(response.has_header("Server-Timing"))
@@ -1,8 +1,12 @@
+from unittest import mock
+
 from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, pre_delete
 from django.test import TestCase
 from django.urls import reverse
 
-from taxi.models import Manufacturer, Car
+from taxi.bulk import delete_cars, delete_rows
+from taxi.models import Manufacturer, Car, FleetCounters
 
 
 class ManufacturerModelTest(TestCase):
@@ -63,3 +67,84 @@ class CarModelTest(TestCase):
             manufacturer=manufacturer,
         )
         self.assertEqual(str(car), car.model)
+
+
+class FleetCountersTest(TestCase):
+    def test_counters_follow_create_and_delete(self):
+        manufacturer = Manufacturer.objects.create(
+            name="test",
+            country="Ukraine",
+        )
+        car = Car.objects.create(
+            model="test",
+            manufacturer=manufacturer,
+        )
+        get_user_model().objects.create_user(
+            username="test1",
+            password="test123",
+            license_number="ABC12345",
+        )
+        counters = FleetCounters.load()
+        self.assertEqual(counters.num_manufacturers, 1)
+        self.assertEqual(counters.num_cars, 1)
+        self.assertEqual(counters.num_drivers, 1)
+
+        car.delete()
+        self.assertEqual(FleetCounters.load().num_cars, 0)
+
+    def test_cascade_delete_updates_car_counter(self):
+        manufacturer = Manufacturer.objects.create(
+            name="test",
+            country="Ukraine",
+        )
+        Car.objects.create(model="test", manufacturer=manufacturer)
+        manufacturer.delete()
+        counters = FleetCounters.load()
+        self.assertEqual(counters.num_manufacturers, 0)
+        self.assertEqual(counters.num_cars, 0)
+
+    def test_load_recreates_missing_row(self):
+        Manufacturer.objects.create(name="test", country="Ukraine")
+        FleetCounters.objects.all().delete()
+        self.assertEqual(FleetCounters.load().num_manufacturers, 1)
+
+    def test_delete_with_counter_at_zero(self):
+        manufacturer = Manufacturer.objects.create(
+            name="test",
+            country="Ukraine",
+        )
+        cars = [
+            Car.objects.create(model=f"test{i}", manufacturer=manufacturer)
+            for i in range(2)
+        ]
+        FleetCounters.objects.update(num_manufacturers=0, num_cars=0)
+        cars[0].delete()
+        delete_cars(Car.objects.filter(pk=cars[1].pk))
+        manufacturer.delete()
+        counters = FleetCounters.load()
+        self.assertEqual(counters.num_manufacturers, 0)
+        self.assertEqual(counters.num_cars, 0)
+
+
+class DeleteRowsTest(TestCase):
+    """Pin the private ``QuerySet._raw_delete()`` behind ``delete_rows``."""
+
+    def test_one_delete_without_signals(self):
+        manufacturer = Manufacturer.objects.create(
+            name="test",
+            country="Ukraine",
+        )
+        for i in range(3):
+            Car.objects.create(model=f"test{i}", manufacturer=manufacturer)
+        receiver = mock.Mock()
+        pre_delete.connect(receiver, sender=Car)
+        post_delete.connect(receiver, sender=Car)
+        self.addCleanup(pre_delete.disconnect, receiver, sender=Car)
+        self.addCleanup(post_delete.disconnect, receiver, sender=Car)
+        with self.assertNumQueries(1):
+            deleted = delete_rows(Car.objects.exclude(model="test0"))
+        self.assertEqual(deleted, 2)
+        self.assertEqual(
+            list(Car.objects.values_list("model", flat=True)), ["test0"]
+        )
+        receiver.assert_not_called()
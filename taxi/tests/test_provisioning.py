@@ -0,0 +1,194 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from taxi.models import Driver, FleetCounters
+from taxi.provisioning import hash_passwords, provision_drivers, validate_rows
+
+
+class ProvisioningTest(TestCase):
+    def setUp(self):
+        self.existing = get_user_model().objects.create_user(
+            username="existing",
+            password="test123",
+            license_number="EXI00000",
+        )
+
+    def test_validate_rows_in_one_query(self):
+        rows = [
+            {"username": "anna", "license_number": "ANN00001"},
+            {"username": "bad", "license_number": "bad"},
+            {"username": "", "license_number": "EMP00001"},
+            {"username": "anna", "license_number": "ANN00002"},
+            {"username": "bob", "license_number": "ANN00001"},
+            {"username": "existing", "license_number": "EXI00001"},
+            {"username": "carl", "license_number": "EXI00000"},
+            {"username": "no spaces", "license_number": "SPA00001"},
+        ]
+        with self.assertNumQueries(1):
+            valid, errors = validate_rows(rows)
+        self.assertEqual([fields["username"] for fields in valid], ["anna"])
+        self.assertEqual(
+            errors,
+            [
+                "row 2: License number should consist of 8 characters",
+                "row 3: username is required",
+                "row 4: duplicate username in the batch",
+                "row 5: duplicate license number in the batch",
+                "row 6: username is taken",
+                "row 7: license number is taken",
+                "row 8: Enter a valid username. This value may contain only "
+                "letters, numbers, and @/./+/-/_ characters.",
+            ],
+        )
+
+    def test_passwords_are_validated(self):
+        rows = [
+            ("anna", "ANN00001", "short"),
+            ("bob", "BOB00001", "12345678901"),
+            ("carl", "CAR00001", "carl-s-secret-1"),
+        ]
+        valid, errors = validate_rows(
+            [
+                {
+                    "username": username,
+                    "license_number": license_number,
+                    "password": password,
+                }
+                for username, license_number, password in rows
+            ]
+        )
+        self.assertEqual([fields["username"] for fields in valid], ["carl"])
+        self.assertEqual(len(errors), 2)
+        self.assertTrue(errors[0].startswith("row 1: This password is too"))
+        self.assertIn("This password is entirely numeric.", errors[1])
+
+    def test_hash_passwords_on_a_process_pool(self):
+        hashes = hash_passwords(["first", "second", "third"], workers=2)
+        self.assertEqual(len(hashes), 3)
+        for password, encoded in zip(["first", "second", "third"], hashes):
+            self.assertTrue(check_password(password, encoded))
+
+    def test_provision_drivers(self):
+        counters = FleetCounters.load()
+        created, errors = provision_drivers(
+            [
+                {
+                    "username": "anna",
+                    "license_number": "ANN00001",
+                    "first_name": "Anna",
+                    "password": "secret-1",
+                },
+                {"username": "bob", "license_number": "BOB00001"},
+                {"username": "existing", "license_number": "EXI00001"},
+            ],
+            workers=1,
+        )
+        self.assertEqual((created, errors), (2, ["row 3: username is taken"]))
+        anna = Driver.objects.get(username="anna")
+        self.assertEqual(anna.first_name, "Anna")
+        self.assertTrue(anna.check_password("secret-1"))
+        self.assertFalse(
+            Driver.objects.get(username="bob").has_usable_password()
+        )
+        self.assertEqual(
+            FleetCounters.load().num_drivers, counters.num_drivers + 2
+        )
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".csv", delete=False
+        ) as file:
+            file.write(
+                "username,license_number,password\n"
+                "anna,ANN00001,secret-1\n"
+                "bob,BOB00001,secret-2\n"
+                "existing,EXI00001,\n"
+            )
+        self.addCleanup(os.remove, file.name)
+        out, err = StringIO(), StringIO()
+        call_command(
+            "provision_drivers",
+            file.name,
+            batch_size=2,
+            workers=1,
+            stdout=out,
+            stderr=err,
+        )
+        self.assertIn("2 drivers created, 1 skipped", out.getvalue())
+        self.assertIn("row 3: username is taken", err.getvalue())
+        self.assertTrue(
+            Driver.objects.get(username="bob").check_password("secret-2")
+        )
+
+    def test_upload_view(self):
+        self.client.force_login(self.existing)
+        url = reverse("taxi:driver-provision")
+        response = self.client.post(
+            url,
+            {
+                "csv_file": SimpleUploadedFile(
+                    "drivers.csv",
+                    b"username,license_number\n"
+                    b"anna,ANN00001\n"
+                    b"bob,BOB00001\n"
+                    b"bob,BOB00002\n",
+                )
+            },
+        )
+        self.assertContains(response, "2 drivers created.")
+        self.assertContains(response, "row 3: duplicate username")
+        self.assertTrue(Driver.objects.filter(username="anna").exists())
+
+    def test_upload_limit(self):
+        self.client.force_login(self.existing)
+        rows = "".join(f"driver{i},DRV{i:05d}\n" for i in range(501))
+        response = self.client.post(
+            reverse("taxi:driver-provision"),
+            {
+                "csv_file": SimpleUploadedFile(
+                    "drivers.csv",
+                    f"username,license_number\n{rows}".encode(),
+                )
+            },
+        )
+        self.assertFormError(
+            response,
+            "form",
+            "csv_file",
+            "At most 500 rows per upload; use manage.py provision_drivers "
+            "for larger batches",
+        )
+        self.assertEqual(Driver.objects.count(), 1)
+
+    def test_upload_password_limit(self):
+        self.client.force_login(self.existing)
+        rows = "".join(
+            f"driver{i},DRV{i:05d},secret-password-{i}\n" for i in range(21)
+        )
+        with mock.patch("taxi.views.provision_drivers") as provision:
+            response = self.client.post(
+                reverse("taxi:driver-provision"),
+                {
+                    "csv_file": SimpleUploadedFile(
+                        "drivers.csv",
+                        f"username,license_number,password\n{rows}".encode(),
+                    )
+                },
+            )
+        provision.assert_not_called()
+        self.assertFormError(
+            response,
+            "form",
+            "csv_file",
+            "At most 20 rows with a password per upload; use manage.py "
+            "provision_drivers for larger batches",
+        )
@@ -0,0 +1,330 @@
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from taxi import urls
+from taxi.middleware import QueryBudget, QueryBudgetExceeded
+from taxi.models import Car, Manufacturer
+from taxi.visits import VisitBuffer, buffer
+
+
+@override_settings(TAXI_QUERY_BUDGET_MODE="raise")
+class QueryBudgetHarnessTest(TestCase):
+    """Render every ``taxi:`` route at two dataset sizes.
+
+    Each route must stay within its budget from ``taxi.urls`` and must run
+    the same number of queries on both datasets, which catches queries
+    issued per row (N+1).
+    """
+
+    SIZES = (6, 15)
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="budget",
+            password="test123",
+            license_number="BUD00000",
+        )
+        self.user.user_permissions.add(
+            Permission.objects.get(codename="change_car")
+        )
+        self.client.force_login(self.user)
+        self.seeded = 0
+        # Keep home page visits buffered, as in production, but without
+        # starting the background flusher.
+        start = mock.patch.object(VisitBuffer, "_start")
+        start.start()
+        self.addCleanup(start.stop)
+        self.addCleanup(buffer.flush)
+
+    def seed(self, size):
+        """Grow the dataset to ``size`` rows per model.
+
+        The first car, driver and manufacturer are linked to every new row
+        so that their detail pages grow along with the tables.
+        """
+        for i in range(self.seeded, size):
+            manufacturer = Manufacturer.objects.create(
+                name=f"Manufacturer {i:03d}",
+                country="Country",
+            )
+            driver = get_user_model().objects.create_user(
+                username=f"driver{i:03d}",
+                password="test123",
+                license_number=f"DRV{i:05d}",
+            )
+            car = Car.objects.create(
+                model=f"Model {i:03d}",
+                manufacturer=self.manufacturer if i else manufacturer,
+            )
+            if not i:
+                self.manufacturer, self.driver, self.car = (
+                    manufacturer, driver, car
+                )
+            car.drivers.add(self.user, self.driver)
+            self.car.drivers.add(driver)
+        self.seeded = size
+
+    def route_requests(self):
+        car, driver = self.car.pk, self.driver.pk
+        manufacturer = self.manufacturer.pk
+        get = self.client.get
+        return {
+            "index": lambda: get(reverse("taxi:index")),
+            "manufacturer-list": lambda: get(
+                reverse("taxi:manufacturer-list"), {"page": 2}
+            ),
+            "manufacturer-create": lambda: get(
+                reverse("taxi:manufacturer-create")
+            ),
+            "manufacturer-update": lambda: get(
+                reverse("taxi:manufacturer-update", args=[manufacturer])
+            ),
+            "manufacturer-delete": lambda: get(
+                reverse("taxi:manufacturer-delete", args=[manufacturer])
+            ),
+            "car-list": lambda: get(
+                reverse("taxi:car-list"), {"model": "Model", "page": 2}
+            ),
+            "car-export": lambda: get(reverse("taxi:car-export")),
+            "car-detail": lambda: get(
+                reverse("taxi:car-detail", args=[car])
+            ),
+            "car-create": lambda: get(reverse("taxi:car-create")),
+            "car-update": lambda: get(
+                reverse("taxi:car-update", args=[car])
+            ),
+            "car-delete": lambda: get(
+                reverse("taxi:car-delete", args=[car])
+            ),
+            "driver-list": lambda: get(
+                reverse("taxi:driver-list"), {"username": "d", "page": 2}
+            ),
+            "driver-detail": lambda: get(
+                reverse("taxi:driver-detail", args=[driver])
+            ),
+            "driver-export": lambda: get(reverse("taxi:driver-export")),
+            "driver-autocomplete": lambda: get(
+                reverse("taxi:driver-autocomplete"), {"q": "driver"}
+            ),
+            "assignment-export": lambda: get(
+                reverse("taxi:assignment-export")
+            ),
+            "driver-create": lambda: get(reverse("taxi:driver-create")),
+            "driver-provision": lambda: get(
+                reverse("taxi:driver-provision")
+            ),
+            "driver-update": lambda: get(
+                reverse("taxi:driver-update", args=[driver])
+            ),
+            "driver-delete": lambda: get(
+                reverse("taxi:driver-delete", args=[driver])
+            ),
+            "api-car-list": lambda: get(
+                reverse("taxi:api-car-list"), {"model": "Model", "limit": 5}
+            ),
+            "api-driver-list": lambda: get(
+                reverse("taxi:api-driver-list"), {"limit": 5}
+            ),
+            "api-manufacturer-list": lambda: get(
+                reverse("taxi:api-manufacturer-list"), {"limit": 5}
+            ),
+        }
+
+    def route_posts(self):
+        """Successful submissions, as ``{name: (send, status code)}``.
+
+        Deletions get a new object with a driver or car each time; the
+        assignment routes change the new car before it is deleted.
+        """
+        car, driver = self.car.pk, self.driver.pk
+        manufacturer = self.manufacturer.pk
+        number = self.seeded
+        post = self.client.post
+        new_manufacturer = Manufacturer.objects.create(
+            name=f"Deleted {number:03d}", country="Country"
+        )
+        new_driver = get_user_model().objects.create_user(
+            username=f"deleted{number:03d}", license_number=f"DEL{number:05d}"
+        )
+        new_car = Car.objects.create(
+            model=f"Deleted {number:03d}", manufacturer=self.manufacturer
+        )
+        new_car.drivers.add(new_driver)
+        return {
+            "manufacturer-create": (
+                lambda: post(
+                    reverse("taxi:manufacturer-create"),
+                    {"name": f"New {number:03d}", "country": "Country"},
+                ),
+                302,
+            ),
+            "manufacturer-update": (
+                lambda: post(
+                    reverse("taxi:manufacturer-update", args=[manufacturer]),
+                    {"name": "Manufacturer 000", "country": "Country"},
+                ),
+                302,
+            ),
+            "manufacturer-delete": (
+                lambda: post(
+                    reverse(
+                        "taxi:manufacturer-delete",
+                        args=[new_manufacturer.pk],
+                    )
+                ),
+                302,
+            ),
+            "car-create": (
+                lambda: post(
+                    reverse("taxi:car-create"),
+                    {
+                        "model": f"New {number:03d}",
+                        "manufacturer": manufacturer,
+                        "drivers": [self.user.pk, driver],
+                    },
+                ),
+                302,
+            ),
+            "car-update": (
+                lambda: post(
+                    reverse("taxi:car-update", args=[car]),
+                    {
+                        "model": "Model 000",
+                        "manufacturer": manufacturer,
+                        "drivers": [self.user.pk, driver],
+                    },
+                ),
+                302,
+            ),
+            "batch-assign": (
+                lambda: post(
+                    reverse("taxi:batch-assign"),
+                    json.dumps(
+                        {
+                            "assign": [[driver, new_car.pk]],
+                            "unassign": [[new_driver.pk, new_car.pk]],
+                        }
+                    ),
+                    content_type="application/json",
+                ),
+                200,
+            ),
+            "toggle-car-assign": (
+                lambda: post(
+                    reverse("taxi:toggle-car-assign", args=[new_car.pk])
+                ),
+                302,
+            ),
+            "car-delete": (
+                lambda: post(reverse("taxi:car-delete", args=[new_car.pk])),
+                302,
+            ),
+            "driver-create": (
+                lambda: post(
+                    reverse("taxi:driver-create"),
+                    {
+                        "username": f"new{number:03d}",
+                        "password1": "budget-password-1",
+                        "password2": "budget-password-1",
+                        "license_number": f"NEW{number:05d}",
+                    },
+                ),
+                302,
+            ),
+            "driver-provision": (
+                lambda: post(
+                    reverse("taxi:driver-provision"),
+                    {
+                        "csv_file": SimpleUploadedFile(
+                            "drivers.csv",
+                            (
+                                "username,license_number\n"
+                                f"provisioned{number:03d},PRV{number:05d}\n"
+                            ).encode(),
+                        )
+                    },
+                ),
+                200,
+            ),
+            "driver-update": (
+                lambda: post(
+                    reverse("taxi:driver-update", args=[driver]),
+                    {"license_number": "DRV00000"},
+                ),
+                302,
+            ),
+            "driver-delete": (
+                lambda: post(
+                    reverse("taxi:driver-delete", args=[new_driver.pk])
+                ),
+                302,
+            ),
+        }
+
+    def count(self, name, send):
+        with CaptureQueriesContext(connection) as queries:
+            response = send()
+            if response.streaming:
+                b"".join(response.streaming_content)
+        return response, len(queries)
+
+    def count_queries(self):
+        """Queries of every route, as ``{(name, method): count}``."""
+        counts = {}
+        for name, send in self.route_requests().items():
+            # Budgets bound cold renders, with no cached fragments.
+            cache.clear()
+            response, counts[name, "GET"] = self.count(name, send)
+            self.assertLess(response.status_code, 400, name)
+        for name, (send, status_code) in self.route_posts().items():
+            cache.clear()
+            response, counts[name, "POST"] = self.count(name, send)
+            self.assertEqual(response.status_code, status_code, name)
+        return counts
+
+    def test_every_route_has_a_budget(self):
+        names = {pattern.name for pattern in urls.urlpatterns}
+        self.assertEqual(names, set(urls.query_budgets))
+        self.seed(1)
+        self.assertEqual(
+            names, set(self.route_requests()) | set(self.route_posts())
+        )
+
+    def test_query_counts_do_not_grow_with_rows(self):
+        counts = []
+        for size in self.SIZES:
+            self.seed(size)
+            counts.append(self.count_queries())
+        small, large = counts
+        for (name, method), count in small.items():
+            self.assertEqual(
+                count,
+                large[name, method],
+                f"{method} {name} ran {count} queries with {self.SIZES[0]} "
+                f"rows but {large[name, method]} with {self.SIZES[1]}",
+            )
+            self.assertLessEqual(
+                count,
+                urls.query_budgets[name].queries(method),
+                f"{method} {name}",
+            )
+
+    def test_budget_overrun_raises(self):
+        with mock.patch.dict(urls.query_budgets, {"index": QueryBudget(1)}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(reverse("taxi:index"))
+
+    @override_settings(TAXI_QUERY_BUDGET_MODE="log")
+    def test_budget_overrun_logs(self):
+        with mock.patch.dict(urls.query_budgets, {"index": QueryBudget(1)}):
+            with self.assertLogs("taxi.query_budget", "WARNING"):
+                self.client.get(reverse("taxi:index"))
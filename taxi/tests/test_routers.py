@@ -0,0 +1,94 @@
+import sqlite3
+import tempfile
+import time
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.sessions.models import Session
+from django.core.management import CommandError, call_command
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TransactionTestCase,
+    override_settings,
+)
+
+from taxi.models import Car, Manufacturer
+from taxi.routers import (
+    PIN_SESSION_KEY,
+    ReplicaPinningMiddleware,
+    ReplicaRouter,
+)
+
+
+@override_settings(TAXI_READ_REPLICAS=["replica1"])
+class ReplicaRouterTest(SimpleTestCase):
+    # Not a TestCase: its wrapping transaction would pin every read.
+    databases = {"default"}
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.reads = []
+
+    def view(self, request):
+        self.reads.append(self.router.db_for_read(Car))
+        return HttpResponse()
+
+    def request(self, method, session):
+        request = getattr(RequestFactory(), method)("/")
+        request.session = session
+        return ReplicaPinningMiddleware(self.view)(request)
+
+    def test_reads_use_replicas_and_writes_primary(self):
+        self.assertEqual(self.router.db_for_read(Car), "replica1")
+        self.assertEqual(self.router.db_for_write(Car), "default")
+        self.assertEqual(self.router.db_for_read(Session), "default")
+
+    @override_settings(TAXI_READ_REPLICAS=[])
+    def test_no_replicas(self):
+        self.assertEqual(self.router.db_for_read(Car), "default")
+
+    def test_reads_in_transactions_use_primary(self):
+        with transaction.atomic():
+            self.assertEqual(self.router.db_for_read(Car), "default")
+
+    def test_writer_reads_own_writes(self):
+        session, other_session = dict(), dict()
+        self.request("post", session)
+        self.request("get", session)
+        self.request("get", other_session)
+        self.assertEqual(self.reads, ["default", "default", "replica1"])
+        self.assertEqual(self.router.db_for_read(Car), "replica1")
+
+    def test_pin_expires(self):
+        session = dict({PIN_SESSION_KEY: time.time() - 1})
+        self.request("get", session)
+        self.assertEqual(self.reads, ["replica1"])
+
+    def test_replicas_are_not_migrated(self):
+        self.assertFalse(self.router.allow_migrate("replica1", "taxi"))
+        self.assertIsNone(self.router.allow_migrate("default", "taxi"))
+
+
+class SyncReplicasCommandTest(TransactionTestCase):
+    def test_copies_primary(self):
+        Manufacturer.objects.create(name="Toyota", country="Japan")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = str(Path(tmp_dir) / "replica.sqlite3")
+            call_command("sync_replicas", path, stdout=StringIO())
+            replica = sqlite3.connect(path)
+            try:
+                rows = replica.execute(
+                    "SELECT name FROM taxi_manufacturer"
+                ).fetchall()
+            finally:
+                replica.close()
+        self.assertEqual(rows, [("Toyota",)])
+
+
+class SyncReplicasWithoutReplicasTest(SimpleTestCase):
+    def test_requires_replicas(self):
+        with self.assertRaises(CommandError):
+            call_command("sync_replicas")
@@ -0,0 +1,121 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from taxi.models import Car, Manufacturer
+from taxi.pagination import CursorPaginator
+from taxi.search import RANK_ORDERING, match_expression, search
+
+
+class MatchExpressionTest(TestCase):
+    def test_words_are_quoted_prefix_terms(self):
+        self.assertEqual(
+            match_expression('Land "Cru'),
+            '"Land"* "Cru"*'
+        )
+
+    def test_no_words(self):
+        self.assertIsNone(match_expression("%%"))
+
+
+@override_settings(TAXI_FULL_TEXT_SEARCH=True)
+class FullTextSearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manufacturer = Manufacturer.objects.create(
+            name="Toyota",
+            country="Japan",
+        )
+        for model in ("Land Cruiser", "Corolla", "Camry", "Land Rover"):
+            Car.objects.create(model=model, manufacturer=cls.manufacturer)
+
+    def test_prefix_search(self):
+        cars = search(Car.objects.all(), "Cor", "model")
+        self.assertEqual([car.model for car in cars], ["Corolla"])
+
+    def test_all_words_must_match(self):
+        cars = search(Car.objects.all(), "land cruis", "model")
+        self.assertEqual([car.model for car in cars], ["Land Cruiser"])
+
+    def test_index_follows_update_and_delete(self):
+        car = Car.objects.get(model="Camry")
+        car.model = "Prius"
+        car.save()
+        self.assertFalse(search(Car.objects.all(), "Camry", "model"))
+        self.assertTrue(search(Car.objects.all(), "Prius", "model"))
+
+        car.delete()
+        self.assertFalse(search(Car.objects.all(), "Prius", "model"))
+
+    def test_bulk_created_rows_are_indexed(self):
+        Car.objects.bulk_create(
+            [Car(model="Supra", manufacturer=self.manufacturer)]
+        )
+        self.assertTrue(search(Car.objects.all(), "sup", "model"))
+
+    def test_driver_search_covers_license_number(self):
+        get_user_model().objects.create_user(
+            username="driver",
+            password="test123",
+            license_number="XYZ12345",
+        )
+        drivers = search(get_user_model().objects.all(), "XYZ", "username")
+        self.assertEqual([driver.username for driver in drivers], ["driver"])
+
+    def test_list_view_uses_index(self):
+        user = get_user_model().objects.create_user(
+            username="Test",
+            password="test123",
+        )
+        self.client.force_login(user)
+        response = self.client.get(reverse("taxi:car-list"), {"model": "la"})
+        self.assertEqual(
+            sorted(car.model for car in response.context["car_list"]),
+            ["Land Cruiser", "Land Rover"],
+        )
+        response = self.client.get(
+            reverse("taxi:car-list"),
+            {"model": "la"},
+            HTTP_IF_NONE_MATCH=response["ETag"],
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_results_best_first(self):
+        Car.objects.create(model="Land", manufacturer=self.manufacturer)
+        cars = search(Car.objects.all(), "land", "model")
+        self.assertEqual(
+            [car.model for car in cars], ["Land", "Land Cruiser", "Land Rover"]
+        )
+
+    def test_cursor_pages_follow_rank(self):
+        Car.objects.create(model="Land", manufacturer=self.manufacturer)
+        cars = search(Car.objects.all(), "land", "model")
+        paginator = CursorPaginator(cars, 1, RANK_ORDERING)
+        page = paginator.page()
+        models = [car.model for car in page]
+        while page.has_next():
+            page = paginator.page(page.next_cursor)
+            models += [car.model for car in page]
+        self.assertEqual(models, ["Land", "Land Cruiser", "Land Rover"])
+        page = paginator.page(page.previous_cursor)
+        self.assertEqual([car.model for car in page], ["Land Cruiser"])
+
+    @override_settings(TAXI_CURSOR_PAGINATION=True)
+    def test_count_sort_replaces_rank(self):
+        user = get_user_model().objects.create_user(
+            username="Test",
+            password="test123",
+        )
+        self.client.force_login(user)
+        Car.objects.create(model="Land", manufacturer=self.manufacturer)
+        Car.objects.get(model="Land Rover").drivers.add(user)
+        url = reverse("taxi:car-list")
+        for params, expected in (
+            ({}, ["Land", "Land Cruiser", "Land Rover"]),
+            ({"sort": "-num_drivers"}, ["Land Rover", "Land", "Land Cruiser"]),
+        ):
+            response = self.client.get(url, {"model": "land", **params})
+            self.assertEqual(
+                [car.model for car in response.context["car_list"]],
+                expected,
+            )
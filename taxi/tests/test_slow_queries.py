@@ -0,0 +1,92 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from taxi.models import Car, Manufacturer
+from taxi.slow_queries import fingerprint
+
+
+class FingerprintTest(SimpleTestCase):
+    def test_normalizes_literals_and_lists(self):
+        self.assertEqual(
+            fingerprint(
+                "SELECT * FROM t WHERE a = %s AND b IN (%s, %s, %s)\n"
+                "  AND c = 'x''y' LIMIT 21"
+            ),
+            "SELECT * FROM t WHERE a = ? AND b IN (...) AND c = ? LIMIT ?",
+        )
+        self.assertEqual(
+            fingerprint("INSERT INTO t2 (a, b) VALUES (%s, %s), (%s, %s)"),
+            fingerprint("INSERT INTO t2 (a, b) VALUES (%s, %s), (%s, %s), "
+                        "(%s, %s)"),
+        )
+
+
+class SlowQueryLogTest(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            username="slow",
+            password="test123",
+            license_number="SLO00000",
+        )
+        self.client.force_login(user)
+        manufacturer = Manufacturer.objects.create(
+            name="Toyota", country="Japan"
+        )
+        Car.objects.create(model="Prius", manufacturer=manufacturer)
+
+    def records(self, logs):
+        return [json.loads(record.getMessage()) for record in logs.records]
+
+    @override_settings(TAXI_SLOW_QUERY_MS=0)
+    def test_logs_route_fingerprint_and_plan(self):
+        with self.assertLogs("taxi.slow_queries") as logs:
+            self.client.get(reverse("taxi:car-list"), {"model": "Pri"})
+        records = self.records(logs)
+        search = [
+            record for record in records
+            if "LIKE" in record["sql"] and "taxi_car" in record["sql"]
+        ]
+        self.assertTrue(search)
+        self.assertEqual(search[0]["route"], "taxi:car-list")
+        self.assertEqual(len(search[0]["fingerprint"]), 12)
+        self.assertTrue(search[0]["plan"])
+
+    @override_settings(TAXI_SLOW_QUERY_MS=0, TAXI_SLOW_QUERY_SAMPLE_RATE=0)
+    def test_unsampled_queries_are_not_logged(self):
+        with self.assertNoLogs("taxi.slow_queries"):
+            self.client.get(reverse("taxi:car-list"))
+
+
+class TopQueriesCommandTest(SimpleTestCase):
+    def test_orders_by_scaled_total_time(self):
+        records = [
+            {"fingerprint": "a", "duration_ms": 150, "route": "taxi:car-list",
+             "sample_rate": 0.5, "sql": "SELECT a", "plan": ["SCAN a"]},
+            {"fingerprint": "b", "duration_ms": 250, "route": None,
+             "sample_rate": 1.0, "sql": "SELECT b", "plan": None},
+            {"fingerprint": "a", "duration_ms": 110, "route": "taxi:car-list",
+             "sample_rate": 0.5, "sql": "SELECT a", "plan": ["SCAN a"]},
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "slow.log"
+            path.write_text(
+                "".join(json.dumps(record) + "\n" for record in records)
+            )
+            out = StringIO()
+            call_command("top_queries", str(path), stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith("a  total 520.0ms  count 4"))
+        self.assertIn("routes: taxi:car-list (2)", lines[1])
+        self.assertIn("plan: SCAN a", out.getvalue())
+        self.assertIn("b  total 250.0ms", out.getvalue())
+
+    def test_missing_log(self):
+        with self.assertRaises(CommandError):
+            call_command("top_queries", "/nonexistent/slow.log")
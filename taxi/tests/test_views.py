@@ -1,5 +1,11 @@
+import tempfile
+from unittest import mock
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.test import TestCase, override_settings
 from django.urls import reverse
 
 from taxi.forms import (
@@ -53,6 +59,30 @@ class PublicTest(TestCase):
         )
 
 
+# Visits are written within the request here, outside the index budget.
+@override_settings(
+    TAXI_VISIT_FLUSH_INTERVAL=0, TAXI_QUERY_BUDGET_MODE=None
+)
+class IndexViewTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="Test",
+            password="test123",
+        )
+        self.client.force_login(self.user)
+
+    def test_index_shows_record_counts(self):
+        manufacturer = Manufacturer.objects.create(
+            name="test1",
+            country="test1",
+        )
+        Car.objects.create(model="test", manufacturer=manufacturer)
+        response = self.client.get(reverse("taxi:index"))
+        self.assertEqual(response.context["num_drivers"], 1)
+        self.assertEqual(response.context["num_cars"], 1)
+        self.assertEqual(response.context["num_manufacturers"], 1)
+
+
 class ManufacturerListViewTest(TestCase):
     def setUp(self):
         self.user = get_user_model().objects.create_user(
@@ -225,6 +255,81 @@ class CarListViewTest(TestCase):
         self.assertIsInstance(response.context["search_form"], CarSearchForm)
 
 
+@override_settings(TAXI_CURSOR_PAGINATION=True)
+class CursorPaginationTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="Test",
+            password="test123",
+        )
+        self.client.force_login(self.user)
+
+    @classmethod
+    def setUpTestData(cls):
+        manufacturer = Manufacturer.objects.create(
+            name="test1",
+            country="test1",
+        )
+        for car_id in range(12):
+            Car.objects.create(
+                model=f"Car {car_id}",
+                manufacturer=manufacturer
+            )
+
+    def test_cursor_pages_walk_forward_and_back(self):
+        cars = list(Car.objects.order_by("id"))
+        first = self.client.get(CAR_URL)
+        self.assertEqual(list(first.context["car_list"]), cars[:5])
+        self.assertFalse(first.context["page_obj"].has_previous())
+
+        second = self.client.get(
+            CAR_URL, {"cursor": first.context["page_obj"].next_cursor}
+        )
+        self.assertEqual(list(second.context["car_list"]), cars[5:10])
+
+        back = self.client.get(
+            CAR_URL, {"cursor": second.context["page_obj"].previous_cursor}
+        )
+        self.assertEqual(list(back.context["car_list"]), cars[:5])
+        self.assertFalse(back.context["page_obj"].has_previous())
+
+    def test_cursor_page_skips_count_query(self):
+        first = self.client.get(CAR_URL)
+        # session, user, ETag MAX(updated_at) and the page query
+        with self.assertNumQueries(4) as queries:
+            self.client.get(
+                CAR_URL, {"cursor": first.context["page_obj"].next_cursor}
+            )
+        for query in queries.captured_queries:
+            self.assertNotIn("COUNT(", query["sql"])
+
+    def test_cursor_keeps_search_filter(self):
+        first = self.client.get(CAR_URL, {"model": "Car 1"})
+        self.assertEqual(len(first.context["car_list"]), 3)
+        self.assertFalse(first.context["is_paginated"])
+
+    def test_manufacturer_cursor_follows_name_ordering(self):
+        for manufacturer_id in range(6):
+            Manufacturer.objects.create(
+                name=f"Manufacturer {manufacturer_id}",
+                country="test",
+            )
+        first = self.client.get(MANUFACTURER_URL)
+        second = self.client.get(
+            MANUFACTURER_URL,
+            {"cursor": first.context["page_obj"].next_cursor},
+        )
+        names = [
+            manufacturer.name
+            for manufacturer in second.context["manufacturer_list"]
+        ]
+        self.assertEqual(names, ["Manufacturer 5", "test1"])
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get(CAR_URL, {"cursor": "garbage"})
+        self.assertEqual(response.status_code, 404)
+
+
 class CarCreateViewTest(TestCase):
     def setUp(self):
         self.user = get_user_model().objects.create_user(
@@ -440,3 +545,368 @@ class DriverDeleteViewTest(TestCase):
         self.assertFalse(
             get_user_model().objects.filter(username="test").exists()
         )
+
+
+class ToggleAssignToCarTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="Test",
+            password="test123",
+        )
+        self.client.force_login(self.user)
+        manufacturer = Manufacturer.objects.create(
+            name="test1",
+            country="test1",
+        )
+        self.car = Car.objects.create(
+            model="Test",
+            manufacturer=manufacturer,
+        )
+        self.url = reverse("taxi:toggle-car-assign", args=[self.car.id])
+
+    def test_toggle_assigns_and_unassigns(self):
+        response = self.client.post(self.url)
+        self.assertRedirects(
+            response, reverse("taxi:car-detail", args=[self.car.id])
+        )
+        self.assertIn(self.user, self.car.drivers.all())
+
+        self.client.post(self.url)
+        self.assertNotIn(self.user, self.car.drivers.all())
+
+    def test_toggle_query_count(self):
+        # session, user, savepoint pair, lookup, insert, two timestamps
+        with self.assertNumQueries(8):
+            self.client.post(self.url)
+
+    def test_toggle_requires_post(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 405)
+        self.assertFalse(self.car.drivers.exists())
+
+    def test_toggle_missing_car(self):
+        response = self.client.post(
+            reverse("taxi:toggle-car-assign", args=[self.car.id + 1])
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class BatchAssignTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="Test",
+            password="test123",
+        )
+        self.user.user_permissions.add(
+            Permission.objects.get(codename="change_car")
+        )
+        self.client.force_login(self.user)
+        manufacturer = Manufacturer.objects.create(
+            name="test1",
+            country="test1",
+        )
+        self.cars = [
+            Car.objects.create(
+                model=f"Car {car_id}",
+                manufacturer=manufacturer,
+            )
+            for car_id in range(3)
+        ]
+        self.cars[0].drivers.add(self.user)
+
+    def post(self, data):
+        return self.client.post(
+            reverse("taxi:batch-assign"),
+            data,
+            content_type="application/json",
+        )
+
+    def test_batch_assign_and_unassign(self):
+        response = self.post(
+            {
+                "assign": [
+                    [self.user.id, self.cars[1].id],
+                    [self.user.id, self.cars[2].id],
+                ],
+                "unassign": [[self.user.id, self.cars[0].id]],
+            }
+        )
+        self.assertEqual(response.json(), {"assigned": 2, "unassigned": 1})
+        self.assertEqual(
+            set(self.user.cars.all()), {self.cars[1], self.cars[2]}
+        )
+
+    def test_batch_skips_noop_pairs(self):
+        response = self.post(
+            {
+                "assign": [[self.user.id, self.cars[0].id]],
+                "unassign": [[self.user.id, self.cars[1].id]],
+            }
+        )
+        self.assertEqual(response.json(), {"assigned": 0, "unassigned": 0})
+
+    def test_batch_rejects_unknown_ids(self):
+        response = self.post({"assign": [[self.user.id, 0]]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["cars"], [0])
+
+    def test_batch_rejects_malformed_body(self):
+        response = self.post({"assign": "nope"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch_requires_change_car_permission(self):
+        driver = get_user_model().objects.create_user(
+            username="driver",
+            password="test123",
+            license_number="DRV00000",
+        )
+        self.client.force_login(driver)
+        response = self.post({"assign": [[self.user.id, self.cars[1].id]]})
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(self.cars[1].drivers.exists())
+
+
+class DriverAutocompleteTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="Test",
+            password="test123",
+            license_number="XYZ00000",
+        )
+        self.client.force_login(self.user)
+        for username, license_number in (
+            ("alice", "ABC12345"),
+            ("alfred", "DEF12345"),
+            ("bob", "ALF12345"),
+        ):
+            get_user_model().objects.create_user(
+                username=username,
+                password="test123",
+                license_number=license_number,
+            )
+
+    def autocomplete(self, query):
+        response = self.client.get(
+            reverse("taxi:driver-autocomplete"), {"q": query}
+        )
+        return [driver["id"] for driver in response.json()["results"]]
+
+    def test_prefix_matches_username_and_license(self):
+        drivers = get_user_model().objects.in_bulk(field_name="username")
+        self.assertEqual(
+            self.autocomplete("al"),
+            [drivers["alfred"].id, drivers["alice"].id, drivers["bob"].id],
+        )
+
+    def test_no_substring_matches(self):
+        self.assertEqual(self.autocomplete("ice"), [])
+
+    def test_empty_query(self):
+        self.assertEqual(self.autocomplete(""), [])
+
+
+class DetailFragmentCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="Test",
+            password="test123",
+            first_name="Old",
+        )
+        self.client.force_login(self.user)
+        self.manufacturer = Manufacturer.objects.create(
+            name="Toyota",
+            country="Japan",
+        )
+        self.car = Car.objects.create(
+            model="Prius",
+            manufacturer=self.manufacturer,
+        )
+        self.car.drivers.add(self.user)
+        self.car_url = reverse("taxi:car-detail", args=[self.car.id])
+        self.driver_url = reverse("taxi:driver-detail", args=[self.user.id])
+
+    def test_hot_pages_skip_fragment_queries(self):
+        self.client.get(self.car_url)
+        self.client.get(self.driver_url)
+        # session, user, ETag, object, is_assigned
+        with self.assertNumQueries(5):
+            self.client.get(self.car_url)
+        # session, user, ETag, object
+        with self.assertNumQueries(4):
+            self.client.get(self.driver_url)
+
+    def test_assignment_changes_invalidate(self):
+        self.client.get(self.car_url)
+        self.client.get(self.driver_url)
+        self.client.post(
+            reverse("taxi:toggle-car-assign", args=[self.car.id])
+        )
+        self.assertNotContains(self.client.get(self.car_url), "Test (Old")
+        self.assertContains(self.client.get(self.driver_url), "No cars!")
+
+    def test_edits_invalidate(self):
+        self.client.get(self.car_url)
+        self.client.get(self.driver_url)
+        self.user.first_name = "New"
+        self.user.save()
+        self.manufacturer.name = "Lexus"
+        self.manufacturer.save()
+        self.assertContains(self.client.get(self.car_url), "Test (New")
+        self.assertContains(self.client.get(self.driver_url), "Lexus")
+
+        self.car.model = "Camry"
+        self.car.save()
+        self.assertContains(self.client.get(self.driver_url), "Camry")
+
+    def test_deleting_car_invalidates_driver(self):
+        self.client.get(self.driver_url)
+        self.car.delete()
+        self.assertContains(self.client.get(self.driver_url), "No cars!")
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="Test",
+            password="test123",
+        )
+        self.client.force_login(self.user)
+        self.manufacturer = Manufacturer.objects.create(
+            name="Toyota",
+            country="Japan",
+        )
+        self.car = Car.objects.create(
+            model="Prius",
+            manufacturer=self.manufacturer,
+        )
+        self.car.drivers.add(self.user)
+        self.car_url = reverse("taxi:car-detail", args=[self.car.id])
+        self.driver_url = reverse("taxi:driver-detail", args=[self.user.id])
+        # Pick up the CSRF cookie, which is part of every ETag.
+        self.client.get(self.car_url)
+
+    def revalidate(self, url, **params):
+        etag = self.client.get(url, params)["ETag"]
+        return self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+
+    def assert_unchanged(self, url, change, **params):
+        etag = self.client.get(url, params)["ETag"]
+        change()
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def assert_changed(self, url, change, **params):
+        etag = self.client.get(url, params)["ETag"]
+        change()
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_unchanged_detail_skips_rendering(self):
+        response = self.client.get(self.car_url)
+        self.assertTrue(response.has_header("Last-Modified"))
+        # session, user and the ETag aggregate
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                self.car_url, HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(
+            self.client.get(
+                self.car_url,
+                HTTP_IF_MODIFIED_SINCE=response["Last-Modified"],
+            ).status_code,
+            304,
+        )
+
+    def test_unchanged_list_returns_not_modified(self):
+        for url in (MANUFACTURER_URL, CAR_URL, DRIVER_URL):
+            response = self.revalidate(url)
+            self.assertEqual(response.status_code, 304)
+            self.assertFalse(response.has_header("Last-Modified"))
+
+    def test_assignment_changes_detail_pages(self):
+        def toggle():
+            self.client.post(
+                reverse("taxi:toggle-car-assign", args=[self.car.id])
+            )
+
+        self.assert_changed(self.car_url, toggle)
+        self.assert_changed(self.driver_url, toggle)
+
+    def test_related_edits_change_detail_pages(self):
+        def rename_driver():
+            self.user.first_name = "New"
+            self.user.save()
+
+        def rename_manufacturer():
+            self.manufacturer.name = "Lexus"
+            self.manufacturer.save()
+
+        self.assert_changed(self.car_url, rename_driver)
+        self.assert_changed(self.driver_url, rename_manufacturer)
+        self.assert_changed(self.driver_url, self.car.delete)
+
+    def test_list_edits_and_deletions(self):
+        other = Car.objects.create(
+            model="Camry",
+            manufacturer=self.manufacturer,
+        )
+
+        def rename_car():
+            self.car.model = "Prius 2"
+            self.car.save()
+
+        self.assert_changed(CAR_URL, rename_car)
+        self.assert_changed(CAR_URL, other.delete)
+        self.assert_unchanged(CAR_URL, self.user.save, model="Prius")
+
+    def test_row_leaving_the_filter_changes_list(self):
+        Car.objects.create(
+            model="Prius Plus",
+            manufacturer=self.manufacturer,
+        )
+
+        def rename_car():
+            self.car.model = "Renamed"
+            self.car.save()
+
+        # The newest matching row stays, but the renamed one drops out.
+        self.assert_changed(CAR_URL, rename_car, model="Prius")
+
+    def test_deletion_in_another_worker_changes_list(self):
+        with tempfile.TemporaryDirectory() as tmp_dir, override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": (
+                        "django.core.cache.backends.filebased.FileBasedCache"
+                    ),
+                    "LOCATION": tmp_dir,
+                }
+            }
+        ):
+            # The newest row stays, so only the deletion token can tell.
+            Car.objects.create(
+                model="Camry",
+                manufacturer=self.manufacturer,
+            )
+            # The other worker's own connection to the shared cache.
+            worker_cache = FileBasedCache(tmp_dir, {})
+
+            def delete_in_worker():
+                with mock.patch("taxi.cache.cache", worker_cache):
+                    self.car.delete()
+
+            self.assert_changed(CAR_URL, delete_in_worker)
+
+    def test_etag_depends_on_user(self):
+        etag = self.client.get(self.car_url)["ETag"]
+        other = get_user_model().objects.create_user(
+            username="Other",
+            password="test123",
+            license_number="OTH12345",
+        )
+        self.client.force_login(other)
+        response = self.client.get(self.car_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
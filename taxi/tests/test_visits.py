@@ -0,0 +1,87 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from taxi.models import VisitCounter
+from taxi.visits import VisitBuffer, buffer
+
+
+class VisitBufferTest(TestCase):
+    def setUp(self):
+        self.driver = get_user_model().objects.create_user(
+            username="Test",
+            password="test123",
+        )
+        self.buffer = VisitBuffer()
+        start = mock.patch.object(VisitBuffer, "_start")
+        start.start()
+        self.addCleanup(start.stop)
+
+    def visits(self):
+        return VisitCounter.objects.get(driver=self.driver).visits
+
+    def test_flush_adds_to_stored_visits(self):
+        other_process = VisitBuffer()
+        for _ in range(3):
+            self.buffer.record(self.driver.pk)
+        other_process.record(self.driver.pk)
+        self.assertFalse(VisitCounter.objects.exists())
+
+        self.buffer.flush()
+        other_process.flush()
+        self.assertEqual(self.visits(), 4)
+        self.assertEqual(self.buffer.pending(self.driver.pk), 0)
+
+    def test_flush_skips_deleted_drivers(self):
+        other = get_user_model().objects.create_user(
+            username="Other",
+            password="test123",
+            license_number="OTH12345",
+        )
+        self.buffer.record(self.driver.pk)
+        self.buffer.record(other.pk)
+        other.delete()
+        self.buffer.flush()
+        self.assertEqual(self.visits(), 1)
+        self.assertEqual(VisitCounter.objects.count(), 1)
+
+    def test_flusher_survives_unexpected_errors(self):
+        class Stop(BaseException):
+            pass
+
+        flush = mock.patch.object(
+            self.buffer, "flush", side_effect=[RuntimeError, None]
+        )
+        with flush as flush, mock.patch(
+            "taxi.visits.time.sleep", side_effect=[None, None, Stop]
+        ), mock.patch("taxi.visits.connections"):
+            with self.assertLogs("taxi.visits", "ERROR"):
+                with self.assertRaises(Stop):
+                    self.buffer._run()
+        self.assertEqual(flush.call_count, 2)
+
+    @override_settings(TAXI_VISIT_FLUSH_INTERVAL=0)
+    def test_zero_interval_flushes_immediately(self):
+        self.buffer.record(self.driver.pk)
+        self.assertEqual(self.visits(), 1)
+
+
+class IndexVisitsTest(TestCase):
+    def setUp(self):
+        self.driver = get_user_model().objects.create_user(
+            username="Test",
+            password="test123",
+        )
+        self.client.force_login(self.driver)
+
+    def test_index_counts_visits_without_saving_session(self):
+        VisitCounter.objects.create(driver=self.driver, visits=5)
+        with mock.patch.object(VisitBuffer, "_start") as start:
+            response = self.client.get(reverse("taxi:index"))
+        start.assert_called_once()
+        self.addCleanup(buffer.flush)
+        self.assertEqual(response.context["num_visits"], 6)
+        self.assertNotIn("num_visits", self.client.session)
+        self.assertEqual(VisitCounter.objects.get().visits, 5)
@@ -0,0 +1,48 @@
+from collections import Counter
+
+from django.forms.renderers import get_default_renderer
+from django.template import engines
+from django.test import TestCase
+from django.urls import clear_url_caches, get_resolver
+
+from taxi import urls
+from taxi.warmup import warm_up
+
+
+class WarmUpTest(TestCase):
+    def test_warm_up(self):
+        loader = engines.all()[0].engine.template_loaders[0]
+        form_loader = (
+            get_default_renderer().engine.engine.template_loaders[0]
+        )
+        loader.reset()
+        form_loader.reset()
+        clear_url_caches()
+
+        with self.assertNumQueries(0):
+            timings = warm_up()
+
+        self.assertEqual(
+            set(timings), {"urls", "translations", "templates"}
+        )
+        self.assertTrue(get_resolver()._populated)
+        for name in (
+            "base.html",
+            "taxi/car_list.html",
+            "registration/login.html",
+            "bootstrap4/field.html",
+            "admin/change_list.html",
+        ):
+            self.assertIn(name, loader.get_template_cache)
+        self.assertIn(
+            "django/forms/widgets/select.html",
+            form_loader.get_template_cache,
+        )
+
+    def test_route_names_are_unique(self):
+        names = Counter(
+            pattern.name for pattern in urls.urlpatterns if pattern.name
+        )
+        self.assertEqual(
+            [name for name, count in names.items() if count > 1], []
+        )
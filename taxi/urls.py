@@ -1,5 +1,8 @@
 from django.urls import path
 
+from taxi.api import api_cars, api_drivers, api_manufacturers
+from taxi.middleware import QueryBudget
+
 from .views import (
     index,
     CarListView,
@@ -10,6 +13,7 @@ from .views import (
     DriverListView,
     DriverDetailView,
     DriverCreateView,
+    DriverProvisionView,
     DriverLicenseUpdateView,
     DriverDeleteView,
     ManufacturerListView,
@@ -17,6 +21,11 @@ from .views import (
     ManufacturerUpdateView,
     ManufacturerDeleteView,
     toggle_assign_to_car,
+    batch_assign,
+    driver_autocomplete,
+    export_cars,
+    export_drivers,
+    export_assignments,
 )
 
 urlpatterns = [
@@ -42,6 +51,7 @@ urlpatterns = [
         name="manufacturer-delete",
     ),
     path("cars/", CarListView.as_view(), name="car-list"),
+    path("cars/export/", export_cars, name="car-export"),
     path("cars/<int:pk>/", CarDetailView.as_view(), name="car-detail"),
     path("cars/create/", CarCreateView.as_view(), name="car-create"),
     path("cars/<int:pk>/update/", CarUpdateView.as_view(), name="car-update"),
@@ -55,11 +65,24 @@ urlpatterns = [
     path(
         "drivers/<int:pk>/", DriverDetailView.as_view(), name="driver-detail"
     ),
-    path("drivers/", DriverListView.as_view(), name="driver-list"),
+    path("drivers/export/", export_drivers, name="driver-export"),
     path(
-        "drivers/<int:pk>/", DriverDetailView.as_view(), name="driver-detail"
+        "drivers/autocomplete/",
+        driver_autocomplete,
+        name="driver-autocomplete",
+    ),
+    path("assignments/batch/", batch_assign, name="batch-assign"),
+    path(
+        "assignments/export/",
+        export_assignments,
+        name="assignment-export",
     ),
     path("drivers/create/", DriverCreateView.as_view(), name="driver-create"),
+    path(
+        "drivers/provision/",
+        DriverProvisionView.as_view(),
+        name="driver-provision",
+    ),
     path(
         "drivers/<int:pk>/update/",
         DriverLicenseUpdateView.as_view(),
@@ -70,6 +93,48 @@ urlpatterns = [
         DriverDeleteView.as_view(),
         name="driver-delete",
     ),
+    path("api/cars/", api_cars, name="api-car-list"),
+    path("api/drivers/", api_drivers, name="api-driver-list"),
+    path(
+        "api/manufacturers/",
+        api_manufacturers,
+        name="api-manufacturer-list",
+    ),
 ]
 
 app_name = "taxi"
+
+# Maximum number of SQL queries per GET and per POST request (including the
+# session and user lookups), enforced by taxi.middleware.QueryBudgetMiddleware
+# and checked for every route by taxi/tests/test_query_budgets.py. A write
+# also refreshes the denormalized counts and the conditional GET timestamps.
+query_budgets = {
+    "index": QueryBudget(4),
+    "manufacturer-list": QueryBudget(5),
+    "manufacturer-create": QueryBudget(2, post=5),
+    "manufacturer-update": QueryBudget(3, post=6),
+    "manufacturer-delete": QueryBudget(3, post=6),
+    # car-list and car-detail: one query on a cold manufacturer cache.
+    "car-list": QueryBudget(6),
+    "car-export": QueryBudget(5),
+    "car-detail": QueryBudget(7),
+    "car-create": QueryBudget(3, post=13),
+    # Adding and removing drivers in one update takes 4 more queries.
+    "car-update": QueryBudget(6, post=17),
+    "car-delete": QueryBudget(3, post=11),
+    "toggle-car-assign": QueryBudget(post=8),
+    "driver-list": QueryBudget(5),
+    "driver-detail": QueryBudget(5),
+    "driver-export": QueryBudget(4),
+    "driver-autocomplete": QueryBudget(4),
+    "batch-assign": QueryBudget(post=15),
+    "assignment-export": QueryBudget(4),
+    "driver-create": QueryBudget(2, post=6),
+    # An upload of DriverProvisionForm.UPLOAD_LIMIT rows takes 8 INSERTs.
+    "driver-provision": QueryBudget(2, post=14),
+    "driver-update": QueryBudget(3, post=6),
+    "driver-delete": QueryBudget(3, post=13),
+    "api-car-list": QueryBudget(5),
+    "api-driver-list": QueryBudget(5),
+    "api-manufacturer-list": QueryBudget(4),
+}
@@ -1,48 +1,138 @@
+import json
+
 from django.contrib.auth import get_user_model
-from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseRedirect
+from django.contrib.auth.decorators import (
+    login_required,
+    permission_required,
+)
+from django.db import IntegrityError, transaction
+from django.db.models import OuterRef, Q, Subquery
+from django.http import (
+    Http404,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import render
 from django.urls import reverse_lazy
 from django.views import generic
+from django.views.decorators.http import require_POST
 from django.contrib.auth.mixins import LoginRequiredMixin
 
-from taxi.models import Driver, Car, Manufacturer
+from taxi import export
+from taxi.assignments import (
+    Assignment,
+    add_assignments,
+    existing_assignments,
+    remove_assignments,
+)
+from taxi.cache import attach_manufacturers, get_version
+from taxi.conditional import ConditionalDetailMixin, ConditionalListMixin
+from taxi.models import Driver, Car, Manufacturer, FleetCounters
 from taxi.forms import (
     DriverCreationForm,
     DriverLicenseUpdateForm,
+    DriverProvisionForm,
     CarForm,
     DriverSearchForm,
     CarSearchForm,
     ManufacturerSearchForm,
 )
+from taxi.pagination import CursorPaginationMixin
+from taxi.provisioning import provision_drivers
+from taxi.search import ranked_ordering, search
+from taxi.visits import record_visit
+
+BATCH_ASSIGN_LIMIT = 10000
+
+AUTOCOMPLETE_LIMIT = 20
+
+
+def filter_cars(queryset, params):
+    form = CarSearchForm(params)
+    if form.is_valid():
+        return search(queryset, form.cleaned_data["model"], "model")
+    return queryset
+
+
+def filter_manufacturers(queryset, params):
+    form = ManufacturerSearchForm(params)
+    if form.is_valid():
+        return search(queryset, form.cleaned_data["name"], "name")
+    return queryset
+
+
+def filter_drivers(queryset, params):
+    form = DriverSearchForm(params)
+    if form.is_valid():
+        return search(queryset, form.cleaned_data["username"], "username")
+    return queryset
+
+
+def count_ordering(params, field):
+    """Ordering for ``?sort=<field>`` or ``?sort=-<field>``, else ``None``.
+
+    Ties are broken by id, matching the ``(<field>, id)`` indexes of the
+    counts from ``taxi.counts``.
+    """
+    sort = params.get("sort")
+    if sort == field:
+        return (field, "id")
+    if sort == f"-{field}":
+        return (f"-{field}", "-id")
+    return None
+
+
+class CountSortMixin:
+    """Let list views be sorted by the count in ``count_field``.
+
+    A count sort replaces the relevance order of full-text search
+    results; without one, cursor pages of search results follow it too.
+    """
+
+    count_field = None
+
+    def get_cursor_ordering(self, queryset):
+        return (
+            count_ordering(self.request.GET, self.count_field)
+            or ranked_ordering(queryset)
+            or super().get_cursor_ordering(queryset)
+        )
+
+    def sort_queryset(self, queryset):
+        ordering = count_ordering(self.request.GET, self.count_field)
+        return queryset.order_by(*ordering) if ordering else queryset
 
 
 @login_required
 def index(request):
     """View function for the home page of the site."""
 
-    num_drivers = Driver.objects.count()
-    num_cars = Car.objects.count()
-    num_manufacturers = Manufacturer.objects.count()
-
-    num_visits = request.session.get("num_visits", 0)
-    request.session["num_visits"] = num_visits + 1
+    counters = FleetCounters.load()
 
     context = {
-        "num_drivers": num_drivers,
-        "num_cars": num_cars,
-        "num_manufacturers": num_manufacturers,
-        "num_visits": num_visits + 1,
+        "num_drivers": counters.num_drivers,
+        "num_cars": counters.num_cars,
+        "num_manufacturers": counters.num_manufacturers,
+        "num_visits": record_visit(request.user.pk),
     }
 
     return render(request, "taxi/index.html", context=context)
 
 
-class ManufacturerListView(LoginRequiredMixin, generic.ListView):
+class ManufacturerListView(
+    LoginRequiredMixin,
+    ConditionalListMixin,
+    CountSortMixin,
+    CursorPaginationMixin,
+    generic.ListView,
+):
     model = Manufacturer
+    count_field = "num_cars"
     context_object_name = "manufacturer_list"
     template_name = "taxi/manufacturer_list.html"
     paginate_by = 5
+    cursor_ordering = ("name",)
 
     def get_context_data(self, *, object_list=None, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -55,11 +145,9 @@ class ManufacturerListView(LoginRequiredMixin, generic.ListView):
         return context
 
     def get_queryset(self):
-        queryset = Manufacturer.objects.all()
-        form = ManufacturerSearchForm(self.request.GET)
-        if form.is_valid():
-            return queryset.filter(name__icontains=form.cleaned_data["name"])
-        return queryset
+        return self.sort_queryset(
+            filter_manufacturers(Manufacturer.objects.all(), self.request.GET)
+        )
 
 
 class ManufacturerCreateView(LoginRequiredMixin, generic.CreateView):
@@ -79,8 +167,15 @@ class ManufacturerDeleteView(LoginRequiredMixin, generic.DeleteView):
     success_url = reverse_lazy("taxi:manufacturer-list")
 
 
-class CarListView(LoginRequiredMixin, generic.ListView):
+class CarListView(
+    LoginRequiredMixin,
+    ConditionalListMixin,
+    CountSortMixin,
+    CursorPaginationMixin,
+    generic.ListView,
+):
     model = Car
+    count_field = "num_drivers"
     paginate_by = 5
 
     def get_context_data(self, *, object_list=None, **kwargs):
@@ -91,18 +186,36 @@ class CarListView(LoginRequiredMixin, generic.ListView):
                 "model": model
             }
         )
+        cars = attach_manufacturers(list(context["object_list"]))
+        context["object_list"] = context["car_list"] = cars
         return context
 
     def get_queryset(self):
-        queryset = Car.objects.select_related("manufacturer").order_by("id")
-        form = CarSearchForm(self.request.GET)
-        if form.is_valid():
-            return queryset.filter(model__icontains=form.cleaned_data["model"])
-        return queryset
+        return self.sort_queryset(
+            filter_cars(Car.objects.order_by("id"), self.request.GET)
+        )
 
 
-class CarDetailView(LoginRequiredMixin, generic.DetailView):
+class CarDetailView(
+    LoginRequiredMixin, ConditionalDetailMixin, generic.DetailView
+):
     model = Car
+    related_updated_at = ("drivers__updated_at",)
+
+    def get_object(self, queryset=None):
+        car = super().get_object(queryset)
+        attach_manufacturers([car])
+        return car
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["is_assigned"] = self.object.drivers.filter(
+            pk=self.request.user.pk
+        ).exists()
+        # Lazy: only evaluated when the cached fragment is re-rendered.
+        context["drivers"] = self.object.drivers.all()
+        context["fragment_version"] = get_version(("car", self.object.pk))
+        return context
 
 
 class CarCreateView(LoginRequiredMixin, generic.CreateView):
@@ -122,8 +235,15 @@ class CarDeleteView(LoginRequiredMixin, generic.DeleteView):
     success_url = reverse_lazy("taxi:car-list")
 
 
-class DriverListView(LoginRequiredMixin, generic.ListView):
+class DriverListView(
+    LoginRequiredMixin,
+    ConditionalListMixin,
+    CountSortMixin,
+    CursorPaginationMixin,
+    generic.ListView,
+):
     model = Driver
+    count_field = "num_cars"
     paginate_by = 5
 
     def get_context_data(self, *, object_list=None, **kwargs):
@@ -137,18 +257,28 @@ class DriverListView(LoginRequiredMixin, generic.ListView):
         return context
 
     def get_queryset(self):
-        queryset = get_user_model().objects.all().order_by("id")
-        form = DriverSearchForm(self.request.GET)
-        if form.is_valid():
-            return queryset.filter(
-                username__icontains=form.cleaned_data["username"]
+        return self.sort_queryset(
+            filter_drivers(
+                get_user_model().objects.all().order_by("id"),
+                self.request.GET,
             )
-        return queryset
+        )
 
 
-class DriverDetailView(LoginRequiredMixin, generic.DetailView):
+class DriverDetailView(
+    LoginRequiredMixin, ConditionalDetailMixin, generic.DetailView
+):
     model = Driver
-    queryset = Driver.objects.all().prefetch_related("cars__manufacturer")
+    related_updated_at = ("cars__updated_at",)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Lazy: only evaluated when the cached fragment is re-rendered.
+        context["cars"] = self.object.cars.select_related("manufacturer")
+        context["fragment_version"] = get_version(
+            ("driver", self.object.pk), ("manufacturers",)
+        )
+        return context
 
 
 class DriverCreateView(LoginRequiredMixin, generic.CreateView):
@@ -156,6 +286,31 @@ class DriverCreateView(LoginRequiredMixin, generic.CreateView):
     form_class = DriverCreationForm
 
 
+class DriverProvisionView(LoginRequiredMixin, generic.FormView):
+    form_class = DriverProvisionForm
+    template_name = "taxi/driver_provision.html"
+
+    def form_valid(self, form):
+        try:
+            # Hashing on a pool of processes is left to the command: the
+            # upload is capped instead of forking from a web worker.
+            created, errors = provision_drivers(
+                form.cleaned_data["csv_file"], workers=1
+            )
+        except IntegrityError:
+            form.add_error(
+                "csv_file",
+                "Some of these drivers were created meanwhile; "
+                "upload the file again.",
+            )
+            return self.form_invalid(form)
+        return self.render_to_response(
+            self.get_context_data(
+                form=self.form_class(), created=created, errors=errors
+            )
+        )
+
+
 class DriverLicenseUpdateView(LoginRequiredMixin, generic.UpdateView):
     model = Driver
     form_class = DriverLicenseUpdateForm
@@ -167,13 +322,173 @@ class DriverDeleteView(LoginRequiredMixin, generic.DeleteView):
     success_url = reverse_lazy("taxi:driver-list")
 
 
+def prefix_range(field, prefix):
+    """Prefix filter that can use a plain (binary collated) index."""
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return Q(**{f"{field}__gte": prefix, f"{field}__lt": upper})
+
+
+@login_required
+def driver_autocomplete(request):
+    """JSON list of drivers whose username or license starts with ``q``."""
+    query = request.GET.get("q", "").strip()
+    results = []
+    if query:
+        drivers = get_user_model().objects.values(
+            "id", "username", "first_name", "last_name", "license_number"
+        )
+        by_username = drivers.filter(
+            prefix_range("username", query)
+        ).order_by("username")[:AUTOCOMPLETE_LIMIT]
+        by_license = drivers.filter(
+            prefix_range("license_number", query.upper())
+        ).order_by("license_number")[:AUTOCOMPLETE_LIMIT]
+        seen = set()
+        for driver in [*by_username, *by_license]:
+            if driver["id"] in seen or len(seen) == AUTOCOMPLETE_LIMIT:
+                continue
+            seen.add(driver["id"])
+            results.append(
+                {
+                    "id": driver["id"],
+                    "text": (
+                        f"{driver['username']} ({driver['first_name']} "
+                        f"{driver['last_name']})"
+                    ),
+                    "license_number": driver["license_number"],
+                }
+            )
+    return JsonResponse({"results": results})
+
+
 @login_required
+@require_POST
 def toggle_assign_to_car(request, pk):
-    driver = Driver.objects.get(id=request.user.id)
-    if (
-        Car.objects.get(id=pk) in driver.cars.all()
-    ):  # probably could check if car exists
-        driver.cars.remove(pk)
-    else:
-        driver.cars.add(pk)
+    toggle_assignment(request.user.id, pk)
     return HttpResponseRedirect(reverse_lazy("taxi:car-detail", args=[pk]))
+
+
+@transaction.atomic
+def toggle_assignment(driver_id, car_id):
+    # One query tells both whether the car exists and whether the driver
+    # is assigned to it.
+    assignment_ids = list(
+        Car.objects.filter(pk=car_id)
+        .annotate(
+            assignment_id=Subquery(
+                Assignment.objects.filter(
+                    car_id=OuterRef("pk"), driver_id=driver_id
+                ).values("id")[:1]
+            )
+        )
+        .values_list("assignment_id", flat=True)
+    )
+    if not assignment_ids:
+        raise Http404("No car found matching the query")
+    pair = (driver_id, car_id)
+    if assignment_ids[0] is None:
+        add_assignments([pair])
+    else:
+        remove_assignments({pair: assignment_ids[0]})
+
+
+def parse_pairs(data, key):
+    pairs = data.get(key, [])
+    if not isinstance(pairs, list):
+        raise ValueError(f"{key!r} must be a list of [driver_id, car_id]")
+    try:
+        return {(int(driver), int(car)) for driver, car in pairs}
+    except (TypeError, ValueError):
+        raise ValueError(f"{key!r} must be a list of [driver_id, car_id]")
+
+
+@login_required
+@permission_required("taxi.change_car", raise_exception=True)
+@require_POST
+def batch_assign(request):
+    """Assign/unassign many drivers to/from cars in one request.
+
+    Expects a JSON body like
+    ``{"assign": [[driver_id, car_id], ...], "unassign": [...]}``.
+    Unlike the toggle, which only (un)assigns the user, this takes the
+    ``taxi.change_car`` permission.
+    """
+    try:
+        data = json.loads(request.body)
+        to_assign = parse_pairs(data, "assign")
+        to_unassign = parse_pairs(data, "unassign")
+    except (ValueError, AttributeError) as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    if len(to_assign) + len(to_unassign) > BATCH_ASSIGN_LIMIT:
+        return JsonResponse(
+            {"error": f"At most {BATCH_ASSIGN_LIMIT} pairs per request"},
+            status=400,
+        )
+
+    pairs = to_assign | to_unassign
+    driver_ids = {driver_id for driver_id, _ in pairs}
+    car_ids = {car_id for _, car_id in pairs}
+    missing_drivers = driver_ids - set(
+        get_user_model()
+        .objects.filter(pk__in=driver_ids)
+        .values_list("pk", flat=True)
+    )
+    missing_cars = car_ids - set(
+        Car.objects.filter(pk__in=car_ids).values_list("pk", flat=True)
+    )
+    if missing_drivers or missing_cars:
+        return JsonResponse(
+            {
+                "error": "Unknown drivers or cars",
+                "drivers": sorted(missing_drivers),
+                "cars": sorted(missing_cars),
+            },
+            status=400,
+        )
+
+    with transaction.atomic():
+        existing = existing_assignments(pairs)
+        to_assign = to_assign - existing.keys()
+        to_unassign = {
+            pair: existing[pair] for pair in to_unassign if pair in existing
+        }
+        add_assignments(to_assign)
+        remove_assignments(to_unassign)
+    return JsonResponse(
+        {"assigned": len(to_assign), "unassigned": len(to_unassign)}
+    )
+
+
+def export_response(request, rows, filename):
+    export_format = request.GET.get("format", "csv")
+    if export_format not in export.FORMATS:
+        raise Http404(f"Unknown export format {export_format!r}")
+    serialize, content_type = export.FORMATS[export_format]
+    response = StreamingHttpResponse(
+        serialize(rows), content_type=content_type
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="{filename}.{export_format}"'
+    )
+    return response
+
+
+@login_required
+def export_cars(request):
+    cars = filter_cars(Car.objects.all(), request.GET)
+    return export_response(request, export.car_rows(cars), "cars")
+
+
+@login_required
+def export_drivers(request):
+    drivers = filter_drivers(get_user_model().objects.all(), request.GET)
+    return export_response(request, export.driver_rows(drivers), "drivers")
+
+
+@login_required
+def export_assignments(request):
+    cars = filter_cars(Car.objects.all(), request.GET)
+    drivers = filter_drivers(get_user_model().objects.all(), request.GET)
+    return export_response(
+        request, export.assignment_rows(cars, drivers), "assignments"
+    )
@@ -0,0 +1,132 @@
+"""Buffered home page visit counts.
+
+Visits are counted in memory and added to ``VisitCounter`` rows by a
+background thread every ``settings.TAXI_VISIT_FLUSH_INTERVAL`` seconds,
+instead of saving the session on every home page request. The flush is
+one additive upsert, so any number of worker processes can share the
+table, and whatever is still buffered is written when the process exits.
+A value of 0 flushes synchronously on every visit, which tests rely on.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import (
+    DatabaseError,
+    connections,
+    router,
+    transaction,
+)
+
+from taxi.models import Driver, VisitCounter
+
+logger = logging.getLogger("taxi.visits")
+
+UPSERT_BATCH_SIZE = 500
+
+
+def _upsert(counts):
+    using = router.db_for_write(VisitCounter)
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    table = quote(VisitCounter._meta.db_table)
+    driver = quote(VisitCounter._meta.get_field("driver").column)
+    visits = quote(VisitCounter._meta.get_field("visits").column)
+    with transaction.atomic(using), connection.cursor() as cursor:
+        # Skip drivers deleted since their visits were counted.
+        driver_ids = Driver.objects.using(using).filter(
+            pk__in=counts.keys()
+        ).values_list("pk", flat=True)
+        items = [(pk, counts[pk]) for pk in driver_ids]
+        for start in range(0, len(items), UPSERT_BATCH_SIZE):
+            batch = items[start:start + UPSERT_BATCH_SIZE]
+            values = ", ".join(["(%s, %s)"] * len(batch))
+            cursor.execute(
+                f"INSERT INTO {table} ({driver}, {visits}) VALUES {values} "
+                f"ON CONFLICT ({driver}) "
+                f"DO UPDATE SET {visits} = {table}.{visits} + "
+                f"excluded.{visits}",
+                [value for item in batch for value in item],
+            )
+
+
+class VisitBuffer:
+    def __init__(self):
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+        atexit.register(self.flush)
+
+    def _reset(self):
+        # Buffered counts and the flusher thread do not survive a fork.
+        self._lock = threading.Lock()
+        self._pending = Counter()
+        self._thread = None
+
+    def record(self, driver_id):
+        with self._lock:
+            self._pending[driver_id] += 1
+        if settings.TAXI_VISIT_FLUSH_INTERVAL:
+            self._start()
+        else:
+            self.flush()
+
+    def pending(self, driver_id):
+        with self._lock:
+            return self._pending[driver_id]
+
+    def flush(self):
+        with self._lock:
+            counts, self._pending = self._pending, Counter()
+        if not counts:
+            return
+        try:
+            _upsert(counts)
+        except DatabaseError:
+            logger.exception("Could not flush %d visit counts", len(counts))
+            with self._lock:
+                self._pending.update(counts)
+
+    def _start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="taxi-visit-flusher", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(settings.TAXI_VISIT_FLUSH_INTERVAL)
+            try:
+                self.flush()
+            except Exception:
+                # flush() keeps the counts on database errors; anything
+                # else must not end the thread, since _start() would not
+                # start another one.
+                logger.exception("Visit flusher failed")
+            finally:
+                connections.close_all()
+
+
+buffer = VisitBuffer()
+
+
+def record_visit(driver_id):
+    """Count a home page visit and return the driver's total visits.
+
+    The total includes this process's unflushed visits, but other
+    processes' only once they have flushed.
+    """
+    buffer.record(driver_id)
+    stored = (
+        VisitCounter.objects.filter(driver_id=driver_id)
+        .values_list("visits", flat=True)
+        .first()
+    )
+    return (stored or 0) + buffer.pending(driver_id)
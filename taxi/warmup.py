@@ -0,0 +1,97 @@
+"""Work done once before a server forks its workers.
+
+Without it every worker imports the views, builds the URL resolver and
+compiles each template on its first requests, paying for it in latency
+and in a private copy of the result. ``warm_up()`` does that work in the
+master process instead (``gunicorn --preload``, or the import of
+``taxi_service.wsgi``/``asgi``), so the workers start ready and share the
+memory copy-on-write. See ``settings.TAXI_WARM_UP``.
+"""
+import gc
+import logging
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.forms.renderers import get_default_renderer
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.urls import get_resolver
+from django.utils import translation
+
+logger = logging.getLogger("taxi.warmup")
+
+
+def template_names(engine, prefix=""):
+    """Yield the name of every template ``engine`` can load."""
+    for loader in engine.template_loaders:
+        # The cached loader wraps the loaders that know the directories.
+        for inner in getattr(loader, "loaders", [loader]):
+            for directory in map(Path, inner.get_dirs()):
+                for path in (directory / prefix).rglob("*"):
+                    if path.is_file():
+                        yield path.relative_to(directory).as_posix()
+
+
+def compile_templates(engine, prefix=""):
+    """Fill the cached loader of ``engine``; return the templates count."""
+    count = 0
+    for name in sorted(set(template_names(engine, prefix))):
+        try:
+            engine.get_template(name)
+        except (TemplateDoesNotExist, TemplateSyntaxError) as e:
+            # Partials of packages, e.g. unused crispy template packs.
+            logger.debug("Skipped template %s: %s", name, e)
+        else:
+            count += 1
+    return count
+
+
+def warm_up(freeze=False):
+    """Populate the process-wide caches built lazily on first requests.
+
+    Imports the URLconfs (and with them the views and form classes),
+    compiles their patterns, loads the translation catalogs and compiles
+    every page template and the form widget templates. Runs no queries,
+    and closes any connection opened on the way so no socket is shared
+    with the forked workers. With ``freeze``, the objects created so far
+    are moved out of the garbage collector's reach, as collections in
+    the workers would otherwise write to (and so copy) their pages.
+
+    Returns the time taken by each step, in seconds.
+    """
+    timings = {}
+
+    start = time.perf_counter()
+    resolver = get_resolver()
+    # Populating the reverse lookups compiles every pattern regex,
+    # including those of included URLconfs.
+    resolver.reverse_dict
+    timings["urls"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    translation.activate(settings.LANGUAGE_CODE)
+    translation.deactivate()
+    timings["translations"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    templates = sum(
+        compile_templates(backend.engine)
+        for backend in engines.all()
+        if hasattr(backend, "engine")
+    )
+    renderer = get_default_renderer()
+    if hasattr(renderer, "engine"):
+        templates += compile_templates(
+            renderer.engine.engine, "django/forms/"
+        )
+    timings["templates"] = time.perf_counter() - start
+
+    connections.close_all()
+    if freeze:
+        gc.collect()
+        gc.freeze()
+    logger.info(
+        "Warmed up in %.3fs (%d templates)", sum(timings.values()), templates
+    )
+    return timings
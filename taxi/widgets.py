@@ -0,0 +1,33 @@
+from django import forms
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+
+
+class DriverAutocompleteWidget(forms.SelectMultiple):
+    """Multiple select that only renders the currently selected drivers.
+
+    Other drivers are looked up from the ``taxi:driver-autocomplete``
+    endpoint by ``js/driver_autocomplete.js`` as the user types, so the
+    page size does not depend on the number of drivers.
+    """
+
+    class Media:
+        js = ("js/driver_autocomplete.js",)
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs["data-autocomplete-url"] = reverse("taxi:driver-autocomplete")
+        return attrs
+
+    def optgroups(self, name, value, attrs=None):
+        iterator = self.choices
+        selected = [pk for pk in value if pk not in ("", None)]
+        try:
+            queryset = iterator.queryset.filter(pk__in=selected)
+            self.choices = [iterator.choice(obj) for obj in queryset]
+        except (ValueError, ValidationError):
+            self.choices = []
+        try:
+            return super().optgroups(name, value, attrs)
+        finally:
+            self.choices = iterator
@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/4.0/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
+from taxi.warmup import warm_up
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "taxi_service.settings")
+os.environ.setdefault("TAXI_ASYNC_VIEWS", "1")
 
 application = get_asgi_application()
+
+if settings.TAXI_WARM_UP:
+    warm_up(freeze=True)
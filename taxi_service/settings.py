@@ -10,11 +10,25 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / "subdir".
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# "production" switches on the tuned database settings below.
+TAXI_PROFILE = os.environ.get("TAXI_PROFILE", "development")
+
+# Serve the read views and the assignment toggle with their async versions
+# from taxi/async_views.py. taxi_service/asgi.py turns this on.
+TAXI_ASYNC_VIEWS = os.environ.get("TAXI_ASYNC_VIEWS") == "1"
+
+# Load django-debug-toolbar (development only). It is sync-only, so it is
+# never loaded with the async views.
+TAXI_DEBUG_TOOLBAR = (
+    os.environ.get("TAXI_DEBUG_TOOLBAR") == "1" and not TAXI_ASYNC_VIEWS
+)
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/4.0/howto/deployment/checklist/
@@ -42,7 +56,6 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
-    "debug_toolbar",
     "crispy_forms",
     "crispy_bootstrap4",
     "taxi",
@@ -50,8 +63,11 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
+    "taxi.metrics.MetricsMiddleware",
+    "taxi.slow_queries.SlowQueryMiddleware",
+    "taxi.middleware.QueryBudgetMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
+    "taxi.routers.ReplicaPinningMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
@@ -59,14 +75,33 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+if TAXI_DEBUG_TOOLBAR:
+    INSTALLED_APPS.append("debug_toolbar")
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("taxi.middleware.QueryBudgetMiddleware") + 1,
+        "debug_toolbar.middleware.DebugToolbarMiddleware",
+    )
+
 ROOT_URLCONF = "taxi_service.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # Django's backend, timing renders for taxi.metrics.
+        "BACKEND": "taxi.metrics.DjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
-        "APP_DIRS": True,
         "OPTIONS": {
+            # Compile each template once per process (taxi/warmup.py fills
+            # the cache before the workers fork). The development server
+            # still reloads changed templates.
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
             "context_processors": [
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",
@@ -90,10 +125,67 @@ WSGI_APPLICATION = "taxi_service.wsgi.application"
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "NAME": os.environ.get("TAXI_DB_PATH", BASE_DIR / "db.sqlite3"),
     }
 }
 
+# PRAGMAs run on every new SQLite connection (see taxi.signals).
+TAXI_SQLITE_PRAGMAS = {}
+
+if TAXI_PROFILE == "production":
+    DATABASES["default"].update(
+        {
+            # Adds OPTIONS["transaction_mode"], see the module docstring.
+            "ENGINE": "taxi_service.sqlite3",
+            # Reuse connections across requests instead of reconnecting
+            # (and re-running the PRAGMAs) every time.
+            "CONN_MAX_AGE": 600,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                # Seconds a writer waits for the lock before
+                # "database is locked".
+                "timeout": 20,
+                "transaction_mode": "IMMEDIATE",
+            },
+        }
+    )
+    TAXI_SQLITE_PRAGMAS = {
+        # Readers no longer block the writer, nor the writer the readers.
+        "journal_mode": "WAL",
+        # Safe with WAL: a power loss can only drop the last commits.
+        "synchronous": "NORMAL",
+        "busy_timeout": 20000,
+        # Negative sizes are in KiB: 64 MiB of page cache per connection.
+        "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    }
+
+
+# Read replicas: copies of the primary database file, listed in the
+# TAXI_READ_REPLICAS environment variable (separated by os.pathsep) and
+# refreshed with "manage.py sync_replicas". Reads are spread over them;
+# writes, and each writer's session for TAXI_REPLICA_PIN_SECONDS
+# afterwards, use the primary (see taxi/routers.py).
+TAXI_READ_REPLICAS = []
+
+for number, path in enumerate(
+    filter(None, os.environ.get("TAXI_READ_REPLICAS", "").split(os.pathsep)),
+    start=1,
+):
+    alias = f"replica{number}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "NAME": path,
+        "TEST": {"MIRROR": "default"},
+    }
+    TAXI_READ_REPLICAS.append(alias)
+
+# Longer than the replication lag, i.e. the sync_replicas interval.
+TAXI_REPLICA_PIN_SECONDS = 10
+
+DATABASE_ROUTERS = ["taxi.routers.ReplicaRouter"]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
@@ -121,6 +213,36 @@ AUTH_USER_MODEL = "taxi.Driver"
 
 LOGIN_REDIRECT_URL = "/"
 
+# Cached template fragments, the list page ETags and the manufacturer cache
+# are invalidated through version tokens kept in this cache, so every worker
+# process must see the same one. Local memory only serves a single process
+# (the development server); the production profile shares a directory
+# between the processes of one host, or Redis at TAXI_REDIS_URL.
+# taxi.cache.check_shared_cache() refuses to start it on a per-process cache.
+# https://docs.djangoproject.com/en/4.0/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    }
+}
+
+if TAXI_PROFILE == "production":
+    if os.environ.get("TAXI_REDIS_URL"):
+        CACHES["default"] = {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["TAXI_REDIS_URL"],
+        }
+    else:
+        CACHES["default"] = {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.environ.get(
+                "TAXI_CACHE_DIR", BASE_DIR / "cache"
+            ),
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        }
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.0/topics/i18n/
 
@@ -142,6 +264,93 @@ STATICFILES_DIRS = (BASE_DIR / "static",)
 
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+if TAXI_PROFILE == "production":
+    # Content-hashed names and .gz siblings, built by
+    # "manage.py build_assets" (see taxi_service/staticfiles.py).
+    STATICFILES_STORAGE = (
+        "taxi_service.staticfiles.CompressedManifestStaticFilesStorage"
+    )
+
+# Taxi service options
+
+# Paginate list views with opaque keyset cursors instead of page numbers.
+# Skips the COUNT(*) query and keeps deep pages as cheap as the first one.
+TAXI_CURSOR_PAGINATION = False
+
+# Run the list-view searches against the SQLite FTS5 index (prefix matching,
+# relevance ordering) instead of LIKE '%...%' scans.
+TAXI_FULL_TEXT_SEARCH = False
+
+# The car pages take manufacturers from a per-process LRU cache of up to
+# TAXI_MANUFACTURER_CACHE_SIZE entries, kept at most
+# TAXI_MANUFACTURER_CACHE_TTL seconds, in front of the default cache.
+TAXI_MANUFACTURER_CACHE_SIZE = 1024
+TAXI_MANUFACTURER_CACHE_TTL = 60
+
+# Import the views, build the URL resolver and compile the templates when
+# taxi_service.wsgi/asgi is imported, before a preloading server forks its
+# workers (see taxi/warmup.py).
+TAXI_WARM_UP = os.environ.get("TAXI_WARM_UP", "1") == "1"
+
+# Serve STATIC_ROOT from the WSGI application, with far-future caching of
+# the fingerprinted files (see taxi_service/staticfiles.py).
+TAXI_SERVE_STATIC = TAXI_PROFILE == "production"
+
+# Processes hashing the passwords of drivers created in bulk (see
+# taxi/provisioning.py); None starts one per CPU.
+TAXI_PROVISION_WORKERS = None
+
+# Admin changelists take unfiltered totals from FleetCounters and search
+# the FTS5 index, and deleting selected cars runs set-based statements.
+TAXI_ADMIN_PERFORMANCE_MODE = True
+
+# What to do when a view exceeds its query budget from taxi/urls.py:
+# "log" a warning, "raise" an exception, or None to skip the check.
+TAXI_QUERY_BUDGET_MODE = "log" if DEBUG else None
+
+# Time every request (SQL, templates, total) for the Prometheus histograms
+# served at /metrics to staff users and to scrapers sending
+# "Authorization: Bearer <TAXI_METRICS_TOKEN>".
+TAXI_METRICS = True
+TAXI_METRICS_TOKEN = os.environ.get("TAXI_METRICS_TOKEN")
+
+# Also send the timings to every client in a Server-Timing header.
+TAXI_SERVER_TIMING = os.environ.get("TAXI_SERVER_TIMING") == "1"
+
+# Log sampled SQL queries slower than TAXI_SLOW_QUERY_MS milliseconds (None
+# disables the log), with their plan, to TAXI_SLOW_QUERY_LOG as JSON lines.
+# `manage.py top_queries` summarizes the log.
+TAXI_SLOW_QUERY_MS = 100
+TAXI_SLOW_QUERY_SAMPLE_RATE = 1.0
+TAXI_SLOW_QUERY_LOG = os.environ.get(
+    "TAXI_SLOW_QUERY_LOG", BASE_DIR / "slow_queries.log"
+)
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {"message": {"format": "%(message)s"}},
+    "handlers": {
+        "slow_queries": {
+            "class": "logging.handlers.WatchedFileHandler",
+            "filename": TAXI_SLOW_QUERY_LOG,
+            "formatter": "message",
+            "delay": True,
+        },
+    },
+    "loggers": {
+        "taxi.slow_queries": {
+            "handlers": ["slow_queries"],
+            "level": "WARNING",
+            "propagate": False,
+        },
+    },
+}
+
+# Seconds between batched writes of the buffered home page visit counts.
+# 0 writes every visit immediately.
+TAXI_VISIT_FLUSH_INTERVAL = 5
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.0/ref/settings/#default-auto-field
 
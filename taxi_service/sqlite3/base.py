@@ -0,0 +1,23 @@
+"""SQLite backend that can take the write lock when a transaction starts.
+
+SQLite starts ``BEGIN`` transactions as readers and upgrades them on their
+first write. If another connection has written in the meantime, the
+upgrade fails at once with "database is locked", whatever the busy
+timeout. Setting ``OPTIONS["transaction_mode"] = "IMMEDIATE"`` makes
+``atomic()`` blocks start with ``BEGIN IMMEDIATE`` instead, so they queue
+on the busy timeout. The option matches the one built into Django 5.1.
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        self.transaction_mode = kwargs.pop("transaction_mode", None)
+        return kwargs
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode:
+            self.cursor().execute(f"BEGIN {self.transaction_mode}")
+        else:
+            super()._start_transaction_under_autocommit()
@@ -0,0 +1,160 @@
+"""Fingerprinted, precompressed static files and a WSGI layer serving them.
+
+``CompressedManifestStaticFilesStorage`` is ``ManifestStaticFilesStorage``
+(content hashes in the file names, a ``staticfiles.json`` manifest) that
+also writes a ``.gz`` sibling of every text file ``collectstatic``
+produces. ``StaticFiles`` wraps the WSGI application to serve
+``STATIC_ROOT`` itself: the gzip variant to clients accepting it, and
+files named in the manifest with a year-long ``immutable`` lifetime, as
+a new version of a file gets a new name.
+
+The files are indexed when the application starts, so a deployment must
+restart it after ``collectstatic``.
+"""
+import gzip
+import json
+import mimetypes
+import os
+from pathlib import Path
+from wsgiref.util import FileWrapper
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.utils.http import http_date
+
+COMPRESSIBLE_SUFFIXES = {
+    ".css", ".js", ".json", ".map", ".svg", ".txt", ".html", ".xml",
+}
+
+# A smaller .gz is not worth a separate response variant.
+MIN_GZIP_SAVING = 0.05
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+
+def compress(path):
+    """Write ``<path>.gz`` unless it is up to date or would not be smaller.
+
+    Returns whether a ``.gz`` file was written.
+    """
+    path = Path(path)
+    gz_path = path.with_name(path.name + ".gz")
+    if (
+        gz_path.exists()
+        and gz_path.stat().st_mtime >= path.stat().st_mtime
+    ):
+        return False
+    content = path.read_bytes()
+    # mtime=0 makes builds of the same content byte-identical.
+    compressed = gzip.compress(content, compresslevel=9, mtime=0)
+    if len(compressed) > len(content) * (1 - MIN_GZIP_SAVING):
+        gz_path.unlink(missing_ok=True)
+        return False
+    gz_path.write_bytes(compressed)
+    return True
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        root = Path(self.location)
+        for path in sorted(root.rglob("*")):
+            if path.suffix in COMPRESSIBLE_SUFFIXES and compress(path):
+                name = path.relative_to(root).as_posix()
+                yield name, f"{name}.gz", True
+
+
+class StaticFile:
+    def __init__(self, path, immutable):
+        self.path = path
+        stat = path.stat()
+        self.size = stat.st_size
+        self.last_modified = http_date(stat.st_mtime)
+        encoding = "-gz" if path.suffix == ".gz" else ""
+        self.etag = f'"{int(stat.st_mtime):x}-{stat.st_size:x}{encoding}"'
+        self.content_type = (
+            mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        )
+        self.cache_control = IMMUTABLE if immutable else REVALIDATE
+        gz_path = path.with_name(path.name + ".gz")
+        self.gzip = StaticFile(gz_path, immutable) if (
+            path.suffix != ".gz" and gz_path.exists()
+        ) else None
+
+
+def accepts_gzip(environ):
+    for coding in environ.get("HTTP_ACCEPT_ENCODING", "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00")
+    return False
+
+
+class StaticFiles:
+    """WSGI middleware serving the files of ``root`` under ``prefix``.
+
+    Other paths, and unknown files under ``prefix``, go to
+    ``application``.
+    """
+
+    def __init__(self, application, root, prefix):
+        self.application = application
+        self.prefix = prefix if prefix.endswith("/") else prefix + "/"
+        self.files = self.index(Path(root))
+
+    def index(self, root):
+        try:
+            manifest = json.loads(
+                (root / ManifestStaticFilesStorage.manifest_name).read_text()
+            )
+            hashed = set(manifest["paths"].values())
+        except (FileNotFoundError, ValueError, KeyError):
+            hashed = set()
+        files = {}
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = Path(dirpath, filename)
+                if path.suffix == ".gz" and path.with_suffix("").exists():
+                    # Served as the gzip variant of that file.
+                    continue
+                name = path.relative_to(root).as_posix()
+                files[name] = StaticFile(path, name in hashed)
+        return files
+
+    def __call__(self, environ, start_response):
+        path = environ.get("PATH_INFO", "")
+        static_file = (
+            self.files.get(path[len(self.prefix):])
+            if path.startswith(self.prefix)
+            else None
+        )
+        if static_file is None:
+            return self.application(environ, start_response)
+        method = environ["REQUEST_METHOD"]
+        if method not in ("GET", "HEAD"):
+            start_response("405 Method Not Allowed", [("Allow", "GET, HEAD")])
+            return []
+
+        headers = [("Vary", "Accept-Encoding")] if static_file.gzip else []
+        if static_file.gzip and accepts_gzip(environ):
+            static_file = static_file.gzip
+            headers.append(("Content-Encoding", "gzip"))
+        headers += [
+            ("Cache-Control", static_file.cache_control),
+            ("ETag", static_file.etag),
+            ("Last-Modified", static_file.last_modified),
+        ]
+        if environ.get("HTTP_IF_NONE_MATCH") == static_file.etag:
+            start_response("304 Not Modified", headers)
+            return []
+        headers += [
+            ("Content-Type", static_file.content_type),
+            ("Content-Length", str(static_file.size)),
+        ]
+        start_response("200 OK", headers)
+        if method == "HEAD":
+            return []
+        file_wrapper = environ.get("wsgi.file_wrapper", FileWrapper)
+        return file_wrapper(static_file.path.open("rb"), 64 * 1024)
@@ -9,8 +9,20 @@ https://docs.djangoproject.com/en/4.0/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
+from taxi.warmup import warm_up
+from taxi_service.staticfiles import StaticFiles
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "taxi_service.settings")
 
 application = get_wsgi_application()
+
+if settings.TAXI_SERVE_STATIC:
+    application = StaticFiles(
+        application, settings.STATIC_ROOT, settings.STATIC_URL
+    )
+
+if settings.TAXI_WARM_UP:
+    warm_up(freeze=True)